@@ -0,0 +1,195 @@
+"""
+Process-wide CPU admission control for parse and encode work.
+
+Every Streamlit session runs its own parsing and torch inference threads.
+Without coordination, several simultaneous analyses oversubscribe the CPU
+and everyone's latency collapses. ``CpuAdmission`` hands out a fixed number
+of CPU slots: a job waits until its cost fits, and waiting jobs are served
+round-robin across sessions so one large upload cannot starve the others.
+"""
+
+import os
+import threading
+import time
+from collections import OrderedDict, defaultdict, deque
+from contextlib import contextmanager
+from typing import Callable, Dict, Optional
+
+
+class _Ticket:
+    __slots__ = ("kind", "cost", "granted")
+
+    def __init__(self, kind: str, cost: int):
+        self.kind = kind
+        self.cost = cost
+        self.granted = False
+
+
+class CpuAdmission:
+    """
+    Fair, cost-aware semaphore over a CPU budget.
+
+    Parse jobs cost one slot; encode jobs cost ``encode_threads`` slots and
+    should run with that many torch threads. Sessions take turns: after a
+    grant, the session moves to the back of the turn order.
+    """
+
+    def __init__(self, cpu_budget: Optional[int] = None, encode_threads: Optional[int] = None,
+                 wait_window: int = 1000):
+        self.cpu_budget = max(1, cpu_budget or os.cpu_count() or 1)
+        self.encode_threads = max(1, min(encode_threads or max(1, self.cpu_budget // 2), self.cpu_budget))
+        self._cond = threading.Condition()
+        self._in_use = 0
+        self._running: Dict[str, int] = defaultdict(int)
+        # session id -> waiting tickets (FIFO); dict order is the turn order
+        self._queues: "OrderedDict[str, deque]" = OrderedDict()
+        self._waiting_displays: Dict[str, tuple] = {}
+        self._wait_seconds: Dict[str, deque] = defaultdict(lambda: deque(maxlen=wait_window))
+        self._granted: Dict[str, int] = defaultdict(int)
+        self.max_queue_depth = 0
+
+    # ----------------------------------------------
+    # Admission
+    # ----------------------------------------------
+    @contextmanager
+    def slot(self, session_id: str, kind: str, cost: int = 1):
+        """Block until ``cost`` CPU slots are free and it is this session's turn"""
+        ticket = _Ticket(kind, min(max(1, cost), self.cpu_budget))
+        started = time.perf_counter()
+        with self._cond:
+            self._queues.setdefault(session_id, deque()).append(ticket)
+            self.max_queue_depth = max(self.max_queue_depth, self._queue_depth())
+            self._dispatch()
+
+        try:
+            while True:
+                display = self._waiting_displays.get(session_id)
+                show_position = display is not None and display[0] == threading.get_ident()
+                with self._cond:
+                    if not ticket.granted:
+                        self._cond.wait(timeout=0.5 if show_position else None)
+                    if ticket.granted:
+                        break
+                    position = self._position(session_id, ticket)
+                if show_position:
+                    display[1](position)  # Outside the lock: UI callbacks can be slow
+        except BaseException:
+            # Interrupted while queued (e.g. a Streamlit rerun): give up the place or the slot
+            with self._cond:
+                if ticket.granted:
+                    self._release(ticket)
+                else:
+                    self._queues[session_id].remove(ticket)
+                    if not self._queues[session_id]:
+                        del self._queues[session_id]
+            raise
+
+        waited = time.perf_counter() - started
+        with self._cond:
+            self._wait_seconds[kind].append(waited)
+        try:
+            yield waited
+        finally:
+            with self._cond:
+                self._release(ticket)
+
+    def wrap(self, obj, method_name: str, session_id: str, kind: str, cost: int = 1) -> None:
+        """Route every call of ``obj.method_name`` through an admission slot"""
+        original = getattr(obj, method_name)
+
+        def admitted(*args, **kwargs):
+            with self.slot(session_id, kind, cost):
+                return original(*args, **kwargs)
+
+        setattr(obj, method_name, admitted)
+
+    @contextmanager
+    def show_queue_position(self, session_id: str, callback: Callable[[int], None]):
+        """
+        While active, a job from ``session_id`` blocked on *this* thread calls
+        ``callback(position)`` about twice a second (1 = next to be admitted).
+        """
+        self._waiting_displays[session_id] = (threading.get_ident(), callback)
+        try:
+            yield
+        finally:
+            self._waiting_displays.pop(session_id, None)
+
+    # ----------------------------------------------
+    # Internals (lock held)
+    # ----------------------------------------------
+    def _dispatch(self) -> None:
+        granted = False
+        while self._queues:
+            session_id, waiting = next(iter(self._queues.items()))
+            ticket = waiting[0]
+            if self._in_use + ticket.cost > self.cpu_budget:
+                break  # Head of the turn order waits; smaller jobs behind it may not jump ahead
+            waiting.popleft()
+            del self._queues[session_id]
+            if waiting:
+                self._queues[session_id] = waiting  # Back of the turn order
+            ticket.granted = True
+            self._in_use += ticket.cost
+            self._running[ticket.kind] += 1
+            self._granted[ticket.kind] += 1
+            granted = True
+        if granted:
+            self._cond.notify_all()
+
+    def _release(self, ticket: _Ticket) -> None:
+        self._in_use -= ticket.cost
+        self._running[ticket.kind] -= 1
+        self._dispatch()
+
+    def _queue_depth(self) -> int:
+        return sum(len(waiting) for waiting in self._queues.values())
+
+    def _position(self, session_id: str, ticket: _Ticket) -> int:
+        """1-based place in the round-robin admission order"""
+        waiting = self._queues.get(session_id)
+        if not waiting or ticket not in waiting:
+            return 0
+        depth = list(waiting).index(ticket)
+        ahead = 0
+        for other_id, other in self._queues.items():
+            if other_id == session_id:
+                ahead += depth
+                break
+            ahead += min(len(other), depth + 1)
+        for other_id, other in reversed(self._queues.items()):
+            if other_id == session_id:
+                break
+            ahead += min(len(other), depth)
+        return ahead + 1
+
+    # ----------------------------------------------
+    # Metrics
+    # ----------------------------------------------
+    def queue_position(self, session_id: str) -> int:
+        """Place of the session's next waiting job (0 when nothing is queued)"""
+        with self._cond:
+            waiting = self._queues.get(session_id)
+            return self._position(session_id, waiting[0]) if waiting else 0
+
+    def metrics(self) -> Dict:
+        with self._cond:
+            wait_ms = {}
+            for kind, samples in self._wait_seconds.items():
+                ordered = sorted(samples)
+                if ordered:
+                    wait_ms[kind] = {
+                        "mean": round(1000 * sum(ordered) / len(ordered), 1),
+                        "p95": round(1000 * ordered[min(len(ordered) - 1, int(0.95 * len(ordered)))], 1),
+                        "max": round(1000 * ordered[-1], 1),
+                    }
+            return {
+                "cpu_budget": self.cpu_budget,
+                "slots_in_use": self._in_use,
+                "running": dict(self._running),
+                "queue_depth": self._queue_depth(),
+                "max_queue_depth": self.max_queue_depth,
+                "sessions_waiting": len(self._queues),
+                "granted": dict(self._granted),
+                "wait_ms": wait_ms,
+            }
@@ -1,9 +1,22 @@
 
+import os
+import uuid
 import streamlit as st
 import pandas as pd
+from contextlib import ExitStack, nullcontext
+from concurrent.futures import wait as futures_wait
 from resume_parser import ResumeParser
 from matcher import ResumeJobMatcher
-from export_utils import ExportUtils
+from export_utils import ExportJobs
+from results_cache import ResultsCache
+from bulk_ingest import ArchiveIngestor
+from dedup import deduplicate_resumes, fan_out_duplicates
+from profiling import AnalysisProfiler, profiling_requested
+from pipeline import AnalysisPipeline, parse_files
+from admission import CpuAdmission
+from encode_scheduler import pin_torch_threads
+from skill_taxonomy import SkillTaxonomy
+from reweight import ComponentScores
 import plotly.graph_objects as go
 import plotly.express as px
 import setup_nltk
@@ -157,6 +170,34 @@ textarea {
 </style>
 """, unsafe_allow_html=True)
 
+@st.cache_resource
+def get_results_cache():
+    """Results memo shared by every session in this Streamlit process"""
+    return ResultsCache()
+
+@st.cache_resource
+def get_export_jobs():
+    """Background export builder shared by every session in this process"""
+    return ExportJobs()
+
+@st.cache_resource
+def get_skill_taxonomy(_encode_fn):
+    """Canonical skill matrix, embedded once per process (n-gram cache shared too)"""
+    # The first session's (admission-wrapped) encoder builds the matrix but is not kept:
+    # every session passes its own encoder when matching
+    return SkillTaxonomy(_encode_fn, retain_encoder=False)
+
+@st.cache_resource
+def get_cpu_admission():
+    """CPU budget for parse / encode work, shared by every session in this process"""
+    admission = CpuAdmission(
+        cpu_budget=int(os.environ.get("RESUME_ANALYZER_CPU_BUDGET", 0)) or None,
+        encode_threads=int(os.environ.get("RESUME_ANALYZER_ENCODE_THREADS", 0)) or None,
+    )
+    # torch threads are process-wide: pinned once here, never per session
+    pin_torch_threads(admission.encode_threads)
+    return admission
+
 def main():
     # Header with enhanced styling
 # Header with enhanced styling
@@ -169,8 +210,15 @@ def main():
     
     # Initialize components
     if 'parser' not in st.session_state:
+        st.session_state.session_id = uuid.uuid4().hex
         st.session_state.parser = ResumeParser()
         st.session_state.matcher = ResumeJobMatcher()
+        
+        # Parsing and inference from every session share one CPU budget
+        admission = get_cpu_admission()
+        admission.wrap(st.session_state.parser, "parse_resume", st.session_state.session_id, "parse")
+        admission.wrap(st.session_state.matcher, "encode_texts", st.session_state.session_id, "encode",
+                       cost=admission.encode_threads)
     
     # Enhanced sidebar
     with st.sidebar:
@@ -193,6 +241,65 @@ def main():
         💾 **Multi-format Export** - Excel & CSV  
         """)
         
+        st.markdown("---")
+        st.number_input(
+            "🎯 Shortlist size (0 = rank everyone)",
+            min_value=0,
+            value=0,
+            step=10,
+            key='shortlist_size',
+            help="Only the top-K candidates are shown and exported"
+        )
+        st.checkbox(
+            "🔁 Merge near-duplicate resumes",
+            value=True,
+            key='merge_duplicates',
+            help="Re-submissions and renamed copies are scored once and share the same score"
+        )
+        st.checkbox(
+            "🧩 Skill-gap analysis",
+            value=False,
+            key='skill_gap_analysis',
+            help="Match synonyms (k8s → kubernetes) against a skill taxonomy and list each candidate's "
+                 "missing JD skills. Embeds extra phrases per resume, so analyses take longer"
+        )
+        
+        st.markdown("---")
+        st.markdown("## ⚖️ Ranking Weights")
+        st.checkbox(
+            "Use custom weights",
+            key='custom_weights',
+            help="Re-rank the current results instantly; nothing is re-parsed or re-encoded"
+        )
+        if st.session_state.get('custom_weights'):
+            seed_weight_sliders()
+            st.slider("🔍 Semantic similarity", 0.0, 1.0, step=0.05, key='weight_semantic')
+            st.slider("🎪 Keyword match", 0.0, 1.0, step=0.05, key='weight_keyword')
+            st.slider("📊 Experience", 0.0, 1.0, step=0.05, key='weight_experience')
+        
+        st.markdown("---")
+        cache_stats = get_results_cache().stats()
+        st.caption(
+            f"🗄️ Cached analyses: {cache_stats['entries']} "
+            f"({cache_stats['bytes'] / 1024:.0f} KB)"
+        )
+        if st.button("🧹 Clear cached results", use_container_width=True):
+            get_results_cache().clear()
+            st.session_state.pop('last_results_key', None)
+            st.session_state.pop('last_results', None)
+        
+        admission_metrics = get_cpu_admission().metrics()
+        st.caption(
+            f"🚦 CPU slots: {admission_metrics['slots_in_use']}/{admission_metrics['cpu_budget']} busy • "
+            f"{admission_metrics['queue_depth']} job(s) queued"
+        )
+        
+        # Hidden diagnostics: only shown when the app is opened with ?debug=1
+        if st.query_params.get("debug") == "1":
+            st.markdown("---")
+            st.checkbox("🛠️ Profile analysis runs", key='profile_analysis')
+            with st.expander("🚦 Admission metrics"):
+                st.json(admission_metrics)
         
     
     # Main content area with enhanced layout
@@ -201,14 +308,21 @@ def main():
     with col1:
         st.markdown("### 📁 Upload Resumes")
         uploaded_files = st.file_uploader(
-            "Drop your PDF files here or click to browse",
-            type=['pdf'],
+            "Drop your PDF files or ZIP/tar archives here or click to browse",
+            type=['pdf', 'zip', 'tar', 'gz', 'tgz'],
             accept_multiple_files=True,
-            help="💡 Tip: Upload multiple resumes for batch processing"
+            help="💡 Tip: Upload a ZIP of resumes for bulk processing"
         )
         
         if uploaded_files:
-            st.success(f"✅ {len(uploaded_files)} resume(s) ready for analysis")
+            archive_count = sum(ArchiveIngestor.is_archive(f.name) for f in uploaded_files)
+            if archive_count:
+                st.success(
+                    f"✅ {len(uploaded_files) - archive_count} resume(s) and "
+                    f"{archive_count} archive(s) ready for analysis"
+                )
+            else:
+                st.success(f"✅ {len(uploaded_files)} resume(s) ready for analysis")
             
             # Enhanced file preview
             with st.expander("📋 View uploaded files", expanded=True):
@@ -247,10 +361,76 @@ problem-solving skills, team collaboration...
             st.error("⚠️ Please enter a job description")
         else:
             analyze_resumes(uploaded_files, job_description)
+    elif uploaded_files and job_description.strip():
+        # Reruns (download clicks, widget changes) re-show the last analysis
+        # as long as the uploads and JD are unchanged.
+        show_cached_results(uploaded_files, job_description)
+
+def profiling_enabled():
+    """Env var / CLI flag, or the hidden sidebar toggle"""
+    return profiling_requested() or st.session_state.get('profile_analysis', False)
+
+def uploaded_file_hashes(uploaded_files):
+    """Content hashes of the uploads, computed once per upload (not on every rerun)"""
+    known = st.session_state.get('upload_hashes', {})
+    current, hashes = {}, []
+    for f in uploaded_files:
+        upload_id = (getattr(f, 'file_id', None) or f.name, f.size)
+        if upload_id not in current:
+            current[upload_id] = known.get(upload_id) or ResultsCache.hash_bytes(f.getvalue())
+        hashes.append(current[upload_id])
+    st.session_state.upload_hashes = current  # Only the current uploads are kept
+    return hashes
+
+def analysis_settings():
+    """Everything the user chose that changes the results (model, shortlist size, dedup, skill gaps)"""
+    return (
+        st.session_state.matcher.model_name,
+        st.session_state.get('shortlist_size', 0),
+        st.session_state.get('merge_duplicates', True),
+        st.session_state.get('skill_gap_analysis', False),
+    )
+
+def build_results_key(uploaded_files, job_description):
+    """Cache key for an analysis: file content hashes, JD hash, settings and current auto-tuned weights"""
+    scoring_config = (analysis_settings(), st.session_state.matcher.auto_tune_weights())
+    return ResultsCache.make_key(uploaded_file_hashes(uploaded_files), job_description, scoring_config)
+
+def remember_results(results_key, results):
+    """The session keeps its own last results; the shared cache only reuses them across sessions"""
+    st.session_state.last_results_key = results_key
+    st.session_state.last_results = results
+
+def show_cached_results(uploaded_files, job_description):
+    """Redisplay the session's last results if they match the current inputs"""
+    last_key = st.session_state.get('last_results_key')
+    results = st.session_state.get('last_results')
+    if last_key is None or not results:
+        return
+    
+    # Weights drift with the history (and after every run), so they are the only part not compared
+    file_hashes = tuple(sorted(uploaded_file_hashes(uploaded_files)))
+    last_files, last_jd, (last_settings, _) = last_key
+    if (last_files, last_jd, last_settings) != (file_hashes, ResultsCache.hash_text(job_description), analysis_settings()):
+        return
+    
+    display_enhanced_results(results, job_description)
 
 def analyze_resumes(uploaded_files, job_description):
     """Enhanced analysis function with better progress tracking"""
     
+    cache = get_results_cache()
+    results_key = build_results_key(uploaded_files, job_description)
+    cached_results = cache.get(results_key)
+    if cached_results:
+        remember_results(results_key, cached_results)
+        st.info("⚡ Showing cached results for these resumes and job description")
+        display_enhanced_results(cached_results, job_description)
+        return
+    
+    profiler = AnalysisProfiler() if profiling_enabled() else None
+    stage = profiler.stage if profiler else (lambda name: nullcontext())
+    
     # Create progress tracking
     progress_container = st.container()
     with progress_container:
@@ -260,45 +440,33 @@ def analyze_resumes(uploaded_files, job_description):
         step_info = st.empty()
     
     try:
-        # Step 1: Parse resumes
-        status_text.success("📄 Parsing resumes...")
-        step_info.info(f"Processing {len(uploaded_files)} resume(s)")
-        parsed_resumes = []
-        
-        for i, uploaded_file in enumerate(uploaded_files):
-            uploaded_file.seek(0)
-            
-            try:
-                parsed_resume = st.session_state.parser.parse_resume(
-                    uploaded_file, uploaded_file.name
+        with ExitStack() as run_context:
+            if profiler:
+                run_context.enter_context(
+                    profiler.profile_run(st.session_state.parser, st.session_state.matcher)
                 )
-                parsed_resumes.append(parsed_resume)
-            except Exception as e:
-                st.error(f"❌ Error parsing {uploaded_file.name}: {str(e)}")
-                # We can't continue if a file fails to parse.
-                return
-            
-            progress = (i + 1) / len(uploaded_files) * 0.6
-            progress_bar.progress(progress)
-            step_info.info(f"Parsed: {uploaded_file.name}")
-        
-        # Step 2: Calculate similarity scores
-        status_text.success("🧮 Calculating similarity scores...")
-        step_info.info("Running TF-IDF analysis and keyword matching")
-        results = st.session_state.matcher.calculate_similarity_score(
-            parsed_resumes, job_description
-        )
-        progress_bar.progress(1.0)
+            # Show our place in the shared CPU queue whenever this thread has to wait
+            run_context.enter_context(get_cpu_admission().show_queue_position(
+                st.session_state.session_id,
+                lambda position: step_info.warning(f"🚦 Server busy — waiting for CPU (queue position {position})")
+            ))
+            results = run_analysis(uploaded_files, job_description, stage, progress_bar, status_text, step_info)
         
         # Clear progress indicators
         progress_bar.empty()
         status_text.empty()
         step_info.empty()
         
+        if profiler:
+            display_profile_report(profiler)
+        
         if not results:
             st.error("❌ No valid resumes found for analysis")
             return
         
+        cache.put(results_key, results)
+        remember_results(results_key, results)
+        
         # Display results with enhanced styling
         display_enhanced_results(results, job_description)
         
@@ -309,12 +477,125 @@ def analyze_resumes(uploaded_files, job_description):
         status_text.empty()
         step_info.empty()
 
+def run_analysis(uploaded_files, job_description, stage, progress_bar, status_text, step_info):
+    """Parse, de-duplicate and score; ``stage`` names each phase for the profiler"""
+    parser = st.session_state.parser
+    matcher = st.session_state.matcher
+    matcher.attach_taxonomy(
+        get_skill_taxonomy(matcher.encode_texts) if st.session_state.get('skill_gap_analysis') else None
+    )
+    ingestor = ArchiveIngestor()
+    merge_duplicates = st.session_state.get('merge_duplicates', True)
+    shortlist_size = st.session_state.get('shortlist_size', 0)
+    
+    status_text.success("📄 Parsing and scoring resumes...")
+    step_info.info(f"Processing {len(uploaded_files)} upload(s)")
+    
+    if shortlist_size:
+        # Shortlisting folds duplicates over the whole upload first, so it stays phased
+        with stage("parse"):
+            parsed_resumes = list(parse_files(parser, uploaded_files, ingestor))
+        progress_bar.progress(0.6)
+        skipped = [(r['filename'], r['error']) for r in parsed_resumes if r['error']]
+        parsed_resumes = [r for r in parsed_resumes if not r['error']]
+        
+        duplicates = {}
+        with stage("dedup"):
+            if merge_duplicates and len(parsed_resumes) > 1:
+                parsed_resumes, duplicates = deduplicate_resumes(parsed_resumes)
+        
+        status_text.success("🧮 Calculating similarity scores...")
+        with stage("score"):
+            # Everyone is embedded in batches; duplicates are listed before the cut,
+            # so each one takes a shortlist slot and the shortlist never exceeds K
+            results = fan_out_duplicates(matcher.calculate_similarity_score(parsed_resumes, job_description),
+                                         duplicates)
+            if len(results) > shortlist_size:
+                st.caption(f"✂️ Shortlist mode: showing the top {shortlist_size} of {len(results)} resume(s)")
+                results = results[:shortlist_size]
+        folded = sum(len(group) for group in duplicates.values())
+    else:
+        # Streaming pipeline: parsing, encoding and scoring overlap, and the
+        # leaderboard fills in while uploads are still being processed
+        pipeline = AnalysisPipeline(matcher, dedup_threshold=0.85 if merge_duplicates else None)
+        has_archives = any(ArchiveIngestor.is_archive(f.name) for f in uploaded_files)
+        live_ranking = st.empty()
+        snapshot = None
+        with stage("pipeline"):
+            for snapshot in pipeline.run(parse_files(parser, uploaded_files, ingestor), job_description):
+                if not has_archives:
+                    progress_bar.progress(min(snapshot['parsed'] / len(uploaded_files), 1.0))
+                queue_position = get_cpu_admission().queue_position(st.session_state.session_id)
+                step_info.info(
+                    f"Parsed {snapshot['parsed']} • scored {snapshot['scored']} • "
+                    f"skipped {len(snapshot['skipped'])}"
+                    + (f" • 🚦 waiting for CPU (queue position {queue_position})" if queue_position else "")
+                )
+                if not snapshot['done'] and snapshot['results']:
+                    live_ranking.dataframe(
+                        pd.DataFrame([
+                            {'Candidate': r['filename'], 'Score': round(r['combined_score'], 3)}
+                            for r in snapshot['results'][:10]
+                        ]),
+                        use_container_width=True
+                    )
+        live_ranking.empty()
+        results = snapshot['results']
+        skipped = snapshot['skipped']
+        folded = snapshot['duplicates']
+    
+    if skipped:
+        with st.expander(f"⚠️ {len(skipped)} file(s) skipped or failed"):
+            for filename, error in skipped:
+                st.markdown(f"`{filename}`: {error}")
+    if folded:
+        st.caption(f"🔁 {folded} near-duplicate resume(s) scored once; each copy shows its original's scores")
+    
+    progress_bar.progress(1.0)
+    return results
+
+def display_profile_report(profiler):
+    """Stage timings, hotspots and downloadable profiles for a profiled run"""
+    with st.expander("🛠️ Profiling Report", expanded=True):
+        st.markdown("**⏱️ Stages** (wall time includes nested stages; CPU profiles are exclusive)")
+        st.dataframe(pd.DataFrame(profiler.stage_summary()), use_container_width=True)
+        
+        st.markdown("**🔥 Top Hotspots** (by own time)")
+        st.dataframe(pd.DataFrame(profiler.hotspots()), use_container_width=True)
+        
+        for name, s in profiler.stage_stats.items():
+            if s["top_allocations"]:
+                st.markdown(f"**🧠 Allocations in `{name}`** (first call)")
+                st.code("\n".join(s["top_allocations"]))
+        
+        col1, col2 = st.columns(2)
+        with col1:
+            st.download_button(
+                label="📥 Download .prof",
+                data=profiler.dump_prof(),
+                file_name="analysis.prof",
+                mime="application/octet-stream",
+                use_container_width=True,
+                help="Open with snakeviz or python -m pstats"
+            )
+        with col2:
+            st.download_button(
+                label="📥 Download collapsed stacks",
+                data=profiler.collapsed_stacks(),
+                file_name="analysis.collapsed.txt",
+                mime="text/plain",
+                use_container_width=True,
+                help="Feed to flamegraph.pl or speedscope"
+            )
+
 def display_enhanced_results(results, job_description):
     """Display results with beautiful styling and enhanced metrics"""
     
     st.markdown("---")
     st.markdown("# 🏆 Analysis Results")
     
+    results = apply_custom_weights(results)
+    
     # Enhanced summary statistics
     col1, col2, col3, col4, col5 = st.columns(5)
     
@@ -407,6 +688,8 @@ def display_enhanced_results(results, job_description):
     
     st.plotly_chart(fig, use_container_width=True)
     
+    display_skill_gap(results)
+    
     # Detailed results with enhanced styling
     st.markdown("### 🏅 Detailed Candidate Rankings")
     
@@ -441,6 +724,10 @@ def display_enhanced_results(results, job_description):
             
             with col1:
                 st.markdown(f"### {rank_color} {result['filename'].replace('.pdf', '')}")
+                if result.get('duplicate_of'):
+                    st.caption(f"🔁 Near-duplicate of `{result['duplicate_of']}` — scores, skills and experience are its original's")
+                elif result.get('duplicate_count'):
+                    st.caption(f"🔁 {result['duplicate_count']} near-duplicate copy(ies) share this score")
                 
                 # Enhanced score breakdown
                 score_col1, score_col2, score_col3, score_col4 = st.columns(4)
@@ -460,6 +747,10 @@ def display_enhanced_results(results, job_description):
                 else:
                     st.markdown("**🎯 Matching Keywords:** *None found*")
                 
+                if result.get('skill_gap') and result['skill_gap']['missing']:
+                    missing_str = " • ".join([f"`{skill}`" for skill in result['skill_gap']['missing']])
+                    st.markdown(f"**🧩 Missing JD Skills:** {missing_str}")
+                
                 if result['skills_found']:
                     skills_str = " • ".join([f"`{skill}`" for skill in result['skills_found'][:10]])
                     st.markdown(f"**🛠️ Skills Found:** {skills_str}")
@@ -498,24 +789,20 @@ def display_enhanced_results(results, job_description):
     col1, col2, col3 = st.columns([1, 1, 1])
     
     with col1:
-        excel_data = ExportUtils.export_to_excel(results)
-        st.download_button(
+        export_download_button(
+            results, "excel",
             label="📊 Download Excel Report",
-            data=excel_data,
             file_name="resume_rankings.xlsx",
             mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-            use_container_width=True,
             help="Complete analysis in Excel format"
         )
     
     with col2:
-        csv_data = ExportUtils.export_to_csv(results)
-        st.download_button(
+        export_download_button(
+            results, "csv",
             label="📄 Download CSV Data",
-            data=csv_data,
             file_name="resume_rankings.csv",
             mime="text/csv",
-            use_container_width=True,
             help="Raw data in CSV format"
         )
     
@@ -531,6 +818,102 @@ def display_enhanced_results(results, job_description):
             help="Executive summary report"
         )
 
+WEIGHT_SLIDERS = ('weight_semantic', 'weight_keyword', 'weight_experience')
+
+def component_scores(results):
+    """Component arrays are built once per requisition and reused on every slider move"""
+    results_key = st.session_state.get('last_results_key')
+    cached = st.session_state.get('component_scores')
+    if cached is None or cached[0] != results_key:
+        cached = (results_key, ComponentScores(results))
+        st.session_state.component_scores = cached
+    return cached[1]
+
+def seed_weight_sliders():
+    """Start the sliders at the automatic weights of the results on screen (once per result set)"""
+    results_key = st.session_state.get('last_results_key')
+    if st.session_state.get('weights_seeded_for') == results_key and WEIGHT_SLIDERS[0] in st.session_state:
+        return
+    results = st.session_state.get('last_results')
+    default = component_scores(results).default_weights if results else (0.6, 0.3, 0.1)
+    for key, weight in zip(WEIGHT_SLIDERS, default):
+        st.session_state[key] = float(weight)
+    st.session_state.weights_seeded_for = results_key
+
+def apply_custom_weights(results):
+    """Re-rank with the sidebar weights: a vectorized weighted sum, no model or parser calls"""
+    if not st.session_state.get('custom_weights'):
+        return results
+    
+    components = component_scores(results)
+    default = components.default_weights
+    if st.session_state.get('weights_seeded_for') != st.session_state.get('last_results_key'):
+        # New results since the sidebar was drawn: its sliders still hold the previous defaults
+        weights = ComponentScores.normalize(default)
+    else:
+        weights = ComponentScores.normalize([st.session_state[key] for key in WEIGHT_SLIDERS])
+    st.caption(
+        f"⚖️ Custom weights — semantic {weights[0]:.2f} • keyword {weights[1]:.2f} • experience {weights[2]:.2f} "
+        f"(automatic for this job: {default[0]:.2f} • {default[1]:.2f} • {default[2]:.2f})"
+    )
+    if all(abs(w - d) < 1e-9 for w, d in zip(weights, ComponentScores.normalize(default))):
+        return results  # Untouched sliders keep the matcher's own ranking
+    return components.reweighted(weights)
+
+def display_skill_gap(results, max_candidates=20):
+    """JD skills (canonical, synonym-aware) vs. the top candidates"""
+    if not results or 'skill_gap' not in results[0]:
+        return
+    gap = results[0]['skill_gap']
+    jd_skills = gap['matched'] + gap['missing']
+    if not jd_skills:
+        return
+    
+    st.markdown("### 🧩 Skill Gap vs. Job Description")
+    st.caption("Synonyms are matched semantically (e.g. k8s → kubernetes, postgres → postgresql)")
+    rows = []
+    for result in results[:max_candidates]:
+        covered = set(result['skill_gap']['matched'])
+        row = {'Candidate': result['filename'].replace('.pdf', ''),
+               'Coverage': f"{result['skill_gap']['coverage']:.0%}"}
+        row.update({skill: "✅" if skill in covered else "❌" for skill in jd_skills})
+        rows.append(row)
+    st.dataframe(pd.DataFrame(rows), use_container_width=True, hide_index=True)
+
+def export_download_button(results, fmt, label, file_name, mime, help):
+    """Build an export only when asked for, in the background, then offer the download"""
+    jobs = get_export_jobs()
+    job = jobs.lookup(results, fmt)
+    
+    if job is None:
+        if st.button(f"⚙️ Prepare {label.split(' ', 2)[-1]}", key=f"prepare_{fmt}",
+                     use_container_width=True, help=help):
+            job = jobs.request(results, fmt)
+            # Small exports finish almost at once; large ones don't hold the page
+            futures_wait([job], timeout=0.5)
+        else:
+            return
+    
+    if not job.done():
+        st.info("⏳ Preparing export in the background...")
+        st.button("🔄 Check again", key=f"refresh_{fmt}", use_container_width=True)
+        return
+    
+    if job.exception() is not None:
+        st.error(f"Export failed: {job.exception()}")
+        if st.button("🔁 Retry", key=f"retry_{fmt}", use_container_width=True):
+            jobs.request(results, fmt)
+        return
+    
+    st.download_button(
+        label=label,
+        data=job.result(),
+        file_name=file_name,
+        mime=mime,
+        use_container_width=True,
+        help=help
+    )
+
 def generate_summary_report(results, job_description):
     """Generate a text summary report"""
     report = f"""
@@ -0,0 +1,200 @@
+"""
+Streaming bulk ingestion of resumes from ZIP / tar archives.
+
+Members are read one at a time straight from the archive (nothing is
+extracted to disk) and handed to ResumeParser as in-memory streams, so
+memory stays bounded by the largest accepted member rather than the archive.
+
+Batch usage:
+    python bulk_ingest.py resumes.zip --jd sample_job_descriptions --out rankings.xlsx
+"""
+
+import argparse
+import io
+import os
+import tarfile
+import zipfile
+from typing import Dict, Iterator, Optional
+
+
+class ArchiveIngestor:
+    """Yields PDF members of ZIP/tar archives and feeds them to ResumeParser"""
+
+    ARCHIVE_EXTENSIONS = ('.zip', '.tar', '.tar.gz', '.tgz', '.tar.bz2', '.tbz2', '.tar.xz', '.txz', '.gz')
+
+    def __init__(self, max_member_bytes: int = 10 * 1024 * 1024, max_members: Optional[int] = None):
+        self.max_member_bytes = max_member_bytes
+        self.max_members = max_members
+
+    @classmethod
+    def is_archive(cls, filename: str) -> bool:
+        return filename.lower().endswith(cls.ARCHIVE_EXTENSIONS)
+
+    # ----------------------------------------------
+    # Member Streaming
+    # ----------------------------------------------
+    def iter_members(self, archive_file, archive_name: str = "") -> Iterator[Dict]:
+        """
+        Yield ``{'filename', 'data', 'error'}`` for every file member.
+        ``data`` is None whenever ``error`` explains why a member was skipped.
+        """
+        if archive_name.lower().endswith('.zip') or self._looks_like_zip(archive_file):
+            members = self._iter_zip(archive_file)
+        else:
+            members = self._iter_tar(archive_file)
+
+        for count, member in enumerate(members, 1):
+            if self.max_members is not None and count > self.max_members:
+                yield self._skipped(f"{archive_name or 'archive'}", f"Stopped after {self.max_members} members")
+                return
+            yield member
+
+    @staticmethod
+    def _looks_like_zip(archive_file) -> bool:
+        try:
+            position = archive_file.tell()
+            is_zip = zipfile.is_zipfile(archive_file)
+            archive_file.seek(position)
+            return is_zip
+        except (AttributeError, OSError, io.UnsupportedOperation):
+            return False  # Non-seekable streams can only be tar streams
+
+    def _iter_zip(self, archive_file) -> Iterator[Dict]:
+        try:
+            archive = zipfile.ZipFile(archive_file)
+        except zipfile.BadZipFile as e:
+            yield self._skipped("archive", f"Error opening ZIP archive: {str(e)}")
+            return
+
+        with archive:
+            for info in archive.infolist():
+                if info.is_dir():
+                    continue
+                rejection = self._check_member(info.filename, info.file_size)
+                if rejection:
+                    yield self._skipped(info.filename, rejection)
+                    continue
+                try:
+                    with archive.open(info) as member:
+                        yield self._read_capped(info.filename, member)
+                except Exception as e:
+                    yield self._skipped(info.filename, f"Error reading member: {str(e)}")
+
+    def _iter_tar(self, archive_file) -> Iterator[Dict]:
+        try:
+            # 'r|*' reads the archive as a forward-only stream (any compression)
+            archive = tarfile.open(fileobj=archive_file, mode='r|*')
+        except tarfile.TarError as e:
+            yield self._skipped("archive", f"Error opening tar archive: {str(e)}")
+            return
+
+        with archive:
+            try:
+                for info in archive:
+                    if not info.isfile():
+                        continue
+                    rejection = self._check_member(info.name, info.size)
+                    if rejection:
+                        yield self._skipped(info.name, rejection)
+                        continue
+                    member = archive.extractfile(info)
+                    yield self._read_capped(info.name, member)
+            except tarfile.TarError as e:
+                yield self._skipped("archive", f"Error reading tar archive: {str(e)}")
+
+    def _check_member(self, name: str, size: int) -> Optional[str]:
+        """Return a skip reason, or None if the member should be parsed"""
+        if not name.lower().endswith('.pdf') or os.path.basename(name).startswith('._'):
+            return "Skipped: not a PDF"
+        if size > self.max_member_bytes:
+            return f"Skipped: {size / 1e6:.1f} MB exceeds {self.max_member_bytes / 1e6:.1f} MB limit"
+        return None
+
+    def _read_capped(self, name: str, member) -> Dict:
+        # Never trust header sizes: read at most one byte past the limit
+        data = member.read(self.max_member_bytes + 1)
+        if len(data) > self.max_member_bytes:
+            return self._skipped(name, f"Skipped: exceeds {self.max_member_bytes / 1e6:.1f} MB limit")
+        return {'filename': name, 'data': data, 'error': None}
+
+    @staticmethod
+    def _skipped(name: str, reason: str) -> Dict:
+        return {'filename': name, 'data': None, 'error': reason}
+
+    # ----------------------------------------------
+    # Parsing
+    # ----------------------------------------------
+    def ingest(self, parser, archive_file, archive_name: str = "", keep_raw_text: bool = True) -> Iterator[Dict]:
+        """Parse every accepted member; skipped/failed members come back with 'error' set"""
+        for member in self.iter_members(archive_file, archive_name):
+            if member['error']:
+                yield self._failed_resume(member['filename'], member['error'])
+                continue
+            try:
+                parsed = parser.parse_resume(io.BytesIO(member['data']), member['filename'])
+            except Exception as e:
+                parsed = self._failed_resume(member['filename'], f"Error parsing resume: {str(e)}")
+            if not keep_raw_text:
+                from resume_parser import portable_resume
+
+                # The layout object holds every line too: keep only its section names and encode text
+                parsed = portable_resume(parsed)
+                parsed['raw_text'] = ''
+            yield parsed
+
+    @staticmethod
+    def _failed_resume(filename: str, error: str) -> Dict:
+        return {
+            'filename': filename,
+            'raw_text': '',
+            'clean_text': '',
+            'skills': [],
+            'experience_years': 0,
+            'error': error
+        }
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description="Rank resumes from ZIP/tar archives")
+    arg_parser.add_argument("archives", nargs="+", help="ZIP or tar(.gz/.bz2/.xz) files of PDF resumes")
+    arg_parser.add_argument("--jd", required=True, help="Path to a job description text file")
+    arg_parser.add_argument("--out", default="resume_rankings.csv", help="Output .csv or .xlsx")
+    arg_parser.add_argument("--max-member-mb", type=float, default=10.0)
+    args = arg_parser.parse_args()
+
+    from resume_parser import ResumeParser
+    from matcher import ResumeJobMatcher
+    from export_utils import ExportUtils
+
+    with open(args.jd, encoding="utf-8") as f:
+        job_description = f.read()
+
+    parser = ResumeParser()
+    ingestor = ArchiveIngestor(max_member_bytes=int(args.max_member_mb * 1024 * 1024))
+    parsed_resumes, errors = [], []
+    for archive_path in args.archives:
+        with open(archive_path, 'rb') as archive_file:
+            for parsed in ingestor.ingest(parser, archive_file, archive_path, keep_raw_text=False):
+                if parsed['error']:
+                    errors.append((archive_path, parsed['filename'], parsed['error']))
+                else:
+                    parsed_resumes.append(parsed)
+
+    results = ResumeJobMatcher().calculate_similarity_score(parsed_resumes, job_description)
+
+    if args.out.lower().endswith('.xlsx'):
+        with open(args.out, 'wb') as f:
+            f.write(ExportUtils.export_to_excel(results))
+    else:
+        with open(args.out, 'w', encoding='utf-8', newline='') as f:
+            f.write(ExportUtils.export_to_csv(results))
+
+    print(f"✅ Ranked {len(results)} resume(s) → {args.out}")
+    if errors:
+        print(f"⚠️ {len(errors)} member(s) skipped or failed:")
+        for archive_path, member, error in errors:
+            print(f"   {archive_path}:{member} → {error}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,173 @@
+import hashlib
+import re
+from collections import defaultdict
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+
+class MinHasher:
+    """MinHash signatures over word shingles (multiply-shift hash family)"""
+
+    def __init__(self, num_perm: int = 128, shingle_size: int = 5, seed: int = 42):
+        self.num_perm = num_perm
+        self.shingle_size = shingle_size
+        rng = np.random.RandomState(seed)
+        # Odd multipliers make (a*x + b) >> 32 a universal family over uint64
+        self.a = rng.randint(0, 2**62, size=num_perm, dtype=np.uint64) * np.uint64(2) + np.uint64(1)
+        self.b = rng.randint(0, 2**62, size=num_perm, dtype=np.uint64)
+
+    def shingles(self, text: str) -> set:
+        words = re.findall(r'\w+', text.lower())
+        if len(words) < self.shingle_size:
+            return {" ".join(words)} if words else set()
+        return {" ".join(words[i:i + self.shingle_size]) for i in range(len(words) - self.shingle_size + 1)}
+
+    def signature(self, text: str) -> np.ndarray:
+        """uint32 signature; slot-wise equality rate estimates Jaccard similarity"""
+        shingles = self.shingles(text)
+        if not shingles:
+            return np.full(self.num_perm, np.iinfo(np.uint32).max, dtype=np.uint32)
+        hashes = np.fromiter(
+            (int.from_bytes(hashlib.blake2b(s.encode("utf-8"), digest_size=8).digest(), "little") for s in shingles),
+            dtype=np.uint64, count=len(shingles),
+        )
+        with np.errstate(over="ignore"):
+            permuted = (hashes[:, None] * self.a[None, :] + self.b[None, :]) >> np.uint64(32)
+        return permuted.min(axis=0).astype(np.uint32)
+
+    @staticmethod
+    def similarity(sig_a: np.ndarray, sig_b: np.ndarray) -> float:
+        return float(np.mean(sig_a == sig_b))
+
+
+class MinHashLSH:
+    """Banded LSH index: candidates share at least one identical signature band"""
+
+    def __init__(self, num_perm: int = 128, threshold: float = 0.8):
+        self.num_perm = num_perm
+        self.threshold = threshold
+        self.bands, self.rows = self._choose_bands(num_perm, threshold)
+        self._buckets: List[Dict[bytes, List]] = [defaultdict(list) for _ in range(self.bands)]
+
+    @staticmethod
+    def _choose_bands(num_perm: int, threshold: float) -> Tuple[int, int]:
+        """
+        Pick (bands, rows) with the highest S-curve midpoint (1/b)^(1/r) that is
+        still at or below the threshold: favour recall, candidates are verified.
+        """
+        options = [(b, num_perm // b) for b in range(1, num_perm + 1) if num_perm % b == 0]
+        midpoint = lambda br: (1.0 / br[0]) ** (1.0 / br[1])
+        recall_safe = [br for br in options if midpoint(br) <= threshold]
+        return max(recall_safe, key=midpoint) if recall_safe else options[-1]
+
+    def _band_keys(self, signature: np.ndarray):
+        for band in range(self.bands):
+            yield band, signature[band * self.rows:(band + 1) * self.rows].tobytes()
+
+    def insert(self, key, signature: np.ndarray) -> None:
+        for band, band_key in self._band_keys(signature):
+            self._buckets[band][band_key].append(key)
+
+    def remove(self, key, signature: np.ndarray) -> None:
+        for band, band_key in self._band_keys(signature):
+            bucket = self._buckets[band].get(band_key)
+            if bucket and key in bucket:
+                bucket.remove(key)
+                if not bucket:
+                    del self._buckets[band][band_key]
+
+    def query(self, signature: np.ndarray) -> set:
+        candidates = set()
+        for band, band_key in self._band_keys(signature):
+            candidates.update(self._buckets[band].get(band_key, ()))
+        return candidates
+
+
+class DuplicateIndex:
+    """
+    Incremental near-duplicate detector.
+    ``add`` returns the key of the group representative a text duplicates,
+    or None when the text starts a new group (and becomes its representative).
+    ``remove`` forgets a whole group, so a streaming caller can bound memory.
+    """
+
+    def __init__(self, threshold: float = 0.85, num_perm: int = 128, shingle_size: int = 5):
+        self.threshold = threshold
+        self.hasher = MinHasher(num_perm=num_perm, shingle_size=shingle_size)
+        self.lsh = MinHashLSH(num_perm=num_perm, threshold=threshold)
+        self._signatures: Dict = {}
+        self._representative: Dict = {}
+        self._members: Dict = defaultdict(list)  # representative → every key in its group
+
+    def add(self, key, text: str) -> Optional[object]:
+        signature = self.hasher.signature(text)
+        best_key, best_similarity = None, self.threshold
+        for candidate in self.lsh.query(signature):
+            similarity = MinHasher.similarity(signature, self._signatures[candidate])
+            if similarity >= best_similarity:
+                best_key, best_similarity = candidate, similarity
+
+        self._signatures[key] = signature
+        self.lsh.insert(key, signature)
+        representative = self._representative[best_key] if best_key is not None else key
+        self._representative[key] = representative
+        self._members[representative].append(key)
+        return representative if representative != key else None
+
+    def remove(self, representative) -> None:
+        """Drop a group (by its representative's key) and all its signatures"""
+        for key in self._members.pop(representative, ()):
+            self.lsh.remove(key, self._signatures.pop(key))
+            del self._representative[key]
+
+    def __len__(self) -> int:
+        return len(self._signatures)
+
+
+# ----------------------------------------------
+# Resume-level helpers
+# ----------------------------------------------
+def deduplicate_resumes(resumes: List[Dict], threshold: float = 0.85) -> Tuple[List[Dict], Dict[int, List[Dict]]]:
+    """
+    Split parsed resumes into one representative per near-duplicate group.
+    Returns ``(representatives, duplicates)``. Representatives are copies
+    tagged with their input position as ``sequence`` (filenames are not
+    unique across archives); ``duplicates`` maps that sequence to the
+    resumes folded into it.
+    """
+    index = DuplicateIndex(threshold=threshold)
+    representatives, duplicates = [], defaultdict(list)
+    for i, resume in enumerate(resumes):
+        if resume['error'] or not resume['clean_text']:
+            representatives.append(resume)  # Left for the matcher to skip
+            continue
+        representative = index.add(i, resume['clean_text'])
+        if representative is None:
+            representatives.append(dict(resume, sequence=i))
+        else:
+            duplicates[representative].append(resume)
+    return representatives, dict(duplicates)
+
+
+def fan_out_duplicates(results: List[Dict], duplicates: Dict[int, List[Dict]]) -> List[Dict]:
+    """
+    List every folded duplicate right after its representative. A copy
+    inherits the whole result (scores and the skills / experience they were
+    computed from); only ``filename`` and ``duplicate_of`` are its own.
+    """
+    if not duplicates:
+        return results
+    expanded = []
+    for result in results:
+        group = duplicates.get(result.get('sequence'), [])
+        expanded.append(dict(result, duplicate_count=len(group)) if group else result)
+        for duplicate in group:
+            expanded.append(duplicate_result(result, duplicate))
+    return expanded
+
+
+def duplicate_result(representative_result: Dict, duplicate: Dict) -> Dict:
+    """Result row for a folded duplicate: the representative's, under the duplicate's filename"""
+    inherited = {k: v for k, v in representative_result.items() if k != 'duplicate_count'}
+    return dict(inherited, filename=duplicate['filename'], duplicate_of=representative_result['filename'])
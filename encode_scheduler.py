@@ -0,0 +1,147 @@
+import math
+import threading
+import time
+from typing import Callable, Dict, List, Optional
+
+import numpy as np
+
+
+_pinned_threads: Optional[int] = None
+_pin_lock = threading.Lock()
+
+
+def pin_torch_threads(num_threads: Optional[int]) -> Optional[int]:
+    """
+    Set torch intra-op threads once for the whole process and return the
+    pinned count. This is a process-wide setting, not a per-session one:
+    every session and scheduler in the process shares it. ``torch.set_num_threads``
+    is process-global, so per-call save/restore would race between concurrent
+    sessions; later calls keep the first setting.
+    """
+    global _pinned_threads
+    if not num_threads:
+        return _pinned_threads
+    with _pin_lock:
+        if _pinned_threads is None:
+            import torch
+            torch.set_num_threads(num_threads)
+            _pinned_threads = num_threads
+        elif _pinned_threads != num_threads:
+            print(f"⚠️ torch already pinned to {_pinned_threads} thread(s); ignoring request for {num_threads}")
+        return _pinned_threads
+
+
+class EncodeScheduler:
+    """
+    Length-bucketed batching for ``SentenceTransformer.encode``.
+
+    Texts are sorted by token length and grouped into buckets of similar
+    length, so little compute is wasted on padding. Each bucket's batch size
+    is derived from a memory budget (longer sequences → smaller batches),
+    and outputs are returned in the caller's original order.
+
+    ``num_threads`` goes through ``pin_torch_threads``: it applies to the
+    whole process, not to this scheduler or the session that created it.
+    """
+
+    def __init__(self, model, memory_budget_mb: float = 256.0, num_threads: Optional[int] = None,
+                 bucket_width: int = 32, max_batch_size: int = 128,
+                 stats_hook: Optional[Callable[[Dict], None]] = None, num_heads: int = 12):
+        self.model = model
+        self.memory_budget_bytes = memory_budget_mb * 1024 * 1024
+        self.num_threads = pin_torch_threads(num_threads)
+        self.bucket_width = bucket_width
+        self.max_batch_size = max_batch_size
+        self.stats_hook = stats_hook
+        self.num_heads = num_heads
+        self.last_stats: Dict = {}
+
+    # ----------------------------------------------
+    # Planning
+    # ----------------------------------------------
+    def token_lengths(self, texts: List[str]) -> List[int]:
+        """Token counts as the model will see them (special tokens, truncation)"""
+        max_length = getattr(self.model, "max_seq_length", 256)
+        tokenizer = getattr(self.model, "tokenizer", None)
+        if tokenizer is None:
+            return [min(len(t.split()) + 2, max_length) for t in texts]
+        encoded = tokenizer(texts, add_special_tokens=True, truncation=True, max_length=max_length)
+        return [len(ids) for ids in encoded["input_ids"]]
+
+    def bytes_per_sequence(self, padded_length: int) -> float:
+        """
+        Rough peak activation memory of one padded sequence in a forward pass.
+        Under inference each layer's activations are freed before the next
+        layer runs, so the peak is one layer's worth regardless of depth.
+        """
+        hidden = self.model.get_sentence_embedding_dimension() or 384
+        # Hidden states + 4x MLP intermediate + QKV, plus attention score matrices
+        linear = padded_length * hidden * 4 * 8
+        attention = self.num_heads * padded_length * padded_length * 4 * 2
+        return linear + attention
+
+    def plan_batches(self, lengths: List[int]) -> List[List[int]]:
+        """Group text indices into length buckets and budget-sized batches"""
+        order = sorted(range(len(lengths)), key=lambda i: lengths[i])
+        batches, current, current_bucket = [], [], None
+        batch_limit = self.max_batch_size
+
+        for i in order:
+            bucket = math.ceil(max(lengths[i], 1) / self.bucket_width)
+            if bucket != current_bucket:
+                if current:
+                    batches.append(current)
+                current, current_bucket = [], bucket
+                padded_length = bucket * self.bucket_width
+                batch_limit = int(self.memory_budget_bytes // self.bytes_per_sequence(padded_length))
+                batch_limit = max(1, min(self.max_batch_size, batch_limit))
+            current.append(i)
+            if len(current) >= batch_limit:
+                batches.append(current)
+                current = []
+        if current:
+            batches.append(current)
+        return batches
+
+    # ----------------------------------------------
+    # Encoding
+    # ----------------------------------------------
+    def encode(self, texts: List[str]) -> np.ndarray:
+        """Encode texts in planned batches; rows come back in input order"""
+        dim = self.model.get_sentence_embedding_dimension() or 0
+        if not texts:
+            return np.empty((0, dim), dtype=np.float32)
+
+        started = time.perf_counter()
+        lengths = self.token_lengths(texts)
+        batches = self.plan_batches(lengths)
+
+        output = None
+        real_tokens = padded_tokens = 0
+        for batch in batches:
+            embeddings = self.model.encode(
+                [texts[i] for i in batch], batch_size=len(batch),
+                convert_to_numpy=True, show_progress_bar=False,
+            )
+            if output is None:
+                output = np.empty((len(texts), embeddings.shape[1]), dtype=np.float32)
+            output[batch] = embeddings
+
+            batch_lengths = [lengths[i] for i in batch]
+            real_tokens += sum(batch_lengths)
+            padded_tokens += max(batch_lengths) * len(batch)
+
+        elapsed = time.perf_counter() - started
+        self.last_stats = {
+            "texts": len(texts),
+            "batches": len(batches),
+            "tokens": real_tokens,
+            "padded_tokens": padded_tokens,
+            "padding_ratio": 1.0 - real_tokens / padded_tokens if padded_tokens else 0.0,
+            "seconds": elapsed,
+            "tokens_per_sec": real_tokens / elapsed if elapsed > 0 else 0.0,
+            "num_threads": self.num_threads,
+        }
+        if self.stats_hook:
+            self.stats_hook(self.last_stats)
+        return output
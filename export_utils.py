@@ -1,6 +1,10 @@
 import pandas as pd
-from typing import List, Dict
+from typing import List, Dict, Optional
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+import hashlib
 import io
+import threading
 
 class ExportUtils:
     
@@ -21,7 +25,8 @@ class ExportUtils:
                 'Experience_Score': f"{result['experience_score']:.3f}",
                 'Years_Experience': result['experience_years'],
                 'Skills_Found': ', '.join(result['skills_found'][:10]),  # Limit to first 10 skills
-                'Matching_Keywords': ', '.join(result['matching_keywords'])
+                'Matching_Keywords': ', '.join(result['matching_keywords']),
+                'Duplicate_Of': result.get('duplicate_of', '')
             })
         
         return pd.DataFrame(export_data)
@@ -57,3 +62,60 @@ class ExportUtils:
         """Export results to CSV format"""
         df = ExportUtils.create_results_dataframe(results)
         return df.to_csv(index=False)
+
+
+class ExportJobs:
+    """
+    On-demand export generation, cached per result set.
+
+    Nothing is built until a format is requested; the file is then produced
+    on a background thread and kept (as a Future) under the hash of the
+    result set, so reruns and other sessions showing the same results reuse it.
+    """
+
+    FORMATS = {
+        "excel": ExportUtils.export_to_excel,
+        "csv": ExportUtils.export_to_csv,
+    }
+
+    def __init__(self, max_entries: int = 32, max_workers: int = 2):
+        self.max_entries = max_entries
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="export")
+        self._jobs: "OrderedDict[tuple, Future]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def results_hash(results: List[Dict]) -> str:
+        """Hash of exactly the fields that end up in an export"""
+        digest = hashlib.sha256()
+        for result in results:
+            digest.update(repr((
+                result['filename'], result['combined_score'], result['similarity_score'],
+                result['keyword_score'], result['experience_score'], result['experience_years'],
+                result['skills_found'][:10], list(result['matching_keywords']),
+                result.get('duplicate_of', ''),
+            )).encode("utf-8"))
+        return digest.hexdigest()
+
+    def lookup(self, results: List[Dict], fmt: str) -> Optional[Future]:
+        """The export job for these results, or None if it was never requested"""
+        key = (self.results_hash(results), fmt)
+        with self._lock:
+            job = self._jobs.get(key)
+            if job is not None:
+                self._jobs.move_to_end(key)
+            return job
+
+    def request(self, results: List[Dict], fmt: str) -> Future:
+        """Start building an export in the background (no-op if already requested)"""
+        key = (self.results_hash(results), fmt)
+        with self._lock:
+            job = self._jobs.get(key)
+            if job is None or (job.done() and job.exception() is not None):
+                # Snapshot the list: callers may keep appending to theirs
+                job = self._executor.submit(self.FORMATS[fmt], list(results))
+                self._jobs[key] = job
+            self._jobs.move_to_end(key)
+            while len(self._jobs) > self.max_entries:
+                self._jobs.popitem(last=False)
+            return job
@@ -0,0 +1,396 @@
+"""
+Concurrent-session load test for the analysis core.
+
+Each simulated session behaves like a recruiter in the Streamlit app: it
+uploads a batch of PDF resumes, picks a job description and runs the same
+parse → encode → score path as ``analyze_resumes`` (streaming pipeline by
+default, or the phased batch path), then thinks for a moment and repeats.
+
+    python load_test.py --sessions 20 --analyses 3 --resumes 10
+    python load_test.py --sessions 20 --stub-encoder --stub-latency-ms 5 --cpu-budget 8
+    python load_test.py --sessions 20 --shared-model --json load_report.json
+
+Reports throughput, latency percentiles, RSS growth and per-session
+fairness (Jain's index: 1.0 = every session got the same service).
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import random
+import re
+import threading
+import time
+import zlib
+from typing import Dict, List, Optional
+
+import numpy as np
+
+SKILLS = [
+    "python", "java", "javascript", "sql", "mysql", "mongodb", "react", "nodejs", "aws", "azure",
+    "docker", "flask", "django", "git", "linux", "machine learning", "deep learning", "nlp",
+    "tensorflow", "pytorch", "excel", "tableau", "jira", "project management", "leadership",
+    "communication", "testing", "debugging", "cloud", "api", "finance", "marketing", "sales",
+]
+ROLES = ["Backend Developer", "Data Scientist", "ML Engineer", "Java Developer", "Frontend Engineer",
+         "DevOps Engineer", "Business Analyst", "QA Engineer", "Product Manager", "Sales Executive"]
+FILLER = ("designed built maintained improved deployed scalable services pipelines dashboards reports "
+          "customers stakeholders teams production reliability performance security documentation "
+          "features releases migrations integrations automation monitoring analytics").split()
+
+
+# ----------------------------------------------
+# Synthetic inputs
+# ----------------------------------------------
+class NamedBytesIO(io.BytesIO):
+    """In-memory stand-in for a Streamlit UploadedFile"""
+
+    def __init__(self, data: bytes, name: str):
+        super().__init__(data)
+        self.name = name
+
+
+def synthetic_resume_text(rng: random.Random, index: int) -> str:
+    role = rng.choice(ROLES)
+    years = rng.randint(0, 12)
+    start = 2024 - years
+    skills = rng.sample(SKILLS, rng.randint(4, 12))
+    lines = [
+        f"Candidate {index}", f"{role}", "",
+        "SUMMARY",
+        f"{role} with {years} years of experience in {', '.join(skills[:3])}.", "",
+        "EXPERIENCE",
+    ]
+    for job in range(rng.randint(1, 4)):
+        lines.append(f"{rng.choice(ROLES)} at Company {rng.randint(1, 500)} ({start + job} - present)")
+        for _ in range(rng.randint(2, 5)):
+            lines.append("- " + " ".join(rng.choice(FILLER + skills) for _ in range(rng.randint(8, 18))))
+    lines += ["", "SKILLS", ", ".join(skills), "", "EDUCATION", f"B.Sc. Computer Science, {start - 4}"]
+    return "\n".join(lines)
+
+
+def make_pdf(text: str) -> bytes:
+    """One-page (or more) PDF with the given text, via PyMuPDF"""
+    import fitz
+
+    document = fitz.open()
+    lines = text.splitlines()
+    for start in range(0, len(lines), 55):
+        page = document.new_page()
+        page.insert_textbox(fitz.Rect(50, 50, 560, 800), "\n".join(lines[start:start + 55]), fontsize=10)
+    data = document.tobytes()
+    document.close()
+    return data
+
+
+def load_job_descriptions(path: str = "sample_job_descriptions") -> List[str]:
+    """Split the bundled sample file into individual JDs; synthesize if missing"""
+    if os.path.exists(path):
+        with open(path, encoding="utf-8") as f:
+            blocks = [b.strip() for b in re.split(r"\n\s*\n\s*\n", f.read()) if len(b.strip()) > 200]
+        if blocks:
+            return blocks
+    rng = random.Random(7)
+    return [
+        f"We're Hiring: {role}\nRequirements: {rng.randint(1, 6)}+ years of experience with "
+        f"{', '.join(rng.sample(SKILLS, 6))}. Strong communication and teamwork."
+        for role in ROLES
+    ]
+
+
+class StubEncoder:
+    """
+    Deterministic hashed bag-of-words encoder with the SentenceTransformer
+    surface the matcher uses. ``latency_ms_per_text`` sleeps (releasing the
+    GIL, like torch inference) to mimic model cost without loading a model.
+    """
+
+    max_seq_length = 256
+    tokenizer = None
+
+    def __init__(self, dim: int = 384, latency_ms_per_text: float = 0.0):
+        self.dim = dim
+        self.latency_ms_per_text = latency_ms_per_text
+
+    def get_sentence_embedding_dimension(self) -> int:
+        return self.dim
+
+    def encode(self, texts, batch_size: int = 32, convert_to_numpy: bool = True,
+               show_progress_bar: bool = False, **kwargs) -> np.ndarray:
+        if isinstance(texts, str):
+            return self.encode([texts])[0]
+        if self.latency_ms_per_text:
+            time.sleep(self.latency_ms_per_text * len(texts) / 1000.0)
+        output = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for row, text in enumerate(texts):
+            for word in text.split()[:self.max_seq_length]:
+                output[row, zlib.crc32(word.encode("utf-8")) % self.dim] += 1.0
+        output /= np.maximum(np.linalg.norm(output, axis=1, keepdims=True), 1e-12)
+        return output
+
+
+# ----------------------------------------------
+# Measurement helpers
+# ----------------------------------------------
+def current_rss_mb() -> float:
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 1024 ** 2
+    except (OSError, ValueError, AttributeError):
+        pass
+    try:
+        # Not Linux: fall back to peak RSS (KB on Linux, bytes on macOS)
+        import resource
+    except ImportError:
+        return 0.0  # Windows: no RSS figures without extra dependencies
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / 1024 ** 2 if peak > 1 << 32 else peak / 1024
+
+
+class RssSampler(threading.Thread):
+    def __init__(self, interval: float = 0.2):
+        super().__init__(name="rss-sampler", daemon=True)
+        self.interval = interval
+        self.samples: List[tuple] = []
+        self._stop_event = threading.Event()
+
+    def run(self) -> None:
+        while not self._stop_event.is_set():
+            self.samples.append((time.perf_counter(), current_rss_mb()))
+            self._stop_event.wait(self.interval)
+
+    def stop(self) -> None:
+        self._stop_event.set()
+        self.join()
+        self.samples.append((time.perf_counter(), current_rss_mb()))
+
+
+def percentile(values: List[float], q: float) -> float:
+    return float(np.percentile(values, q)) if values else 0.0
+
+
+def jain_index(values: List[float]) -> float:
+    """(Σx)² / (n·Σx²): 1.0 when all equal, 1/n when one session gets everything"""
+    values = [v for v in values if v > 0]
+    if not values:
+        return 0.0
+    return sum(values) ** 2 / (len(values) * sum(v * v for v in values))
+
+
+# ----------------------------------------------
+# Load test
+# ----------------------------------------------
+class LoadTest:
+    """Drive many concurrent simulated sessions against the analysis core"""
+
+    def __init__(self, sessions: int = 20, analyses: int = 3, resumes_per_analysis: int = 10,
+                 mode: str = "pipeline", stub_encoder: bool = False, stub_latency_ms: float = 0.0,
+                 shared_model: bool = False, cpu_budget: Optional[int] = None,
+                 ramp_seconds: float = 1.0, think_seconds: float = 0.5, seed: int = 42):
+        self.sessions = sessions
+        self.analyses = analyses
+        self.resumes_per_analysis = resumes_per_analysis
+        self.mode = mode
+        self.stub_encoder = stub_encoder
+        self.stub_latency_ms = stub_latency_ms
+        self.shared_model = shared_model
+        self.cpu_budget = cpu_budget
+        self.ramp_seconds = ramp_seconds
+        self.think_seconds = think_seconds
+        self.seed = seed
+        self.admission = None
+        self._shared_model = None
+
+    def build_corpus(self, size: int) -> List[tuple]:
+        rng = random.Random(self.seed)
+        return [(f"candidate_{i:04d}.pdf", make_pdf(synthetic_resume_text(rng, i))) for i in range(size)]
+
+    def _new_model(self):
+        if self.stub_encoder:
+            return StubEncoder(latency_ms_per_text=self.stub_latency_ms)
+        from sentence_transformers import SentenceTransformer
+        return SentenceTransformer("all-MiniLM-L6-v2")
+
+    def _new_session(self, session_id: str):
+        """Per-session parser + matcher, as ``main()`` creates them in session_state"""
+        from matcher import ResumeJobMatcher
+        from resume_parser import ResumeParser
+
+        if self.shared_model:
+            model = self._shared_model
+        else:
+            model = self._new_model()
+        parser, matcher = ResumeParser(), ResumeJobMatcher(model=model)
+        if self.admission is not None:
+            if not self.stub_encoder:
+                matcher.configure_encoding(num_threads=self.admission.encode_threads)
+            self.admission.wrap(parser, "parse_resume", session_id, "parse")
+            self.admission.wrap(matcher, "encode_texts", session_id, "encode", cost=self.admission.encode_threads)
+        return parser, matcher
+
+    def _analyze(self, parser, matcher, uploads: List[NamedBytesIO], job_description: str) -> List[Dict]:
+        """The core of ``analyze_resumes`` (no Streamlit widgets)"""
+        from bulk_ingest import ArchiveIngestor
+        from pipeline import AnalysisPipeline, parse_files
+
+        if self.mode == "pipeline":
+            final = None
+            for final in AnalysisPipeline(matcher).run(parse_files(parser, uploads, ArchiveIngestor()),
+                                                       job_description):
+                pass
+            return final["results"]
+        parsed = [r for r in parse_files(parser, uploads) if not r["error"]]
+        return matcher.calculate_similarity_score(parsed, job_description)
+
+    def _session(self, index: int, corpus: List[tuple], job_descriptions: List[str],
+                 start_barrier: threading.Barrier, records: List[Dict]) -> None:
+        rng = random.Random(self.seed + index)
+        session_id = f"session-{index:02d}"
+        start_barrier.wait()
+        time.sleep(self.ramp_seconds * index / max(self.sessions, 1))
+        try:
+            parser, matcher = self._new_session(session_id)
+        except Exception as e:
+            records.append({"session": session_id, "ok": False, "error": f"setup: {e}"})
+            return
+
+        for run in range(self.analyses):
+            uploads = [NamedBytesIO(data, name)
+                       for name, data in rng.sample(corpus, self.resumes_per_analysis)]
+            job_description = rng.choice(job_descriptions)
+            started = time.perf_counter()
+            try:
+                results = self._analyze(parser, matcher, uploads, job_description)
+                error = None
+            except Exception as e:
+                results, error = [], f"{type(e).__name__}: {e}"
+            finished = time.perf_counter()
+            records.append({
+                "session": session_id, "run": run, "ok": error is None, "error": error,
+                "started": started, "finished": finished, "latency": finished - started,
+                "resumes": len(uploads), "ranked": len(results),
+            })
+            time.sleep(self.think_seconds * rng.uniform(0.5, 1.5))
+
+    def run(self, verbose: bool = False) -> Dict:
+        corpus = self.build_corpus(max(self.resumes_per_analysis * 4, 40))
+        job_descriptions = load_job_descriptions()
+        if self.cpu_budget:
+            from admission import CpuAdmission
+            self.admission = CpuAdmission(cpu_budget=self.cpu_budget)
+        if self.shared_model:
+            self._shared_model = self._new_model()
+
+        records: List[Dict] = []
+        barrier = threading.Barrier(self.sessions + 1)
+        threads = [
+            threading.Thread(target=self._session, args=(i, corpus, job_descriptions, barrier, records),
+                             name=f"load-session-{i}", daemon=True)
+            for i in range(self.sessions)
+        ]
+        sampler = RssSampler()
+        # The parser and matcher print per resume; keep the report readable
+        quiet = contextlib.nullcontext() if verbose else contextlib.redirect_stdout(io.StringIO())
+        with quiet:
+            for thread in threads:
+                thread.start()
+            sampler.start()
+            started = time.perf_counter()
+            barrier.wait()
+            for thread in threads:
+                thread.join()
+            elapsed = time.perf_counter() - started
+            sampler.stop()
+        return self.report(records, elapsed, sampler.samples)
+
+    def report(self, records: List[Dict], elapsed: float, rss_samples: List[tuple]) -> Dict:
+        completed = [r for r in records if r["ok"]]
+        latencies = [r["latency"] for r in completed]
+        errors = [r for r in records if not r["ok"]]
+
+        per_session: Dict[str, Dict] = {}
+        for r in completed:
+            s = per_session.setdefault(r["session"], {"latencies": [], "resumes": 0, "first": r["started"],
+                                                      "last": r["finished"]})
+            s["latencies"].append(r["latency"])
+            s["resumes"] += r["resumes"]
+            s["first"] = min(s["first"], r["started"])
+            s["last"] = max(s["last"], r["finished"])
+        # Resumes per busy second: what each recruiter experienced while analyses ran
+        session_throughput = [s["resumes"] / sum(s["latencies"]) for s in per_session.values() if sum(s["latencies"])]
+        session_mean_latency = [float(np.mean(s["latencies"])) for s in per_session.values()]
+
+        rss = [mb for _, mb in rss_samples] or [0.0]
+        return {
+            "config": {
+                "sessions": self.sessions, "analyses_per_session": self.analyses,
+                "resumes_per_analysis": self.resumes_per_analysis, "mode": self.mode,
+                "encoder": "stub" if self.stub_encoder else "all-MiniLM-L6-v2",
+                "shared_model": self.shared_model, "cpu_budget": self.cpu_budget,
+            },
+            "wall_seconds": round(elapsed, 2),
+            "analyses_completed": len(completed),
+            "analyses_failed": len(errors),
+            "errors": sorted({e["error"] for e in errors})[:10],
+            "throughput": {
+                "analyses_per_sec": round(len(completed) / elapsed, 3) if elapsed else 0.0,
+                "resumes_per_sec": round(sum(r["resumes"] for r in completed) / elapsed, 2) if elapsed else 0.0,
+            },
+            "latency_s": {
+                "p50": round(percentile(latencies, 50), 3),
+                "p95": round(percentile(latencies, 95), 3),
+                "p99": round(percentile(latencies, 99), 3),
+                "max": round(max(latencies), 3) if latencies else 0.0,
+            },
+            "rss_mb": {
+                "start": round(rss[0], 1),
+                "peak": round(max(rss), 1),
+                "end": round(rss[-1], 1),
+                "growth": round(rss[-1] - rss[0], 1),
+            },
+            "fairness": {
+                "jain_throughput": round(jain_index(session_throughput), 4),
+                "jain_latency": round(jain_index(session_mean_latency), 4),
+                "slowest_vs_fastest_session": round(max(session_mean_latency) / min(session_mean_latency), 2)
+                if session_mean_latency and min(session_mean_latency) > 0 else 0.0,
+            },
+            "admission": self.admission.metrics() if self.admission is not None else None,
+        }
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description="Concurrent-session load test for the analysis core")
+    arg_parser.add_argument("--sessions", type=int, default=20)
+    arg_parser.add_argument("--analyses", type=int, default=3, help="Analyses per session")
+    arg_parser.add_argument("--resumes", type=int, default=10, help="Resumes uploaded per analysis")
+    arg_parser.add_argument("--mode", choices=["pipeline", "batch"], default="pipeline",
+                            help="Streaming pipeline (app default) or phased batch scoring")
+    arg_parser.add_argument("--stub-encoder", action="store_true", help="Hashed bag-of-words instead of MiniLM")
+    arg_parser.add_argument("--stub-latency-ms", type=float, default=0.0, help="Simulated model time per text")
+    arg_parser.add_argument("--shared-model", action="store_true", help="One encoder for all sessions")
+    arg_parser.add_argument("--cpu-budget", type=int, default=None, help="Route work through CpuAdmission")
+    arg_parser.add_argument("--ramp-seconds", type=float, default=1.0)
+    arg_parser.add_argument("--think-seconds", type=float, default=0.5)
+    arg_parser.add_argument("--json", default=None, help="Also write the report to this file")
+    arg_parser.add_argument("--verbose", action="store_true", help="Keep parser / matcher output")
+    args = arg_parser.parse_args()
+
+    load_test = LoadTest(
+        sessions=args.sessions, analyses=args.analyses, resumes_per_analysis=args.resumes,
+        mode=args.mode, stub_encoder=args.stub_encoder, stub_latency_ms=args.stub_latency_ms,
+        shared_model=args.shared_model, cpu_budget=args.cpu_budget,
+        ramp_seconds=args.ramp_seconds, think_seconds=args.think_seconds,
+    )
+    print(f"🚀 {args.sessions} session(s) x {args.analyses} analys(es) x {args.resumes} resume(s)...")
+    report = load_test.run(verbose=args.verbose)
+    print(json.dumps(report, indent=2))
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"💾 Report written to {args.json}")
+
+
+if __name__ == "__main__":
+    main()
@@ -3,12 +3,17 @@ from sklearn.feature_extraction.text import ENGLISH_STOP_WORDS
 import numpy as np
 import re
 from typing import List, Dict
+from encode_scheduler import EncodeScheduler
+from skill_taxonomy import SkillTaxonomy
 
 class ResumeJobMatcher:
-    def __init__(self):
-        """Initialize Sentence-BERT model and settings"""
+    def __init__(self, model_name: str = 'all-MiniLM-L6-v2', model=None):
+        """Initialize Sentence-BERT model and settings (``model`` reuses an already loaded encoder)"""
         print("🔹 Initializing Sentence-BERT model for semantic similarity...")
-        self.model = SentenceTransformer('all-MiniLM-L6-v2')
+        self.model_name = model_name
+        self.model = model if model is not None else SentenceTransformer(model_name)
+        self.encode_scheduler = EncodeScheduler(self.model)
+        self.taxonomy = None  # Optional SkillTaxonomy for canonical skills / skill gaps
         self.results_history = []  # For adaptive learning
 
     # ----------------------------------------------
@@ -119,14 +124,46 @@ class ResumeJobMatcher:
             return 0.6, 0.3, 0.1
 
     # ----------------------------------------------
-    # Core Matching Logic
+    # Encoding
     # ----------------------------------------------
-    def calculate_similarity_score(self, resumes: List[Dict], job_description: str) -> List[Dict]:
-        """Compute similarity using Sentence-BERT with domain-aware and adaptive scoring"""
+    def configure_encoding(self, **scheduler_options) -> None:
+        """Replace the encode scheduler (memory budget, torch threads, stats hook, ...)"""
+        self.encode_scheduler = EncodeScheduler(self.model, **scheduler_options)
+
+    def encoding_text(self, resume: Dict) -> str:
+        """Text the encoder sees: the parser's focused sections when available, else the whole resume"""
+        # In-process parses carry the layout object; JSON round-trips carry the materialized text
+        text = resume.get('encode_text') or getattr(resume.get('sections'), 'encode_text', None)
+        return self.preprocess_text(text or resume['clean_text'])
+
+    def encode_texts(self, texts: List[str]) -> np.ndarray:
+        """Encode preprocessed texts into float32 embeddings via the length-bucketed scheduler"""
+        return self.encode_scheduler.encode(texts)
+
+    # ----------------------------------------------
+    # Canonical Skills (taxonomy)
+    # ----------------------------------------------
+    def attach_taxonomy(self, taxonomy) -> None:
+        """Enable (or, with None, disable) semantic skill matching; results then carry canonical skills and a skill gap"""
+        self.taxonomy = taxonomy
+
+    def tag_canonical_skills(self, resumes: List[Dict]) -> None:
+        """Match resumes against the taxonomy in one batch (memoized on each resume)"""
+        if self.taxonomy is None:
+            return
+        untagged = [r for r in resumes if 'canonical_skills' not in r and r.get('clean_text')]
+        if untagged:
+            matches = self.taxonomy.match_many([r['clean_text'] for r in untagged], self.encode_texts)
+            for resume, found in zip(untagged, matches):
+                resume['canonical_skills'] = sorted(found)
 
+    # ----------------------------------------------
+    # Job Context (weights, keywords, requirements)
+    # ----------------------------------------------
+    def build_job_context(self, job_description: str) -> Dict:
+        """Precompute everything about the JD that every resume is scored against"""
         jd_clean = self.preprocess_text(job_description)
         jd_keywords = self.extract_keywords(jd_clean)
-        jd_embedding = self.model.encode(jd_clean, convert_to_tensor=True)
 
         # 🧭 Detect job domain
         detected_domain = self.detect_job_domain(job_description)
@@ -158,47 +195,175 @@ class ResumeJobMatcher:
 
         print(f"⚙️ Domain: {detected_domain} | Semantic: {semantic_weight:.2f}, Keyword: {keyword_weight:.2f}, Exp: {exp_weight:.2f}")
 
+        job_context = {
+            "jd_clean": jd_clean,
+            "jd_keywords": jd_keywords,
+            "jd_word_freq": {w: jd_clean.count(w) for w in jd_keywords},
+            "jd_exp": self.extract_required_experience(job_description),
+            "domain": detected_domain,
+            "weights": (semantic_weight, keyword_weight, exp_weight),
+        }
+        if self.taxonomy is not None:
+            # 🧩 Canonical skills the JD asks for, strongest match first
+            jd_skills = self.taxonomy.match(jd_clean, self.encode_texts)
+            job_context["jd_skills"] = sorted(jd_skills, key=jd_skills.get, reverse=True)
+        return job_context
+
+    def score_cheap_components(self, resume: Dict, job_context: Dict) -> Dict:
+        """Keyword and experience scores: everything except the transformer encode"""
+        jd_word_freq = job_context["jd_word_freq"]
+
+        # Stored pool records carry precomputed keywords; fresh parses don't
+        resume_keywords = resume.get('keywords')
+        if resume_keywords is None:
+            resume_keywords = self.extract_keywords(self.preprocess_text(resume['clean_text']))
+
+        # --- Keyword match (weighted)
+        matching_keywords = set(resume_keywords).intersection(set(job_context["jd_keywords"]))
+        keyword_weighted_score = sum(jd_word_freq.get(kw, 1) for kw in matching_keywords)
+        keyword_score = keyword_weighted_score / (sum(jd_word_freq.values()) + 1e-6)
+
+        # --- Experience relevance
+        exp_score = self.calculate_experience_score(resume['experience_years'], job_context["jd_exp"])
+
+        return {
+            "keyword_score": keyword_score,
+            "experience_score": exp_score,
+            "matching_keywords": matching_keywords,
+        }
+
+    def score_cheap_components_batch(self, resumes: List[Dict], job_context: Dict) -> List[Dict]:
+        """
+        Vectorized keyword and experience scores for a whole pool: resume keywords
+        become one boolean row per resume over the JD's keywords, and the weighted
+        scores for every resume are a single matrix product.
+        """
+        if not resumes:
+            return []
+        jd_word_freq = job_context["jd_word_freq"]
+        jd_keywords = job_context["jd_keywords"]
+        jd_columns = {kw: column for column, kw in enumerate(jd_keywords)}
+
+        # Stored pool records carry precomputed keywords; fresh parses don't
+        rows, columns, matching_keywords = [], [], [set() for _ in resumes]
+        for row, resume in enumerate(resumes):
+            keywords = resume.get('keywords')
+            if keywords is None:
+                keywords = self.extract_keywords(self.preprocess_text(resume['clean_text']))
+            for kw in keywords:
+                column = jd_columns.get(kw)
+                if column is not None:
+                    rows.append(row)
+                    columns.append(column)
+                    matching_keywords[row].add(kw)
+        hits = np.zeros((len(resumes), len(jd_keywords)), dtype=bool)
+        hits[rows, columns] = True
+
+        # --- Keyword match (weighted), one column per JD keyword
+        jd_weights = np.array([jd_word_freq.get(kw, 1) for kw in jd_keywords], dtype=np.float64)
+        keyword_scores = (hits @ jd_weights) / (sum(jd_word_freq.values()) + 1e-6)
+
+        return [
+            {
+                "keyword_score": score,
+                # --- Experience relevance
+                "experience_score": self.calculate_experience_score(resume['experience_years'], job_context["jd_exp"]),
+                "matching_keywords": matched,
+            }
+            for resume, score, matched in zip(resumes, keyword_scores.tolist(), matching_keywords)
+        ]
+
+    def score_resume(self, resume: Dict, job_context: Dict, semantic_score: float,
+                     components: Dict = None) -> Dict:
+        """Combine a precomputed semantic score with keyword and experience scores"""
+        semantic_weight, keyword_weight, exp_weight = job_context["weights"]
+        if components is None:
+            components = self.score_cheap_components(resume, job_context)
+        keyword_score = components["keyword_score"]
+        exp_score = components["experience_score"]
+        matching_keywords = components["matching_keywords"]
+
+        # --- Final combined score
+        combined_score = (
+            semantic_score * semantic_weight +
+            keyword_score * keyword_weight +
+            exp_score * exp_weight
+        )
+
+        return {
+            "filename": resume["filename"],
+            "similarity_score": semantic_score,
+            "keyword_score": keyword_score,
+            "experience_score": exp_score,
+            "combined_score": combined_score,
+            "skills_found": resume["skills"],
+            "experience_years": resume["experience_years"],
+            "matching_keywords": list(matching_keywords),
+            **self._skill_gap_fields(resume, job_context),
+            # Input position, when the caller numbered its resumes (dedup fan-out)
+            **({"sequence": resume["sequence"]} if "sequence" in resume else {}),
+        }
+
+    def _skill_gap_fields(self, resume: Dict, job_context: Dict) -> Dict:
+        if "jd_skills" not in job_context:
+            return {}
+        canonical_skills = resume.get('canonical_skills', [])
+        return {
+            "canonical_skills": canonical_skills,
+            # Static: sharded workers score with the coordinator's JD skills but no taxonomy
+            "skill_gap": SkillTaxonomy.skill_gap(job_context["jd_skills"], canonical_skills),
+        }
+
+    # ----------------------------------------------
+    # Core Matching Logic
+    # ----------------------------------------------
+    def calculate_similarity_score(self, resumes: List[Dict], job_description: str) -> List[Dict]:
+        """Compute similarity using Sentence-BERT with domain-aware and adaptive scoring"""
+
+        job_context = self.build_job_context(job_description)
+        jd_embedding = self.encode_texts([job_context["jd_clean"]])
+
+        valid = [r for r in resumes if not r['error'] and r['clean_text']]
+        resume_embeddings = self.encode_texts([self.encoding_text(r) for r in valid])
+
+        # --- Semantic similarity (one JD-vs-all product)
+        semantic_scores = util.cos_sim(jd_embedding, resume_embeddings)[0] if valid else []
+
+        components = self.score_cheap_components_batch(valid, job_context)
+        self.tag_canonical_skills(valid)
+
         results = []
-        jd_word_freq = {w: jd_clean.count(w) for w in jd_keywords}
-
-        for resume in resumes:
-            if resume['error'] or not resume['clean_text']:
-                continue
-
-            resume_text = self.preprocess_text(resume['clean_text'])
-            resume_keywords = self.extract_keywords(resume_text)
-            resume_embedding = self.model.encode(resume_text, convert_to_tensor=True)
-
-            # --- Semantic similarity
-            semantic_score = float(util.cos_sim(jd_embedding, resume_embedding)[0][0])
-
-            # --- Keyword match (weighted)
-            matching_keywords = set(resume_keywords).intersection(set(jd_keywords))
-            keyword_weighted_score = sum(jd_word_freq.get(kw, 1) for kw in matching_keywords)
-            keyword_score = keyword_weighted_score / (sum(jd_word_freq.values()) + 1e-6)
-
-            # --- Experience relevance
-            jd_exp = self.extract_required_experience(job_description)
-            exp_score = self.calculate_experience_score(resume['experience_years'], jd_exp)
-
-            # --- Final combined score
-            combined_score = (
-                semantic_score * semantic_weight +
-                keyword_score * keyword_weight +
-                exp_score * exp_weight
-            )
-
-            results.append({
-                "filename": resume["filename"],
-                "similarity_score": semantic_score,
-                "keyword_score": keyword_score,
-                "experience_score": exp_score,
-                "combined_score": combined_score,
-                "skills_found": resume["skills"],
-                "experience_years": resume["experience_years"],
-                "matching_keywords": list(matching_keywords),
-            })
+        for resume, semantic_score, resume_components in zip(valid, semantic_scores, components):
+            results.append(self.score_resume(resume, job_context, float(semantic_score), resume_components))
 
         results.sort(key=lambda x: x["combined_score"], reverse=True)
         self.results_history = results  # 🧠 store for adaptive tuning
         return results
+
+    # ----------------------------------------------
+    # Talent Pool Ranking (precomputed embeddings)
+    # ----------------------------------------------
+    def rank_pool(self, records: List[Dict], embeddings: np.ndarray, job_description: str,
+                  top_k: int = None) -> List[Dict]:
+        """
+        Rank stored candidates using their precomputed, L2-normalized embeddings.
+        ``embeddings`` may be a read-only memmap; it is only read, never copied.
+        It may also be a compressed vector store (quantization.py) scored
+        directly against the float32 JD vector.
+        """
+        job_context = self.build_job_context(job_description)
+        jd_embedding = self.encode_texts([job_context["jd_clean"]])[0]
+        jd_embedding /= (np.linalg.norm(jd_embedding) + 1e-12)
+
+        if hasattr(embeddings, "scores"):
+            semantic_scores = embeddings.scores(jd_embedding)
+        else:
+            semantic_scores = np.asarray(embeddings @ jd_embedding, dtype=np.float32)
+
+        components = self.score_cheap_components_batch(records, job_context)
+        results = [
+            self.score_resume(record, job_context, float(semantic_score), record_components)
+            for record, semantic_score, record_components in zip(records, semantic_scores, components)
+        ]
+        results.sort(key=lambda x: x["combined_score"], reverse=True)
+        return results[:top_k] if top_k else results
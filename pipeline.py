@@ -0,0 +1,266 @@
+"""
+Streaming parse → encode → score pipeline with bounded queues.
+
+    parse thread ──[parse queue]──▶ encode thread ──[score queue]──▶ caller
+
+Each queue has a fixed capacity, so a slow stage applies backpressure to the
+one before it and only a bounded number of parsed resumes (with their full
+text) exist at any moment. The caller's thread does the scoring and receives
+ranking snapshots while resumes are still being parsed and encoded.
+"""
+
+import heapq
+import queue
+import threading
+import time
+from collections import deque
+from typing import Dict, Iterable, Iterator, List, Optional
+
+from dedup import DuplicateIndex, duplicate_result
+
+_DONE = object()
+
+
+class _StageFailed:
+    def __init__(self, error: BaseException):
+        self.error = error
+
+
+def parse_files(parser, files: Iterable, ingestor=None) -> Iterator[Dict]:
+    """
+    Lazily parse uploaded files (anything with ``.name`` and a file interface).
+    Archives are streamed member by member when an ArchiveIngestor is given.
+    Failures come back as parser-shaped dicts with ``error`` set.
+    """
+    for uploaded_file in files:
+        if hasattr(uploaded_file, "seek"):
+            uploaded_file.seek(0)
+        if ingestor is not None and ingestor.is_archive(uploaded_file.name):
+            for parsed in ingestor.ingest(parser, uploaded_file, uploaded_file.name, keep_raw_text=False):
+                yield parsed
+            continue
+        try:
+            parsed = parser.parse_resume(uploaded_file, uploaded_file.name)
+        except Exception as e:
+            parsed = {
+                'filename': uploaded_file.name,
+                'raw_text': '',
+                'clean_text': '',
+                'skills': [],
+                'experience_years': 0,
+                'error': f"Error parsing resume: {str(e)}"
+            }
+        parsed['raw_text'] = ''  # Never needed downstream
+        yield parsed
+
+
+class AnalysisPipeline:
+    """Overlaps PDF parsing, model inference and scoring with backpressure"""
+
+    def __init__(self, matcher, queue_size: int = 16, encode_batch_size: int = 16,
+                 dedup_threshold: Optional[float] = 0.85, keep_top_k: Optional[int] = None,
+                 snapshot_interval: float = 0.5):
+        self.matcher = matcher
+        self.queue_size = queue_size
+        self.encode_batch_size = encode_batch_size
+        self.dedup_threshold = dedup_threshold
+        self.keep_top_k = keep_top_k
+        self.snapshot_interval = snapshot_interval
+        self._stop = threading.Event()
+        # Sequences that fell out of the top-K (score thread → encode thread)
+        self._evicted: deque = deque()
+
+    # ----------------------------------------------
+    # Queue helpers (stop-aware blocking)
+    # ----------------------------------------------
+    def _put(self, q: queue.Queue, item) -> bool:
+        while not self._stop.is_set():
+            try:
+                q.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    # ----------------------------------------------
+    # Stages
+    # ----------------------------------------------
+    def _parse_stage(self, parsed_stream: Iterable[Dict], parse_queue: queue.Queue) -> None:
+        try:
+            for sequence, parsed in enumerate(parsed_stream):
+                parsed['raw_text'] = ''
+                if not self._put(parse_queue, (sequence, parsed)):
+                    return
+            self._put(parse_queue, _DONE)
+        except BaseException as e:
+            self._put(parse_queue, _StageFailed(e))
+
+    def _encode_stage(self, parse_queue: queue.Queue, score_queue: queue.Queue, jd_embedding) -> None:
+        duplicate_index = DuplicateIndex(threshold=self.dedup_threshold) if self.dedup_threshold else None
+        batch: List = []
+
+        def flush() -> bool:
+            if not batch:
+                return True
+            texts = [self.matcher.encoding_text(resume) for _, resume in batch]
+            embeddings = self.matcher.encode_texts(texts)
+            self.matcher.tag_canonical_skills([resume for _, resume in batch])
+            semantic_scores = embeddings @ jd_embedding / (
+                (embeddings ** 2).sum(axis=1) ** 0.5 * float((jd_embedding ** 2).sum() ** 0.5) + 1e-12
+            )
+            for (sequence, resume), semantic_score in zip(batch, semantic_scores):
+                if not self._put(score_queue, ("scored", sequence, resume, float(semantic_score))):
+                    return False
+            batch.clear()
+            return True
+
+        try:
+            while not self._stop.is_set():
+                try:
+                    # Don't hold a partial batch while the parser is slow: flush on idle
+                    item = parse_queue.get(timeout=0.05 if batch else 0.1)
+                except queue.Empty:
+                    if not flush():
+                        return
+                    continue
+
+                if item is _DONE or isinstance(item, _StageFailed):
+                    if flush():
+                        self._put(score_queue, item)
+                    return
+
+                sequence, resume = item
+                if resume['error'] or not resume['clean_text']:
+                    self._put(score_queue, ("skipped", sequence, resume, None))
+                    continue
+
+                if duplicate_index is not None:
+                    # Groups whose representative left the top-K can't win; stop tracking them
+                    while self._evicted:
+                        duplicate_index.remove(self._evicted.popleft())
+                    representative = duplicate_index.add(sequence, resume['clean_text'])
+                    if representative is not None:
+                        # Scored once: the score stage copies the representative's result,
+                        # so the representative must reach the score queue first
+                        if any(pending == representative for pending, _ in batch) and not flush():
+                            return
+                        resume['clean_text'] = ''
+                        resume.pop('encode_text', None)
+                        resume.pop('sections', None)
+                        self._put(score_queue, ("duplicate", sequence, resume, representative))
+                        continue
+
+                batch.append((sequence, resume))
+                if len(batch) >= self.encode_batch_size and not flush():
+                    return
+        except BaseException as e:
+            self._put(score_queue, _StageFailed(e))
+
+    # ----------------------------------------------
+    # Driver (scoring runs in the caller's thread)
+    # ----------------------------------------------
+    def run(self, parsed_stream: Iterable[Dict], job_description: str) -> Iterator[Dict]:
+        """
+        Consume a lazy stream of parsed resumes and yield ranking snapshots:
+        ``{'results', 'parsed', 'scored', 'skipped', 'duplicates', 'done'}``.
+        The final snapshot (``done=True``) holds the complete ranking.
+        """
+        self._stop.clear()
+        self._evicted.clear()
+        job_context = self.matcher.build_job_context(job_description)
+        jd_embedding = self.matcher.encode_texts([job_context["jd_clean"]])[0]
+
+        parse_queue: queue.Queue = queue.Queue(maxsize=self.queue_size)
+        score_queue: queue.Queue = queue.Queue(maxsize=self.queue_size)
+        threads = [
+            threading.Thread(target=self._parse_stage, args=(parsed_stream, parse_queue),
+                             name="pipeline-parse", daemon=True),
+            threading.Thread(target=self._encode_stage, args=(parse_queue, score_queue, jd_embedding),
+                             name="pipeline-encode", daemon=True),
+        ]
+        for thread in threads:
+            thread.start()
+
+        results: List = []  # (combined_score, -sequence, result); a min-heap when keep_top_k is set
+        # Results duplicates may copy; with keep_top_k only those still in the top-K are kept
+        by_sequence: Dict[int, Dict] = {}
+        skipped: List = []
+        duplicates_seen = 0
+        items_seen = 0
+        scored = 0
+        last_snapshot = time.monotonic()
+
+        def add_result(sequence: int, result: Dict) -> None:
+            entry = (result["combined_score"], -sequence, result)
+            if self.keep_top_k is None:
+                results.append(entry)
+                by_sequence[sequence] = result
+                return
+            if len(results) < self.keep_top_k:
+                heapq.heappush(results, entry)
+            elif entry[:2] > results[0][:2]:
+                evicted = heapq.heapreplace(results, entry)
+                drop(-evicted[1])
+            else:
+                drop(sequence)
+                return
+            by_sequence[sequence] = result
+
+        def drop(sequence: int) -> None:
+            by_sequence.pop(sequence, None)
+            self._evicted.append(sequence)
+
+        def snapshot(done: bool) -> Dict:
+            ranked = sorted(results, key=lambda e: (e[0], e[1]), reverse=True)
+            return {
+                "results": [entry[2] for entry in ranked],
+                "parsed": items_seen,
+                "scored": scored,
+                "skipped": list(skipped),
+                "duplicates": duplicates_seen,
+                "done": done,
+            }
+
+        try:
+            while True:
+                try:
+                    item = score_queue.get(timeout=self.snapshot_interval)
+                except queue.Empty:
+                    yield snapshot(False)
+                    last_snapshot = time.monotonic()
+                    continue
+
+                if item is _DONE:
+                    break
+                if isinstance(item, _StageFailed):
+                    raise item.error
+
+                kind, sequence, resume, payload = item
+                items_seen += 1
+                if kind == "skipped":
+                    skipped.append((resume['filename'], resume['error'] or "No text extracted"))
+                elif kind == "scored":
+                    scored += 1
+                    add_result(sequence, self.matcher.score_resume(resume, job_context, payload))
+                else:
+                    scored += 1
+                    duplicates_seen += 1
+                    representative = by_sequence.get(payload)
+                    if representative is None:
+                        continue  # Its representative already fell out of the top-K; so does the copy
+                    result = duplicate_result(representative, resume)
+                    representative['duplicate_count'] = representative.get('duplicate_count', 0) + 1
+                    add_result(sequence, result)
+
+                if time.monotonic() - last_snapshot >= self.snapshot_interval:
+                    yield snapshot(False)
+                    last_snapshot = time.monotonic()
+
+            final = snapshot(True)
+            if self.keep_top_k is None:
+                self.matcher.results_history = final["results"]  # 🧠 store for adaptive tuning
+            yield final
+        finally:
+            self._stop.set()
+            for thread in threads:
+                thread.join(timeout=5)
@@ -0,0 +1,263 @@
+"""
+On-demand profiling of analysis runs.
+
+Each named stage gets its own exclusive cProfile (a nested stage pauses its
+parent, so time is never double-counted) plus wall time and tracemalloc
+allocation figures. Stages may run on several threads (e.g. the streaming
+pipeline); CPU profiles are kept per thread, while tracemalloc peaks are
+process-wide and therefore approximate when stages overlap. Tracing is
+shared by every profiler in the process (reference-counted), and a stage
+whose tracing is gone skips its memory figures rather than failing the run.
+
+Enable with ``RESUME_ANALYZER_PROFILE=1``, ``streamlit run app.py -- --profile``
+or the hidden sidebar option (open the app with ``?debug=1``).
+"""
+
+import cProfile
+import io
+import os
+import pstats
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+from collections import defaultdict
+from contextlib import ExitStack, contextmanager
+from typing import Dict, List
+
+
+# tracemalloc is process-wide: concurrent runs share one tracing session
+_tracing_lock = threading.Lock()
+_tracing_users = 0
+_tracing_owned = False
+
+
+def _acquire_tracing() -> None:
+    global _tracing_users, _tracing_owned
+    with _tracing_lock:
+        if _tracing_users == 0 and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            _tracing_owned = True
+        _tracing_users += 1
+
+
+def _release_tracing() -> None:
+    global _tracing_users, _tracing_owned
+    with _tracing_lock:
+        _tracing_users -= 1
+        # Only the last user stops it, and only if a profiler started it
+        if _tracing_users == 0 and _tracing_owned:
+            tracemalloc.stop()
+            _tracing_owned = False
+
+
+def profiling_requested() -> bool:
+    """True when profiling was asked for via env var or CLI flag"""
+    return os.environ.get("RESUME_ANALYZER_PROFILE", "").lower() in ("1", "true", "yes") \
+        or "--profile" in sys.argv
+
+
+class AnalysisProfiler:
+    """Per-stage cProfile + tracemalloc capture for one analysis run"""
+
+    def __init__(self, trace_memory: bool = True, snapshot_top_n: int = 5):
+        self.trace_memory = trace_memory
+        self.snapshot_top_n = snapshot_top_n
+        # One profiler per (stage, thread): cProfile only sees its own thread
+        self._profiles: Dict[tuple, cProfile.Profile] = {}
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self.stage_stats: Dict[str, Dict] = defaultdict(lambda: {
+            "calls": 0, "seconds": 0.0, "peak_kb": 0.0, "net_alloc_kb": 0.0, "top_allocations": [],
+        })
+        self._tracing = False
+
+    @property
+    def _stack(self) -> List[Dict]:
+        if not hasattr(self._local, "stack"):
+            self._local.stack = []
+        return self._local.stack
+
+    # ----------------------------------------------
+    # Stage Capture
+    # ----------------------------------------------
+    @contextmanager
+    def stage(self, name: str):
+        """Profile a block under ``name``; re-entering a stage accumulates"""
+        tracing = self.trace_memory and tracemalloc.is_tracing()
+        if self._stack:
+            self._stack[-1]["profile"].disable()
+            if tracing:
+                # Remember the parent's peak before the child resets it
+                parent = self._stack[-1]
+                parent["peak"] = max(parent["peak"], tracemalloc.get_traced_memory()[1])
+
+        with self._lock:
+            profile = self._profiles.setdefault((name, threading.get_ident()), cProfile.Profile())
+            stats = self.stage_stats[name]
+            first_call = stats["calls"] == 0
+        frame = {"name": name, "profile": profile, "peak": 0, "snapshot": None}
+        if tracing:
+            frame["start_bytes"] = tracemalloc.get_traced_memory()[0]
+            tracemalloc.reset_peak()
+            if first_call:
+                # Allocation-site diff only for the first call of each stage
+                frame["snapshot"] = self._snapshot()
+
+        self._stack.append(frame)
+        started = time.perf_counter()
+        profile.enable()
+        try:
+            yield
+        finally:
+            profile.disable()
+            elapsed = time.perf_counter() - started
+            self._stack.pop()
+
+            with self._lock:
+                stats["calls"] += 1
+                stats["seconds"] += elapsed
+            # Someone may have stopped tracing meanwhile: then the memory figures are skipped
+            if tracing and tracemalloc.is_tracing():
+                current, peak = tracemalloc.get_traced_memory()
+                peak = max(peak, frame["peak"])
+                with self._lock:
+                    stats["peak_kb"] = max(stats["peak_kb"], (peak - frame["start_bytes"]) / 1024)
+                    stats["net_alloc_kb"] += (current - frame["start_bytes"]) / 1024
+                snapshot = self._snapshot() if frame["snapshot"] is not None else None
+                if snapshot is not None:
+                    diff = snapshot.compare_to(frame["snapshot"], "lineno")
+                    stats["top_allocations"] = [str(d) for d in diff[:self.snapshot_top_n]]
+                if self._stack:
+                    # Parent's peak must include what happened inside the child
+                    self._stack[-1]["peak"] = max(self._stack[-1]["peak"], peak)
+
+            if self._stack:
+                self._stack[-1]["profile"].enable()
+
+    @staticmethod
+    def _snapshot():
+        """Snapshot of traced allocations, or None if tracing stopped in between"""
+        try:
+            return tracemalloc.take_snapshot()
+        except RuntimeError:
+            return None
+
+    @contextmanager
+    def instrument(self, obj, method_name: str, stage_name: str):
+        """Temporarily wrap ``obj.method_name`` so every call runs inside a stage"""
+        original = getattr(obj, method_name)
+        # An instance-level wrapper (e.g. CPU admission) must survive un-instrumenting
+        had_instance_attr = method_name in vars(obj)
+
+        def wrapped(*args, **kwargs):
+            with self.stage(stage_name):
+                return original(*args, **kwargs)
+
+        setattr(obj, method_name, wrapped)
+        try:
+            yield
+        finally:
+            if had_instance_attr:
+                setattr(obj, method_name, original)
+            else:
+                # Drop the instance attribute so the class method shows through again
+                delattr(obj, method_name)
+
+    @contextmanager
+    def profile_run(self, parser, matcher):
+        """Start tracing and attribute parser / matcher internals to named stages"""
+        if self.trace_memory and not self._tracing:
+            _acquire_tracing()
+            self._tracing = True
+        with ExitStack() as stack:
+            stack.enter_context(self.instrument(parser, "extract_sections", "pymupdf_extraction"))
+            stack.enter_context(self.instrument(parser, "extract_skills", "nltk_tokenization"))
+            stack.enter_context(self.instrument(parser, "extract_experience_years", "experience_regex"))
+            stack.enter_context(self.instrument(matcher, "encode_texts", "encode"))
+            stack.enter_context(self.instrument(matcher, "score_cheap_components", "keyword_scoring"))
+            stack.enter_context(self.instrument(matcher, "score_cheap_components_batch", "keyword_scoring"))
+            try:
+                yield self
+            finally:
+                if self._tracing:
+                    _release_tracing()
+                    self._tracing = False
+
+    # ----------------------------------------------
+    # Reports
+    # ----------------------------------------------
+    def combined_stats(self) -> pstats.Stats:
+        profiles = [p for p in self._profiles.values()]
+        stats = pstats.Stats(profiles[0], stream=io.StringIO())
+        for profile in profiles[1:]:
+            stats.add(profile)
+        return stats
+
+    def dump_prof(self) -> bytes:
+        """Merged stats in the binary .prof format (snakeviz, pstats, gprof2dot)"""
+        if not self._profiles:
+            return b""
+        fd, path = tempfile.mkstemp(suffix=".prof")
+        os.close(fd)
+        try:
+            self.combined_stats().dump_stats(path)
+            with open(path, "rb") as f:
+                return f.read()
+        finally:
+            os.remove(path)
+
+    def collapsed_stacks(self) -> str:
+        """
+        ``stage;caller;callee microseconds`` lines for flamegraph.pl / speedscope.
+        cProfile keeps caller→callee edges, not full stacks, so depth is two frames.
+        """
+        lines = []
+        for (stage_name, _), profile in self._profiles.items():
+            stats = pstats.Stats(profile, stream=io.StringIO()).stats
+            for func, (_, _, tottime, _, callers) in stats.items():
+                callee = self._label(func)
+                if not callers:
+                    lines.append(f"{stage_name};{callee} {int(tottime * 1e6)}")
+                for caller, caller_stats in callers.items():
+                    # Edge entries are (cc, nc, tt, ct): tt is time in callee from this caller
+                    micros = int(caller_stats[2] * 1e6)
+                    if micros:
+                        lines.append(f"{stage_name};{self._label(caller)};{callee} {micros}")
+        return "\n".join(lines) + "\n"
+
+    def hotspots(self, top_n: int = 15) -> List[Dict]:
+        """Top functions by own time across all stages"""
+        if not self._profiles:
+            return []
+        stats = self.combined_stats().stats
+        ranked = sorted(stats.items(), key=lambda item: item[1][2], reverse=True)[:top_n]
+        return [
+            {
+                "function": self._label(func),
+                "calls": ncalls,
+                "own_s": round(tottime, 4),
+                "cumulative_s": round(cumtime, 4),
+            }
+            for func, (_, ncalls, tottime, cumtime, _) in ranked
+        ]
+
+    def stage_summary(self) -> List[Dict]:
+        return [
+            {
+                "stage": name,
+                "calls": s["calls"],
+                "seconds": round(s["seconds"], 4),
+                "peak_kb": round(s["peak_kb"], 1),
+                "net_alloc_kb": round(s["net_alloc_kb"], 1),
+            }
+            for name, s in sorted(self.stage_stats.items(), key=lambda item: item[1]["seconds"], reverse=True)
+        ]
+
+    @staticmethod
+    def _label(func) -> str:
+        filename, line, name = func
+        if filename == "~":
+            return name  # Built-ins, e.g. <built-in method ...>
+        return f"{os.path.basename(filename)}:{line}({name})"
@@ -0,0 +1,307 @@
+"""
+Compressed storage for L2-normalized resume embeddings.
+
+    float32   1536 B/vector (384-dim MiniLM), exact
+    float16    768 B/vector
+    int8       388 B/vector  per-vector scale, codes in [-127, 127]
+    pq          48 B/vector  product quantization, 48 sub-spaces x 256 centroids
+
+Every store answers ``scores(query)`` with approximate cosine similarities
+against a unit-length float32 query. PQ uses asymmetric distance
+computation: the query is never quantized, only looked up against each
+sub-space codebook once, so scoring a vector is ``m`` table lookups.
+
+    python quantization.py report pool/ --jd job_description.txt --top-k 10
+"""
+
+import argparse
+import time
+from typing import Dict, List, Optional
+
+import numpy as np
+
+SCORE_CHUNK_ROWS = 65536  # Decode this many rows at a time; never the whole matrix
+
+
+class Float32Store:
+    """Uncompressed reference (works on memmaps without copying)"""
+
+    method = "float32"
+
+    def __init__(self, vectors: np.ndarray):
+        self.vectors = vectors
+
+    @classmethod
+    def fit(cls, embeddings: np.ndarray, **options) -> "Float32Store":
+        return cls(np.ascontiguousarray(embeddings, dtype=np.float32))
+
+    def __len__(self) -> int:
+        return len(self.vectors)
+
+    @property
+    def nbytes(self) -> int:
+        return int(self.vectors.nbytes)
+
+    def scores(self, query: np.ndarray) -> np.ndarray:
+        query = np.asarray(query, dtype=np.float32)
+        return np.concatenate([
+            self.vectors[start:start + SCORE_CHUNK_ROWS] @ query
+            for start in range(0, len(self), SCORE_CHUNK_ROWS)
+        ]) if len(self) else np.empty(0, dtype=np.float32)
+
+    def arrays(self) -> Dict[str, np.ndarray]:
+        return {"vectors": self.vectors}
+
+
+class Float16Store(Float32Store):
+    """Half precision: ~3 significant digits, plenty for cosine ranking"""
+
+    method = "float16"
+
+    @classmethod
+    def fit(cls, embeddings: np.ndarray, **options) -> "Float16Store":
+        return cls(np.asarray(embeddings, dtype=np.float16))
+
+    def scores(self, query: np.ndarray) -> np.ndarray:
+        query = np.asarray(query, dtype=np.float32)
+        return np.concatenate([
+            self.vectors[start:start + SCORE_CHUNK_ROWS].astype(np.float32) @ query
+            for start in range(0, len(self), SCORE_CHUNK_ROWS)
+        ]) if len(self) else np.empty(0, dtype=np.float32)
+
+
+class Int8Store:
+    """Symmetric per-vector int8: ``vector ≈ codes * scale``"""
+
+    method = "int8"
+
+    def __init__(self, codes: np.ndarray, scales: np.ndarray):
+        self.codes = codes
+        self.scales = scales
+
+    @classmethod
+    def fit(cls, embeddings: np.ndarray, **options) -> "Int8Store":
+        embeddings = np.asarray(embeddings, dtype=np.float32)
+        scales = np.abs(embeddings).max(axis=1) / 127.0
+        scales = np.maximum(scales, 1e-12).astype(np.float32)
+        codes = np.clip(np.rint(embeddings / scales[:, None]), -127, 127).astype(np.int8)
+        return cls(codes, scales)
+
+    def __len__(self) -> int:
+        return len(self.codes)
+
+    @property
+    def nbytes(self) -> int:
+        return int(self.codes.nbytes + self.scales.nbytes)
+
+    def scores(self, query: np.ndarray) -> np.ndarray:
+        query = np.asarray(query, dtype=np.float32)
+        return np.concatenate([
+            (self.codes[start:start + SCORE_CHUNK_ROWS].astype(np.float32) @ query)
+            * self.scales[start:start + SCORE_CHUNK_ROWS]
+            for start in range(0, len(self), SCORE_CHUNK_ROWS)
+        ]) if len(self) else np.empty(0, dtype=np.float32)
+
+    def arrays(self) -> Dict[str, np.ndarray]:
+        return {"codes": self.codes, "scales": self.scales}
+
+
+class PQStore:
+    """Product quantization: ``m`` sub-vectors, each replaced by one of 256 centroids"""
+
+    method = "pq"
+
+    def __init__(self, codes: np.ndarray, codebooks: np.ndarray):
+        self.codes = codes            # (n, m) uint8
+        self.codebooks = codebooks    # (m, 256, dim / m) float32
+
+    @staticmethod
+    def choose_subspaces(dim: int, target_sub_dim: int = 8) -> int:
+        """Largest divisor of ``dim`` giving sub-vectors of at least ``target_sub_dim`` dims"""
+        for m in range(max(1, dim // target_sub_dim), 0, -1):
+            if dim % m == 0:
+                return m
+        return 1
+
+    @classmethod
+    def fit(cls, embeddings: np.ndarray, num_subspaces: Optional[int] = None, num_centroids: int = 256,
+            iterations: int = 20, train_size: int = 50000, seed: int = 42, **options) -> "PQStore":
+        embeddings = np.asarray(embeddings, dtype=np.float32)
+        n, dim = embeddings.shape
+        m = num_subspaces or cls.choose_subspaces(dim)
+        if dim % m:
+            raise ValueError(f"Embedding dim {dim} is not divisible into {m} sub-spaces")
+        k = min(num_centroids, 256, max(1, n))
+        sub_dim = dim // m
+
+        rng = np.random.RandomState(seed)
+        train = embeddings[rng.choice(n, size=min(n, train_size), replace=False)] if n else embeddings
+        codebooks = np.zeros((m, k, sub_dim), dtype=np.float32)
+        for s in range(m):
+            codebooks[s] = cls._kmeans(train[:, s * sub_dim:(s + 1) * sub_dim], k, iterations, rng)
+
+        codes = np.empty((n, m), dtype=np.uint8)
+        for start in range(0, n, SCORE_CHUNK_ROWS):
+            block = embeddings[start:start + SCORE_CHUNK_ROWS]
+            for s in range(m):
+                codes[start:start + len(block), s] = cls._assign(
+                    block[:, s * sub_dim:(s + 1) * sub_dim], codebooks[s]
+                )
+        return cls(codes, codebooks)
+
+    @staticmethod
+    def _assign(points: np.ndarray, centroids: np.ndarray) -> np.ndarray:
+        # ||x - c||^2 = ||x||^2 - 2 x.c + ||c||^2; ||x||^2 is constant per row
+        distances = (centroids ** 2).sum(axis=1)[None, :] - 2.0 * points @ centroids.T
+        return distances.argmin(axis=1)
+
+    @classmethod
+    def _kmeans(cls, points: np.ndarray, k: int, iterations: int, rng) -> np.ndarray:
+        centroids = points[rng.choice(len(points), size=k, replace=False)].copy()
+        for _ in range(iterations):
+            labels = cls._assign(points, centroids)
+            counts = np.bincount(labels, minlength=k)
+            sums = np.zeros_like(centroids)
+            np.add.at(sums, labels, points)
+            filled = counts > 0
+            centroids[filled] = sums[filled] / counts[filled, None]
+            # Re-seed empty clusters from random points rather than letting them die
+            empty = np.flatnonzero(~filled)
+            if len(empty):
+                centroids[empty] = points[rng.choice(len(points), size=len(empty))]
+        return centroids
+
+    def __len__(self) -> int:
+        return len(self.codes)
+
+    @property
+    def nbytes(self) -> int:
+        return int(self.codes.nbytes + self.codebooks.nbytes)
+
+    def scores(self, query: np.ndarray) -> np.ndarray:
+        """Asymmetric distance computation: one (m, 256) lookup table per query"""
+        m, k, sub_dim = self.codebooks.shape
+        query = np.asarray(query, dtype=np.float32).reshape(m, sub_dim)
+        table = np.einsum("mkd,md->mk", self.codebooks, query)
+        subspaces = np.arange(m)
+        return np.concatenate([
+            table[subspaces, self.codes[start:start + SCORE_CHUNK_ROWS]].sum(axis=1)
+            for start in range(0, len(self), SCORE_CHUNK_ROWS)
+        ]).astype(np.float32) if len(self) else np.empty(0, dtype=np.float32)
+
+    def arrays(self) -> Dict[str, np.ndarray]:
+        return {"codes": self.codes, "codebooks": self.codebooks}
+
+
+STORES = {store.method: store for store in (Float32Store, Float16Store, Int8Store, PQStore)}
+
+
+def quantize(embeddings: np.ndarray, method: str = "float16", **options):
+    """Compress L2-normalized embeddings with one of ``STORES``"""
+    if method not in STORES:
+        raise ValueError(f"Unknown vector format '{method}' (choose from {', '.join(STORES)})")
+    return STORES[method].fit(embeddings, **options)
+
+
+def save_store(store, path: str) -> None:
+    np.savez(path, method=np.array(store.method), **store.arrays())
+
+
+def load_store(path: str):
+    with np.load(path) as data:
+        arrays = {key: data[key] for key in data.files if key != "method"}
+        return STORES[str(data["method"])](**arrays)
+
+
+# ----------------------------------------------
+# Recall / ranking agreement vs exact float32
+# ----------------------------------------------
+def _ranks(scores: np.ndarray) -> np.ndarray:
+    ranks = np.empty(len(scores), dtype=np.float64)
+    ranks[np.argsort(-scores, kind="stable")] = np.arange(len(scores))
+    return ranks
+
+
+def agreement_report(embeddings: np.ndarray, queries: np.ndarray,
+                     methods: tuple = ("float16", "int8", "pq"), top_k: int = 10) -> List[Dict]:
+    """
+    Compare each compressed format with exact float32 cosine over ``queries``:
+    memory, recall@k (share of the exact top-k found in the approximate
+    top-k), Spearman rank correlation of the full ranking, and score error.
+    """
+    embeddings = np.asarray(embeddings, dtype=np.float32)
+    queries = np.asarray(queries, dtype=np.float32)
+    queries = queries / np.maximum(np.linalg.norm(queries, axis=1, keepdims=True), 1e-12)
+    top_k = min(top_k, len(embeddings))
+    exact = Float32Store(embeddings)
+    exact_scores = [exact.scores(q) for q in queries]
+
+    report = []
+    for method in methods:
+        started = time.perf_counter()
+        store = quantize(embeddings, method)
+        fit_seconds = time.perf_counter() - started
+
+        recalls, spearman, max_errors, score_seconds = [], [], [], 0.0
+        for query, reference in zip(queries, exact_scores):
+            started = time.perf_counter()
+            approx = store.scores(query)
+            score_seconds += time.perf_counter() - started
+
+            exact_top = set(np.argpartition(-reference, top_k - 1)[:top_k].tolist())
+            approx_top = set(np.argpartition(-approx, top_k - 1)[:top_k].tolist())
+            recalls.append(len(exact_top & approx_top) / top_k)
+            if len(reference) > 1:
+                spearman.append(float(np.corrcoef(_ranks(reference), _ranks(approx))[0, 1]))
+            max_errors.append(float(np.abs(approx - reference).max()))
+
+        report.append({
+            "method": method,
+            "bytes_per_vector": round(store.nbytes / max(len(store), 1), 1),
+            "compression": round(exact.nbytes / max(store.nbytes, 1), 1),
+            f"recall@{top_k}": round(float(np.mean(recalls)), 4),
+            "spearman": round(float(np.mean(spearman)), 4) if spearman else 1.0,
+            "max_abs_score_error": round(float(np.max(max_errors)), 4),
+            "fit_s": round(fit_seconds, 3),
+            "ms_per_query": round(1000 * score_seconds / max(len(queries), 1), 2),
+        })
+    return report
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description="Memory/accuracy report for compressed pool vectors")
+    commands = arg_parser.add_subparsers(dest="command", required=True)
+    report = commands.add_parser("report", help="Compare float16 / int8 / PQ with exact float32 cosine")
+    report.add_argument("pool")
+    report.add_argument("--jd", nargs="*", default=[],
+                        help="Job description files to use as queries (default: sampled pool vectors)")
+    report.add_argument("--queries", type=int, default=20, help="Sampled queries when no --jd is given")
+    report.add_argument("--top-k", type=int, default=10)
+    args = arg_parser.parse_args()
+
+    from talent_pool import TalentPool
+    _, embeddings = TalentPool(args.pool).load()
+    if not len(embeddings):
+        print("⚠️ Pool is empty")
+        return
+
+    if args.jd:
+        from matcher import ResumeJobMatcher
+        matcher = ResumeJobMatcher()
+        texts = []
+        for path in args.jd:
+            with open(path, encoding="utf-8") as f:
+                texts.append(matcher.preprocess_text(f.read()))
+        queries = matcher.encode_texts(texts)
+    else:
+        rng = np.random.RandomState(0)
+        queries = np.asarray(embeddings[rng.choice(len(embeddings), size=min(args.queries, len(embeddings)),
+                                                   replace=False)])
+
+    print(f"📐 {len(embeddings)} vector(s), {len(queries)} quer(ies), top-{args.top_k}")
+    for row in agreement_report(embeddings, queries, top_k=args.top_k):
+        print("  " + "  ".join(f"{key}={value}" for key, value in row.items()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,340 @@
+"""
+Ranking-equivalence regression harness for the optimized scoring paths.
+
+A plain reference path (one resume at a time: a bare ``model.encode`` of
+the clean text, keywords and weights rebuilt from the matcher's text
+primitives, full sort) and each faster path rank the same
+fixed corpus against every JD in ``sample_job_descriptions``. Per path it
+reports Kendall tau, top-K overlap, the max absolute combined-score delta
+and the speedup over the reference, side by side, and exits non-zero when
+any path falls below the agreement thresholds.
+
+    batch         calculate_similarity_score (batched encode + vectorized keywords)
+    pipeline      AnalysisPipeline (streaming, micro-batched; dedup off)
+    pool-<fmt>    rank_pool over precomputed float32 / float16 / int8 / pq vectors
+
+    python ranking_equivalence.py --resumes 200 --top-k 10
+    python ranking_equivalence.py --paths pool-float16 pool-int8 --min-tau 0.98 --min-overlap 0.9 --max-delta 0.005
+    python ranking_equivalence.py --resumes-dir anonymized/ --json equivalence.json
+
+The corpus is synthetic (seeded, see load_test.py) unless ``--resumes-dir``
+points at a folder of anonymized PDFs. Pool paths are timed on ranking only:
+their embeddings and keywords are precomputed, as in a stored talent pool.
+"""
+
+import argparse
+import contextlib
+import copy
+import io
+import json
+import os
+import random
+import sys
+import time
+from typing import Dict, List, Optional
+
+import numpy as np
+from scipy.stats import kendalltau
+
+# Lossless paths must match the reference; compressed pools are checked on request with looser thresholds
+DEFAULT_PATHS = ("batch", "pipeline", "pool-float32")
+
+
+# ----------------------------------------------
+# Agreement metrics
+# ----------------------------------------------
+def compare_rankings(reference: List[Dict], candidate: List[Dict], top_k: int) -> Dict:
+    """
+    Agreement of ``candidate`` with ``reference`` (both best first). Tau and
+    score deltas cover the candidates both paths returned, so a top-K-only
+    path is judged on its own K.
+    """
+    reference_scores = {r["filename"]: r["combined_score"] for r in reference}
+    common = [r for r in candidate if r["filename"] in reference_scores]
+    expected = np.array([reference_scores[r["filename"]] for r in common], dtype=np.float64)
+    actual = np.array([r["combined_score"] for r in common], dtype=np.float64)
+
+    if len(common) < 2:
+        tau = 1.0
+    else:
+        tau = kendalltau(expected, actual)[0]
+        if np.isnan(tau):  # Constant scores on one side: agree only if both are constant
+            tau = 1.0 if np.ptp(expected) == np.ptp(actual) == 0 else 0.0
+
+    k = min(top_k, len(reference))
+    reference_top = [r["filename"] for r in reference[:k]]
+    candidate_top = [r["filename"] for r in candidate[:k]]
+    return {
+        "kendall_tau": float(tau),
+        "top_k_overlap": len(set(reference_top) & set(candidate_top)) / k if k else 1.0,
+        "top_k_same_order": reference_top == candidate_top,
+        "max_abs_delta": float(np.abs(expected - actual).max()) if len(common) else 0.0,
+    }
+
+
+class RankingEquivalence:
+    """Run reference and candidate scoring paths over one corpus and compare them"""
+
+    def __init__(self, matcher, resumes: List[Dict], job_descriptions: List[str], top_k: int = 10,
+                 repeats: int = 1):
+        self.matcher = matcher
+        # The reference encodes clean_text, so every path does: section-focused
+        # encode text is a parser choice, not a scoring optimization under test
+        self.resumes = [
+            {k: v for k, v in r.items() if k not in ("encode_text", "sections")}
+            for r in resumes if not r["error"] and r["clean_text"]
+        ]
+        self.job_descriptions = job_descriptions
+        self.top_k = top_k
+        self.repeats = repeats
+        self._pool_records: Optional[List[Dict]] = None
+        self._pool_embeddings: Optional[np.ndarray] = None
+        self._stores: Dict[str, object] = {}
+
+    # ----------------------------------------------
+    # Scoring paths
+    # ----------------------------------------------
+    def reference_job_context(self, job_description: str) -> Dict:
+        """
+        JD keywords, requirements and weights rebuilt from the matcher's text
+        primitives, without ``build_job_context``, so a regression there shows
+        up as a delta instead of being shared by both sides. Weights start from
+        the defaults, as ``run_path`` clears the history before every run.
+        """
+        matcher = self.matcher
+        jd_clean = matcher.preprocess_text(job_description)
+        jd_keywords = matcher.extract_keywords(jd_clean)
+        domain = matcher.detect_job_domain(job_description)
+
+        semantic_weight, keyword_weight, exp_weight = 0.6, 0.3, 0.1
+        jd_word_count = len(jd_clean.split())
+        if jd_word_count < 50:
+            semantic_weight += 0.1
+        elif jd_word_count > 150:
+            keyword_weight += 0.05
+        if domain in ["software", "data"]:
+            semantic_weight += 0.05
+            keyword_weight += 0.1
+        elif domain in ["marketing", "sales"]:
+            keyword_weight += 0.15
+        elif domain in ["finance", "hr"]:
+            exp_weight += 0.1
+        total = semantic_weight + keyword_weight + exp_weight
+
+        return {
+            "jd_clean": jd_clean,
+            "jd_keywords": jd_keywords,
+            "jd_word_freq": {w: jd_clean.count(w) for w in jd_keywords},
+            "jd_exp": matcher.extract_required_experience(job_description),
+            "domain": domain,
+            "weights": (semantic_weight / total, keyword_weight / total, exp_weight / total),
+        }
+
+    def reference(self, resumes: List[Dict], job_description: str) -> List[Dict]:
+        """
+        Unoptimized baseline: a plain ``model.encode`` of each resume's clean
+        text (no scheduler, no ``encoding_text``) and one per-resume scoring call
+        """
+        model = self.matcher.model
+        job_context = self.reference_job_context(job_description)
+        jd_embedding = model.encode([job_context["jd_clean"]], convert_to_numpy=True, show_progress_bar=False)[0]
+        jd_embedding = jd_embedding / (np.linalg.norm(jd_embedding) + 1e-12)
+
+        results = []
+        for resume in resumes:
+            text = self.matcher.preprocess_text(resume["clean_text"])
+            embedding = model.encode([text], convert_to_numpy=True, show_progress_bar=False)[0]
+            semantic_score = float(embedding @ jd_embedding / (np.linalg.norm(embedding) + 1e-12))
+            # Per-resume keyword and experience scores: plain set intersection, no keyword matrix
+            matching_keywords = set(self.matcher.extract_keywords(text)).intersection(job_context["jd_keywords"])
+            jd_word_freq = job_context["jd_word_freq"]
+            components = {
+                "keyword_score": (sum(jd_word_freq.get(kw, 1) for kw in matching_keywords)
+                                  / (sum(jd_word_freq.values()) + 1e-6)),
+                "experience_score": self.matcher.calculate_experience_score(
+                    resume["experience_years"], job_context["jd_exp"]),
+                "matching_keywords": matching_keywords,
+            }
+            results.append(self.matcher.score_resume(resume, job_context, semantic_score, components))
+        results.sort(key=lambda x: x["combined_score"], reverse=True)
+        return results
+
+    def _pipeline(self, resumes: List[Dict], job_description: str) -> List[Dict]:
+        from pipeline import AnalysisPipeline
+
+        # Near-duplicate merging changes scores on purpose; only the streaming itself is compared
+        final = None
+        for final in AnalysisPipeline(self.matcher, dedup_threshold=None).run(iter(resumes), job_description):
+            pass
+        return final["results"]
+
+    def _prepare_pool(self) -> None:
+        """Records and normalized embeddings as a talent pool stores them (not timed)"""
+        from talent_pool import TalentPool
+
+        texts = [self.matcher.encoding_text(r) for r in self.resumes]
+        embeddings = np.asarray(self.matcher.encode_texts(texts), dtype=np.float32)
+        self._pool_embeddings = embeddings / np.maximum(np.linalg.norm(embeddings, axis=1, keepdims=True), 1e-12)
+        self._pool_records = [TalentPool.build_record(r, self.matcher) for r in self.resumes]
+
+    def _pool_store(self, vector_format: str):
+        from quantization import quantize
+
+        if self._pool_embeddings is None:
+            self._prepare_pool()
+        if vector_format not in self._stores:
+            self._stores[vector_format] = quantize(self._pool_embeddings, vector_format)
+        return self._stores[vector_format]
+
+    def path_runner(self, name: str):
+        """``(fn(resumes, job_description) -> ranked results, uses pool records)`` for a path name"""
+        if name == "reference":
+            return self.reference, False
+        if name == "batch":
+            return self.matcher.calculate_similarity_score, False
+        if name == "pipeline":
+            return self._pipeline, False
+        if name.startswith("pool-"):
+            store = self._pool_store(name[len("pool-"):])
+            return (lambda records, jd: self.matcher.rank_pool(records, store, jd)), True
+        raise ValueError(f"Unknown scoring path '{name}'")
+
+    def run_path(self, name: str, job_description: str) -> tuple:
+        """Best-of-``repeats`` wall time and the ranking of one path for one JD"""
+        runner, pool = self.path_runner(name)
+        best, results = float("inf"), []
+        for _ in range(self.repeats):
+            # Fresh inputs and history every run: paths memoize on resume dicts, and
+            # results_history would otherwise shift the auto-tuned weights between paths
+            inputs = copy.deepcopy(self._pool_records if pool else self.resumes)
+            self.matcher.results_history = []
+            started = time.perf_counter()
+            results = runner(inputs, job_description)
+            best = min(best, time.perf_counter() - started)
+        self.matcher.results_history = []
+        return results, best
+
+    # ----------------------------------------------
+    # Report
+    # ----------------------------------------------
+    def run(self, paths=DEFAULT_PATHS, min_tau: float = 0.99, min_overlap: float = 1.0,
+            max_delta: float = 1e-3) -> Dict:
+        rows = {name: {"taus": [], "overlaps": [], "deltas": [], "same_order": 0, "seconds": 0.0}
+                for name in paths}
+        reference_seconds = 0.0
+        for job_description in self.job_descriptions:
+            reference, seconds = self.run_path("reference", job_description)
+            reference_seconds += seconds
+            for name in paths:
+                results, seconds = self.run_path(name, job_description)
+                agreement = compare_rankings(reference, results, self.top_k)
+                row = rows[name]
+                row["taus"].append(agreement["kendall_tau"])
+                row["overlaps"].append(agreement["top_k_overlap"])
+                row["deltas"].append(agreement["max_abs_delta"])
+                row["same_order"] += agreement["top_k_same_order"]
+                row["seconds"] += seconds
+
+        report_rows = []
+        for name, row in rows.items():
+            passed = (min(row["taus"]) >= min_tau and min(row["overlaps"]) >= min_overlap
+                      and max(row["deltas"]) <= max_delta)
+            report_rows.append({
+                "path": name,
+                "kendall_tau_min": round(min(row["taus"]), 4),
+                "kendall_tau_mean": round(float(np.mean(row["taus"])), 4),
+                f"top{self.top_k}_overlap_min": round(min(row["overlaps"]), 4),
+                f"top{self.top_k}_same_order": f"{row['same_order']}/{len(self.job_descriptions)}",
+                "max_abs_delta": float(f"{max(row['deltas']):.3g}"),
+                "seconds": round(row["seconds"], 3),
+                "speedup": round(reference_seconds / row["seconds"], 2) if row["seconds"] else float("inf"),
+                "passed": passed,
+            })
+        return {
+            "config": {
+                "resumes": len(self.resumes), "job_descriptions": len(self.job_descriptions),
+                "top_k": self.top_k, "repeats": self.repeats, "model": self.matcher.model_name,
+                "thresholds": {"min_tau": min_tau, "min_overlap": min_overlap, "max_delta": max_delta},
+            },
+            "reference_seconds": round(reference_seconds, 3),
+            "paths": report_rows,
+            "passed": all(row["passed"] for row in report_rows),
+        }
+
+
+# ----------------------------------------------
+# Corpus
+# ----------------------------------------------
+def load_corpus(parser, size: int, seed: int = 42, resumes_dir: Optional[str] = None) -> List[Dict]:
+    """Parsed resumes: the PDFs in ``resumes_dir``, or ``size`` seeded synthetic ones"""
+    from load_test import NamedBytesIO, make_pdf, synthetic_resume_text
+    from pipeline import parse_files
+
+    if resumes_dir:
+        uploads = []
+        for name in sorted(os.listdir(resumes_dir)):
+            if name.lower().endswith(".pdf"):
+                with open(os.path.join(resumes_dir, name), "rb") as f:
+                    uploads.append(NamedBytesIO(f.read(), name))
+    else:
+        rng = random.Random(seed)
+        uploads = [NamedBytesIO(make_pdf(synthetic_resume_text(rng, i)), f"candidate_{i:04d}.pdf")
+                   for i in range(size)]
+    return list(parse_files(parser, uploads))
+
+
+def print_report(report: Dict) -> None:
+    config = report["config"]
+    print(f"📐 {config['resumes']} resume(s) x {config['job_descriptions']} JD(s), top-{config['top_k']}, "
+          f"reference {report['reference_seconds']}s")
+    columns = list(report["paths"][0]) if report["paths"] else []
+    widths = {c: max(len(c), *(len(str(row[c])) for row in report["paths"])) for c in columns}
+    print("  " + "  ".join(c.ljust(widths[c]) for c in columns))
+    for row in report["paths"]:
+        print("  " + "  ".join(str(row[c]).ljust(widths[c]) for c in columns))
+    print("✅ All paths agree with the reference" if report["passed"]
+          else "❌ Agreement below threshold: " + ", ".join(r["path"] for r in report["paths"] if not r["passed"]))
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description="Check optimized scoring paths rank like the reference")
+    arg_parser.add_argument("--paths", nargs="+", default=list(DEFAULT_PATHS),
+                            help="batch, pipeline, pool-float32|float16|int8|pq")
+    arg_parser.add_argument("--resumes", type=int, default=200, help="Synthetic corpus size")
+    arg_parser.add_argument("--resumes-dir", default=None, help="Folder of (anonymized) PDFs instead")
+    arg_parser.add_argument("--jd-file", default="sample_job_descriptions")
+    arg_parser.add_argument("--top-k", type=int, default=10)
+    arg_parser.add_argument("--repeats", type=int, default=1, help="Timing runs per path (best is kept)")
+    arg_parser.add_argument("--min-tau", type=float, default=0.99)
+    arg_parser.add_argument("--min-overlap", type=float, default=1.0, help="Share of the reference top-K")
+    arg_parser.add_argument("--max-delta", type=float, default=1e-3, help="Max |combined score difference|")
+    arg_parser.add_argument("--seed", type=int, default=42)
+    arg_parser.add_argument("--stub-encoder", action="store_true", help="Hashed bag-of-words instead of MiniLM")
+    arg_parser.add_argument("--json", default=None, help="Also write the report to this file")
+    arg_parser.add_argument("--verbose", action="store_true", help="Keep parser / matcher output")
+    args = arg_parser.parse_args()
+
+    from load_test import StubEncoder, load_job_descriptions
+    from matcher import ResumeJobMatcher
+    from resume_parser import ResumeParser
+
+    # The parser and matcher print per resume / per JD; keep the report readable
+    quiet = contextlib.nullcontext() if args.verbose else contextlib.redirect_stdout(io.StringIO())
+    with quiet:
+        matcher = ResumeJobMatcher(model=StubEncoder() if args.stub_encoder else None)
+        resumes = load_corpus(ResumeParser(), args.resumes, args.seed, args.resumes_dir)
+        harness = RankingEquivalence(matcher, resumes, load_job_descriptions(args.jd_file),
+                                     top_k=args.top_k, repeats=args.repeats)
+        report = harness.run(args.paths, min_tau=args.min_tau, min_overlap=args.min_overlap,
+                             max_delta=args.max_delta)
+
+    print_report(report)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"💾 Report written to {args.json}")
+    sys.exit(0 if report["passed"] else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+import hashlib
+import sys
+import threading
+from collections import OrderedDict
+from typing import Dict, Hashable, Iterable, List, Optional, Tuple
+
+
+class ResultsCache:
+    """Process-wide memo of analysis results, bounded by approximate memory use.
+
+    Entries are keyed by ``(resume hashes, JD hash, scoring config)`` so a
+    Streamlit rerun (download click, widget change) or another session
+    analysing the same upload can reuse results instead of re-parsing and
+    re-encoding everything.
+    """
+
+    def __init__(self, max_bytes: int = 64 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[Tuple, Tuple[List[Dict], int]]" = OrderedDict()
+        self._total_bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    # ----------------------------------------------
+    # Key Construction
+    # ----------------------------------------------
+    @staticmethod
+    def hash_bytes(data: bytes) -> str:
+        """Stable content hash for uploaded file bytes"""
+        return hashlib.sha256(data).hexdigest()
+
+    @staticmethod
+    def hash_text(text: str) -> str:
+        """Stable hash for the job description (whitespace-insensitive)"""
+        normalized = " ".join(text.split())
+        return hashlib.sha256(normalized.encode("utf-8")).hexdigest()
+
+    @classmethod
+    def make_key(cls, file_hashes: Iterable[str], job_description: str, scoring_config: Hashable) -> Tuple:
+        """Build a cache key; upload order does not matter, duplicates do"""
+        return (tuple(sorted(file_hashes)), cls.hash_text(job_description), scoring_config)
+
+    # ----------------------------------------------
+    # Lookup / Store
+    # ----------------------------------------------
+    def get(self, key: Tuple) -> Optional[List[Dict]]:
+        """Return cached results (most-recently-used bump) or None"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, key: Tuple, results: List[Dict]) -> None:
+        """Store results, evicting least-recently-used entries over budget"""
+        size = self._estimate_size(results)
+        if size > self.max_bytes:
+            return  # Never cache something that would flush everything else
+
+        with self._lock:
+            if key in self._entries:
+                self._total_bytes -= self._entries.pop(key)[1]
+            self._entries[key] = (results, size)
+            self._total_bytes += size
+            while self._total_bytes > self.max_bytes and self._entries:
+                _, (_, evicted_size) = self._entries.popitem(last=False)
+                self._total_bytes -= evicted_size
+
+    # ----------------------------------------------
+    # Invalidation
+    # ----------------------------------------------
+    def invalidate(self, key: Tuple) -> bool:
+        """Drop a single entry; returns True if it existed"""
+        with self._lock:
+            entry = self._entries.pop(key, None)
+            if entry is None:
+                return False
+            self._total_bytes -= entry[1]
+            return True
+
+    def invalidate_job(self, job_description: str) -> int:
+        """Drop every entry computed for the given job description"""
+        jd_hash = self.hash_text(job_description)
+        with self._lock:
+            stale = [k for k in self._entries if k[1] == jd_hash]
+            for k in stale:
+                self._total_bytes -= self._entries.pop(k)[1]
+            return len(stale)
+
+    def clear(self) -> None:
+        """Drop everything"""
+        with self._lock:
+            self._entries.clear()
+            self._total_bytes = 0
+
+    def stats(self) -> Dict:
+        """Occupancy and hit-rate counters for display"""
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "bytes": self._total_bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+            }
+
+    # ----------------------------------------------
+    # Helpers
+    # ----------------------------------------------
+    @staticmethod
+    def _estimate_size(results: List[Dict]) -> int:
+        """Rough deep size of a result list (dicts of scalars, strings, lists)"""
+        total = sys.getsizeof(results)
+        for result in results:
+            total += sys.getsizeof(result)
+            for value in result.values():
+                total += sys.getsizeof(value)
+                if isinstance(value, (list, tuple, set)):
+                    total += sum(sys.getsizeof(v) for v in value)
+        return total
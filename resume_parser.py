@@ -166,6 +166,8 @@ except LookupError:
 from nltk.corpus import stopwords
 from nltk.tokenize import word_tokenize
 
+from section_segmenter import ResumeSections
+
 
 class ResumeParser:
     """Universal Resume Parser using PyMuPDF for clean text extraction"""
@@ -174,17 +176,13 @@ class ResumeParser:
         self.stop_words = set(stopwords.words('english'))
         print("✅ ResumeParser initialized successfully with NLTK stopwords.")
 
-    def extract_text_from_pdf(self, pdf_file) -> str:
-        """Extract text from uploaded PDF using PyMuPDF (more accurate than PyPDF2)"""
-        text = ""
+    def extract_sections(self, pdf_file) -> ResumeSections:
+        """One PyMuPDF layout pass (text, font sizes, weights); sections are split lazily"""
+        pdf_document = fitz.open(stream=pdf_file.read(), filetype="pdf")
         try:
-            pdf_document = fitz.open(stream=pdf_file.read(), filetype="pdf")
-            for page in pdf_document:
-                text += page.get_text("text") + "\n"
+            return ResumeSections.from_document(pdf_document)
+        finally:
             pdf_document.close()
-        except Exception as e:
-            return f"Error reading PDF: {str(e)}"
-        return text.strip()
 
     def clean_text(self, text: str) -> str:
         """Basic cleaning: remove extra spaces, normalize"""
@@ -265,30 +263,56 @@ class ResumeParser:
 
     def parse_resume(self, pdf_file, filename: str) -> Dict:
         """Main parsing function"""
-        raw_text = self.extract_text_from_pdf(pdf_file)
-        if raw_text.startswith("Error"):
+        try:
+            sections = self.extract_sections(pdf_file)
+        except Exception as e:
             return {
                 'filename': filename,
                 'raw_text': '',
                 'clean_text': '',
                 'skills': [],
                 'experience_years': 0,
-                'error': raw_text
+                'error': f"Error reading PDF: {str(e)}"
             }
 
+        raw_text = sections.text.strip()
         clean_text = self.clean_text(raw_text)
-        skills = self.extract_skills(raw_text)
-        experience_years = self.extract_experience_years(raw_text)
+        # Each extractor reads only the sections it needs (whole text if no headings were found)
+        skills = self.extract_skills(sections.text_for("skills", "experience", "projects", "summary", "certifications"))
+        if sections.has("experience"):
+            experience_text = sections.text_for("summary", "experience")
+        else:
+            # Education dates and publication years must not count as work experience
+            experience_text = sections.text_without("education", "publications", "certifications", "awards")
+        experience_years = self.extract_experience_years(experience_text)
 
         print(f"\n📄 Parsed {filename}")
         print(f"🧠 Skills Detected: {skills[:10]}... ({len(skills)} total)")
         print(f"⏳ Experience: {experience_years} years\n")
 
-        return {
+        parsed = {
             'filename': filename,
             'raw_text': raw_text,
             'clean_text': clean_text,
             'skills': skills,
             'experience_years': experience_years,
+            # Layout object: section views (e.g. the encoder's focused text) are built on first use
+            'sections': sections,
             'error': None
         }
+        return parsed
+
+
+def portable_resume(parsed: Dict) -> Dict:
+    """
+    JSON-safe copy of a parsed resume for other processes and clients: the
+    layout object becomes its section names plus the materialized encode text
+    """
+    portable = dict(parsed)
+    sections = portable.get('sections')
+    if isinstance(sections, ResumeSections):
+        portable['sections'] = sections.names
+        if sections.encode_text is not None:
+            portable['encode_text'] = sections.encode_text
+    return portable
+
@@ -0,0 +1,65 @@
+"""
+Instant re-weighting of a finished ranking.
+
+Every result already carries its semantic, keyword and experience
+component scores, so a new weighting is just a weighted sum over three
+arrays: no model, parser or keyword extraction calls. ``ComponentScores``
+keeps those arrays for one requisition (results set) and re-ranks in
+milliseconds with one stable sort.
+"""
+
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+
+COMPONENTS = ("similarity_score", "keyword_score", "experience_score")
+
+
+class ComponentScores:
+    """Column-oriented component scores for one ranked result set"""
+
+    def __init__(self, results: List[Dict], weights: Optional[Sequence[float]] = None):
+        self.results = results
+        # (n, 3) float64: semantic, keyword, experience
+        self.matrix = np.array([[r[c] for c in COMPONENTS] for r in results], dtype=np.float64).reshape(-1, 3)
+        self.combined = np.array([r["combined_score"] for r in results], dtype=np.float64)
+        self.default_weights = tuple(weights) if weights is not None else self.infer_weights()
+
+    def __len__(self) -> int:
+        return len(self.results)
+
+    def infer_weights(self) -> tuple:
+        """
+        Recover the (semantic, keyword, experience) weights the matcher used:
+        combined scores are an exact linear function of the components.
+        """
+        if len(self) >= 3 and np.linalg.matrix_rank(self.matrix) == 3:
+            weights, *_ = np.linalg.lstsq(self.matrix, self.combined, rcond=None)
+            if np.all(weights >= -1e-6):
+                weights = np.clip(weights, 0.0, None)
+                return tuple(float(w) for w in weights / weights.sum())
+        return 0.6, 0.3, 0.1  # auto_tune_weights' neutral default
+
+    @staticmethod
+    def normalize(weights: Sequence[float]) -> np.ndarray:
+        weights = np.clip(np.asarray(weights, dtype=np.float64), 0.0, None)
+        total = weights.sum()
+        return weights / total if total > 0 else np.full(3, 1.0 / 3)
+
+    def scores(self, weights: Sequence[float]) -> np.ndarray:
+        return self.matrix @ self.normalize(weights)
+
+    def rank(self, weights: Sequence[float], top_k: Optional[int] = None) -> np.ndarray:
+        """Indices of the best ``top_k`` (or all) results under ``weights``, best first"""
+        return self._order(self.scores(weights), top_k)
+
+    @staticmethod
+    def _order(scores: np.ndarray, top_k: Optional[int]) -> np.ndarray:
+        # Ties keep the original ranking order (stable); a few thousand rows sort in well under a millisecond
+        order = np.argsort(-scores, kind="stable")
+        return order if top_k is None else order[:max(top_k, 0)]
+
+    def reweighted(self, weights: Sequence[float], top_k: Optional[int] = None) -> List[Dict]:
+        """Result dicts re-ranked under ``weights`` with ``combined_score`` updated"""
+        scores = self.scores(weights)
+        return [dict(self.results[i], combined_score=float(scores[i])) for i in self._order(scores, top_k)]
@@ -0,0 +1,335 @@
+"""
+Local HTTP scoring service around ResumeParser and ResumeJobMatcher.
+
+Concurrent requests are coalesced into micro-batches before hitting
+``model.encode`` so throughput grows with concurrency instead of serializing
+one encode per request. Runs fully offline (Hugging Face hub access is
+disabled; the model must already be in the local cache or given as a path).
+
+    python scoring_service.py --port 8765 --max-batch-size 32 --max-wait-ms 10
+
+Endpoints:
+    GET  /health                      -> model + batching stats
+    POST /parse?filename=cv.pdf       -> parsed resume (body: raw PDF bytes)
+    POST /embed   {"texts": [...]}    -> {"embeddings": [[...], ...]}
+    POST /score   {"job_description": "...", "resumes": [parsed resume, ...]}
+"""
+
+import os
+
+# 🔒 Never reach out to the Hugging Face hub from the service
+os.environ.setdefault("HF_HUB_OFFLINE", "1")
+os.environ.setdefault("TRANSFORMERS_OFFLINE", "1")
+
+import argparse
+import asyncio
+import io
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urlsplit
+
+import numpy as np
+from sentence_transformers import util
+
+from resume_parser import ResumeParser, portable_resume
+from matcher import ResumeJobMatcher
+
+
+class MicroBatcher:
+    """Collects concurrent encode requests into batches for ``encode_fn``"""
+
+    def __init__(self, encode_fn, max_batch_size: int = 32, max_wait_ms: float = 10.0):
+        self.encode_fn = encode_fn
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000.0
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker: Optional[asyncio.Task] = None
+        # A single inference thread: the model is never called concurrently
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="encode")
+        self.batches = 0
+        self.items = 0
+
+    def start(self) -> None:
+        self._queue = asyncio.Queue()
+        self._worker = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._worker:
+            self._worker.cancel()
+            try:
+                await self._worker
+            except asyncio.CancelledError:
+                pass
+        self._executor.shutdown(wait=False)
+
+    async def submit(self, text: str) -> np.ndarray:
+        """Queue one text and wait for its embedding"""
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((text, future))
+        return await future
+
+    async def submit_many(self, texts: List[str]) -> List[np.ndarray]:
+        return list(await asyncio.gather(*(self.submit(t) for t in texts)))
+
+    async def _collect(self) -> List[Tuple[str, asyncio.Future]]:
+        """Block for the first item, then gather more until full or the window closes"""
+        batch = [await self._queue.get()]
+        deadline = time.monotonic() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), remaining))
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = await self._collect()
+            texts = [text for text, _ in batch]
+            try:
+                embeddings = await loop.run_in_executor(self._executor, self.encode_fn, texts)
+            except Exception as e:
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+
+            self.batches += 1
+            self.items += len(batch)
+            for (_, future), embedding in zip(batch, embeddings):
+                if not future.done():
+                    future.set_result(embedding)
+
+    def stats(self) -> Dict:
+        return {
+            "batches": self.batches,
+            "items": self.items,
+            "avg_batch_size": round(self.items / self.batches, 2) if self.batches else 0.0,
+            "max_batch_size": self.max_batch_size,
+            "max_wait_ms": self.max_wait * 1000.0,
+        }
+
+
+class HTTPError(Exception):
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+
+
+class ScoringService:
+    """Minimal asyncio HTTP/1.1 server exposing parse, embed, score and health"""
+
+    REASONS = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed",
+               413: "Payload Too Large", 500: "Internal Server Error"}
+
+    def __init__(self, parser: ResumeParser, matcher: ResumeJobMatcher,
+                 max_batch_size: int = 32, max_wait_ms: float = 10.0,
+                 max_body_bytes: int = 20 * 1024 * 1024):
+        self.parser = parser
+        self.matcher = matcher
+        self.batcher = MicroBatcher(matcher.encode_texts, max_batch_size, max_wait_ms)
+        self.max_body_bytes = max_body_bytes
+        self.started_at = time.time()
+        self.requests_served = 0
+
+    # ----------------------------------------------
+    # Endpoints
+    # ----------------------------------------------
+    async def handle_health(self, query: Dict, body: bytes) -> Dict:
+        return {
+            "status": "ok",
+            "model": self.matcher.model_name,
+            "uptime_s": round(time.time() - self.started_at, 1),
+            "requests_served": self.requests_served,
+            "batching": self.batcher.stats(),
+        }
+
+    async def handle_parse(self, query: Dict, body: bytes) -> Dict:
+        if not body:
+            raise HTTPError(400, "Request body must contain the PDF bytes")
+        filename = query.get("filename", ["resume.pdf"])[0]
+        # PyMuPDF / NLTK work is CPU-bound: keep it off the event loop
+        loop = asyncio.get_running_loop()
+        parsed = await loop.run_in_executor(None, self.parser.parse_resume, io.BytesIO(body), filename)
+        return portable_resume(parsed)
+
+    async def handle_embed(self, query: Dict, body: bytes) -> Dict:
+        payload = self._json(body)
+        texts = payload.get("texts")
+        if not isinstance(texts, list) or not all(isinstance(t, str) for t in texts):
+            raise HTTPError(400, "'texts' must be a list of strings")
+        if payload.get("preprocess", True):
+            texts = [self.matcher.preprocess_text(t) for t in texts]
+        embeddings = await self.batcher.submit_many(texts)
+        return {"embeddings": [e.tolist() for e in embeddings], "dim": int(embeddings[0].shape[0]) if embeddings else 0}
+
+    async def handle_score(self, query: Dict, body: bytes) -> Dict:
+        payload = self._json(body)
+        job_description = payload.get("job_description")
+        resumes = payload.get("resumes")
+        if not isinstance(job_description, str) or not job_description.strip():
+            raise HTTPError(400, "'job_description' must be a non-empty string")
+        if not isinstance(resumes, list):
+            raise HTTPError(400, "'resumes' must be a list of parsed resumes")
+
+        resumes = [self._normalize_resume(r, i) for i, r in enumerate(resumes)]
+        valid = [r for r in resumes if not r["error"] and r["clean_text"]]
+
+        # Keyword extraction and scoring are CPU-bound too: only the encode waits on the loop
+        loop = asyncio.get_running_loop()
+        job_context = await loop.run_in_executor(None, self.matcher.build_job_context, job_description)
+        texts = [job_context["jd_clean"]] + [self.matcher.encoding_text(r) for r in valid]
+        embeddings = await self.batcher.submit_many(texts)
+        results = await loop.run_in_executor(None, self._score_all, valid, job_context, embeddings)
+
+        return {"domain": job_context["domain"], "weights": list(job_context["weights"]), "results": results}
+
+    def _score_all(self, resumes: List[Dict], job_context: Dict, embeddings: List[np.ndarray]) -> List[Dict]:
+        jd_embedding, resume_embeddings = embeddings[0], embeddings[1:]
+        results = []
+        for resume, embedding in zip(resumes, resume_embeddings):
+            semantic_score = float(util.cos_sim(jd_embedding, embedding)[0][0])
+            results.append(self.matcher.score_resume(resume, job_context, semantic_score))
+        results.sort(key=lambda x: x["combined_score"], reverse=True)
+        return results
+
+    # ----------------------------------------------
+    # HTTP plumbing
+    # ----------------------------------------------
+    @staticmethod
+    def _json(body: bytes) -> Dict:
+        try:
+            payload = json.loads(body or b"{}")
+        except ValueError:
+            raise HTTPError(400, "Body must be valid JSON")
+        if not isinstance(payload, dict):
+            raise HTTPError(400, "Body must be a JSON object")
+        return payload
+
+    @staticmethod
+    def _normalize_resume(resume, index: int) -> Dict:
+        if isinstance(resume, str):
+            resume = {"clean_text": resume}
+        if not isinstance(resume, dict):
+            raise HTTPError(400, f"resumes[{index}] must be an object or a string")
+        normalized = {
+            "filename": resume.get("filename", f"resume_{index + 1}"),
+            "clean_text": resume.get("clean_text", ""),
+            "skills": resume.get("skills", []),
+            "experience_years": int(resume.get("experience_years", 0) or 0),
+            "error": resume.get("error"),
+        }
+        # /parse output: encode the same section-focused text the app does
+        for field in ("encode_text", "sections"):
+            if resume.get(field):
+                normalized[field] = resume[field]
+        return normalized
+
+    def routes(self) -> Dict:
+        return {
+            ("GET", "/health"): self.handle_health,
+            ("POST", "/parse"): self.handle_parse,
+            ("POST", "/embed"): self.handle_embed,
+            ("POST", "/score"): self.handle_score,
+        }
+
+    async def handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            while True:
+                keep_alive = await self._handle_request(reader, writer)
+                if not keep_alive:
+                    break
+        except (asyncio.IncompleteReadError, ConnectionResetError):
+            pass
+        finally:
+            writer.close()
+
+    async def _handle_request(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> bool:
+        request_line = await reader.readline()
+        if not request_line:
+            return False
+
+        headers = {}
+        while True:
+            line = await reader.readline()
+            if line in (b"\r\n", b"\n", b""):
+                break
+            name, _, value = line.decode("latin-1").partition(":")
+            headers[name.strip().lower()] = value.strip()
+
+        keep_alive = headers.get("connection", "").lower() == "keep-alive"
+        try:
+            method, target, _ = request_line.decode("latin-1").split(" ", 2)
+            length = int(headers.get("content-length", 0))
+            if length > self.max_body_bytes:
+                raise HTTPError(413, f"Body exceeds {self.max_body_bytes} bytes")
+            body = await reader.readexactly(length) if length else b""
+
+            url = urlsplit(target)
+            handler = self.routes().get((method.upper(), url.path))
+            if handler is None:
+                known_paths = {path for _, path in self.routes()}
+                raise HTTPError(405 if url.path in known_paths else 404, f"No route for {method} {url.path}")
+
+            status, payload = 200, await handler(parse_qs(url.query), body)
+        except HTTPError as e:
+            status, payload = e.status, {"error": e.message}
+            if status == 413:
+                keep_alive = False  # The body was never read: the stream is out of sync
+        except ValueError:
+            status, payload = 400, {"error": "Malformed request"}
+            keep_alive = False
+        except Exception as e:
+            status, payload = 500, {"error": str(e)}
+
+        self.requests_served += 1
+        data = json.dumps(payload).encode("utf-8")
+        writer.write(
+            f"HTTP/1.1 {status} {self.REASONS.get(status, '')}\r\n"
+            f"Content-Type: application/json\r\n"
+            f"Content-Length: {len(data)}\r\n"
+            f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n".encode("latin-1") + data
+        )
+        await writer.drain()
+        return keep_alive
+
+    async def serve(self, host: str = "127.0.0.1", port: int = 8765) -> None:
+        self.batcher.start()
+        server = await asyncio.start_server(self.handle_connection, host, port)
+        print(f"🚀 Scoring service listening on http://{host}:{port}")
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            await self.batcher.stop()
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description="Local resume scoring HTTP service")
+    arg_parser.add_argument("--host", default="127.0.0.1")
+    arg_parser.add_argument("--port", type=int, default=8765)
+    arg_parser.add_argument("--model", default="all-MiniLM-L6-v2",
+                            help="Cached model name or local model directory")
+    arg_parser.add_argument("--max-batch-size", type=int, default=32)
+    arg_parser.add_argument("--max-wait-ms", type=float, default=10.0)
+    args = arg_parser.parse_args()
+
+    service = ScoringService(
+        ResumeParser(), ResumeJobMatcher(args.model),
+        max_batch_size=args.max_batch_size, max_wait_ms=args.max_wait_ms,
+    )
+    try:
+        asyncio.run(service.serve(args.host, args.port))
+    except KeyboardInterrupt:
+        print("👋 Scoring service stopped")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,179 @@
+"""
+Layout-aware resume section segmentation.
+
+One PyMuPDF pass (``page.get_text("dict")``) keeps each line's text, font
+size and weight. Headings such as Experience, Skills or Education are then
+recognised from the line text plus layout cues (larger than body text,
+bold, or all caps), and section texts are assembled on first use and
+memoized, so each extractor only processes the part of the resume it needs.
+"""
+
+import re
+from collections import Counter
+from typing import Dict, List, Optional, Tuple
+
+# canonical section → heading texts (lowercase, punctuation stripped)
+SECTION_HEADINGS: Dict[str, List[str]] = {
+    "summary": ["summary", "profile", "objective", "about me", "professional summary", "career objective",
+                "career summary", "professional profile"],
+    "experience": ["experience", "work experience", "professional experience", "employment history",
+                   "work history", "career history", "employment", "internships", "internship",
+                   "relevant experience"],
+    "skills": ["skills", "technical skills", "key skills", "core competencies", "competencies",
+               "technologies", "tech stack", "tools", "skills & tools", "areas of expertise", "expertise"],
+    "education": ["education", "academic background", "academics", "qualifications",
+                  "educational qualifications", "education & training", "academic qualifications"],
+    "projects": ["projects", "personal projects", "academic projects", "key projects", "selected projects"],
+    "certifications": ["certifications", "certificates", "licenses", "courses", "training",
+                       "licenses & certifications"],
+    "publications": ["publications", "research", "papers", "conferences", "research publications"],
+    "awards": ["awards", "achievements", "honors", "honours", "accomplishments"],
+    "languages": ["languages"],
+    "interests": ["interests", "hobbies", "hobbies & interests"],
+    "references": ["references"],
+}
+
+_HEADING_LOOKUP = {alias: section for section, aliases in SECTION_HEADINGS.items() for alias in aliases}
+_NON_WORD = re.compile(r"[^a-z& ]+")
+_HEADING_JOIN = re.compile(r"\s*(?:&|\band\b)\s*")
+# What the encoder sees: most relevant first, as it only reads the first ~256 tokens
+ENCODE_SECTIONS = ("summary", "skills", "experience", "projects")
+BOLD_FLAG = 16  # PyMuPDF span flag bit
+
+
+def _normalize_heading(text: str) -> str:
+    return " ".join(_NON_WORD.sub(" ", text.lower()).split())
+
+
+class ResumeSections:
+    """
+    Lines of one resume with layout attributes; sections are derived lazily.
+    Text before the first heading (name, contact details) is the ``header``.
+    """
+
+    def __init__(self, lines: List[Tuple[str, float, bool]]):
+        self._lines = lines  # (text, font size, bold)
+        self._memo: Dict = {}
+
+    @classmethod
+    def from_document(cls, document) -> "ResumeSections":
+        """Single layout pass over an open PyMuPDF document"""
+        import fitz
+
+        flags = getattr(fitz, "TEXTFLAGS_TEXT", 0)  # Text only: skip embedded images
+        lines = []
+        for page in document:
+            for block in page.get_text("dict", flags=flags)["blocks"]:
+                if block.get("type", 0) != 0:
+                    continue
+                for line in block["lines"]:
+                    spans = [s for s in line["spans"] if s["text"].strip()]
+                    text = "".join(s["text"] for s in line["spans"])
+                    if not spans:
+                        lines.append((text, 0.0, False))
+                        continue
+                    size = max(s["size"] for s in spans)
+                    bold = all(s["flags"] & BOLD_FLAG or "bold" in s.get("font", "").lower() for s in spans)
+                    lines.append((text, size, bold))
+        return cls(lines)
+
+    # ----------------------------------------------
+    # Layout
+    # ----------------------------------------------
+    @property
+    def text(self) -> str:
+        if "text" not in self._memo:
+            self._memo["text"] = "\n".join(text for text, _, _ in self._lines)
+        return self._memo["text"]
+
+    @property
+    def body_font_size(self) -> float:
+        """Most common font size, weighted by characters"""
+        if "body" not in self._memo:
+            sizes = Counter()
+            for text, size, _ in self._lines:
+                if size:
+                    sizes[round(size, 1)] += len(text)
+            self._memo["body"] = sizes.most_common(1)[0][0] if sizes else 0.0
+        return self._memo["body"]
+
+    def _heading_section(self, text: str, size: float, bold: bool) -> Optional[str]:
+        stripped = text.strip()
+        # Titles like "Portal | Java, MySQL" are content, whatever they start with
+        if not stripped or len(stripped) > 50 or "|" in stripped or "," in stripped:
+            return None
+        normalized = _normalize_heading(stripped)
+        if normalized in _HEADING_LOOKUP:
+            return _HEADING_LOOKUP[normalized]
+        # Joined headings ("Work Experience & Internships") need every part known and a layout cue
+        parts = [part.strip() for part in _HEADING_JOIN.split(normalized)]
+        styled = bold or stripped.isupper() or (self.body_font_size and size >= self.body_font_size * 1.15)
+        if styled and len(parts) > 1 and all(part in _HEADING_LOOKUP for part in parts):
+            return _HEADING_LOOKUP[parts[0]]
+        return None
+
+    @property
+    def headings(self) -> List[Tuple[int, str]]:
+        """``(line index, section)`` for every detected heading, in document order"""
+        if "headings" not in self._memo:
+            self._memo["headings"] = [
+                (i, section) for i, (text, size, bold) in enumerate(self._lines)
+                if (section := self._heading_section(text, size, bold))
+            ]
+        return self._memo["headings"]
+
+    @property
+    def names(self) -> List[str]:
+        return list(dict.fromkeys(section for _, section in self.headings))
+
+    # ----------------------------------------------
+    # Section text (memoized)
+    # ----------------------------------------------
+    def _spans(self) -> Dict[str, List[Tuple[int, int]]]:
+        """Line ranges (heading excluded) per section; repeated headings accumulate"""
+        if "spans" not in self._memo:
+            spans: Dict[str, List[Tuple[int, int]]] = {}
+            boundaries = self.headings + [(len(self._lines), None)]
+            if boundaries[0][0] > 0:
+                spans["header"] = [(0, boundaries[0][0])]
+            for (start, section), (end, _) in zip(boundaries, boundaries[1:]):
+                spans.setdefault(section, []).append((start + 1, end))
+            self._memo["spans"] = spans
+        return self._memo["spans"]
+
+    def section(self, name: str) -> str:
+        key = ("section", name)
+        if key not in self._memo:
+            self._memo[key] = "\n".join(
+                self._lines[i][0] for start, end in self._spans().get(name, []) for i in range(start, end)
+            )
+        return self._memo[key]
+
+    def has(self, name: str) -> bool:
+        return name in self._spans()
+
+    def text_for(self, *names: str) -> str:
+        """The given sections in the order asked for; the whole text if none was found"""
+        key = ("text_for", names)
+        if key not in self._memo:
+            present = [name for name in names if self.has(name)]
+            if not present or not self.headings:
+                self._memo[key] = self.text
+            else:
+                self._memo[key] = "\n".join(self.section(name) for name in present)
+        return self._memo[key]
+
+    @property
+    def encode_text(self) -> Optional[str]:
+        """Section-focused text for the encoder, or None when no headings were found"""
+        return self.text_for(*ENCODE_SECTIONS) if self.headings else None
+
+    def text_without(self, *names: str) -> str:
+        """Everything except the given sections, in document order"""
+        if not any(self.has(name) for name in names):
+            return self.text
+        excluded = set()
+        for name in names:
+            for start, end in self._spans().get(name, []):
+                excluded.update(range(start - 1 if start > 0 else 0, end))  # Heading line too
+        return "\n".join(text for i, (text, _, _) in enumerate(self._lines) if i not in excluded)
@@ -0,0 +1,343 @@
+"""
+Sharded scoring: a coordinator partitions the resume pool across workers,
+each worker scores its shard against the JD and returns a local top-K, and
+the coordinator merges the local lists into the global top-K.
+
+Workers are reached over a small length-prefixed JSON socket protocol, so
+the same code drives worker processes on this machine and on remote nodes:
+
+    # on each node
+    python sharded_scoring.py worker --host 0.0.0.0 --port 9001
+
+    # coordinator (remote workers, or --local-workers N for local processes)
+    python sharded_scoring.py rank --jd jd.txt --workers node1:9001,node2:9001 resumes/*.pdf
+"""
+
+import argparse
+import heapq
+import json
+import multiprocessing
+import os
+import queue
+import socket
+import socketserver
+import struct
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional
+
+import numpy as np
+
+
+# ----------------------------------------------
+# Wire Protocol (4-byte length prefix + JSON)
+# ----------------------------------------------
+def send_message(sock: socket.socket, message: Dict) -> None:
+    data = json.dumps(message).encode("utf-8")
+    sock.sendall(struct.pack(">I", len(data)) + data)
+
+
+def recv_message(sock: socket.socket) -> Optional[Dict]:
+    header = _recv_exact(sock, 4)
+    if header is None:
+        return None
+    (length,) = struct.unpack(">I", header)
+    data = _recv_exact(sock, length)
+    if data is None:
+        raise ConnectionError("Connection closed mid-message")
+    return json.loads(data)
+
+
+def _recv_exact(sock: socket.socket, size: int) -> Optional[bytes]:
+    chunks, remaining = [], size
+    while remaining:
+        chunk = sock.recv(min(remaining, 1 << 20))
+        if not chunk:
+            return None
+        chunks.append(chunk)
+        remaining -= len(chunk)
+    return b"".join(chunks)
+
+
+# ----------------------------------------------
+# Shard Worker
+# ----------------------------------------------
+class ShardWorker:
+    """Holds one shard of parsed resumes (+ embeddings) and scores it locally"""
+
+    def __init__(self, matcher=None, model_name: str = 'all-MiniLM-L6-v2'):
+        self._matcher = matcher
+        self.model_name = model_name
+        self.resumes: List[Dict] = []
+        self.embeddings: Optional[np.ndarray] = None
+
+    @property
+    def matcher(self):
+        if self._matcher is None:
+            from matcher import ResumeJobMatcher
+            self._matcher = ResumeJobMatcher(self.model_name)
+        return self._matcher
+
+    def load(self, resumes: List[Dict], embeddings: Optional[List[List[float]]] = None) -> int:
+        """Replace the shard; embeddings are computed here unless supplied"""
+        if embeddings is not None and len(embeddings) != len(resumes):
+            raise ValueError("Expected one embedding row per resume")
+        keep = [i for i, r in enumerate(resumes) if not r.get('error') and r.get('clean_text')]
+        self.resumes = [resumes[i] for i in keep]
+        if not self.resumes:
+            matrix = np.empty((0, 0), dtype=np.float32)
+        elif embeddings is not None:
+            # Same mask as the resumes: row i must stay resume i's vector
+            matrix = np.asarray(embeddings, dtype=np.float32)[keep]
+        else:
+            matrix = self.matcher.encode_texts(
+                [self.matcher.encoding_text(r) for r in self.resumes]
+            )
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True) if matrix.size else 1.0
+        self.embeddings = matrix / np.maximum(norms, 1e-12)
+        return len(self.resumes)
+
+    def score(self, job_context: Dict, jd_embedding: List[float], top_k: int) -> List[Dict]:
+        """Score the shard and return its local top-K"""
+        if not self.resumes:
+            return []
+        jd_vector = np.asarray(jd_embedding, dtype=np.float32)
+        jd_vector /= (np.linalg.norm(jd_vector) + 1e-12)
+        semantic_scores = self.embeddings @ jd_vector
+
+        results = (
+            self.matcher.score_resume(resume, job_context, float(semantic_score))
+            for resume, semantic_score in zip(self.resumes, semantic_scores)
+        )
+        return heapq.nlargest(top_k, results, key=lambda x: x["combined_score"])
+
+    def handle(self, message: Dict) -> Dict:
+        """Dispatch one protocol request"""
+        op = message.get("op")
+        try:
+            if op == "ping":
+                return {"ok": True, "shard_size": len(self.resumes)}
+            if op == "load":
+                return {"ok": True, "shard_size": self.load(message["resumes"], message.get("embeddings"))}
+            if op == "score":
+                return {"ok": True, "results": self.score(
+                    message["job_context"], message["jd_embedding"], message["top_k"]
+                )}
+            return {"ok": False, "error": f"Unknown op: {op}"}
+        except Exception as e:
+            return {"ok": False, "error": f"{type(e).__name__}: {str(e)}"}
+
+
+class _ShardRequestHandler(socketserver.BaseRequestHandler):
+    def handle(self):
+        while True:
+            message = recv_message(self.request)
+            if message is None:
+                return
+            with self.server.worker_lock:
+                response = self.server.worker.handle(message)
+            send_message(self.request, response)
+
+
+class ShardServer(socketserver.ThreadingTCPServer):
+    """TCP front-end for a ShardWorker (one shard per server)"""
+
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, address, worker: ShardWorker):
+        super().__init__(address, _ShardRequestHandler)
+        self.worker = worker
+        self.worker_lock = threading.Lock()
+
+
+# ----------------------------------------------
+# Worker Handles (what the coordinator talks to)
+# ----------------------------------------------
+class LocalShardWorker:
+    """In-process stand-in with the same interface as RemoteShardWorker"""
+
+    def __init__(self, worker: ShardWorker):
+        self.worker = worker
+        self.name = "local"
+
+    def request(self, message: Dict) -> Dict:
+        # Round-trip through JSON so local runs exercise the same payloads
+        return json.loads(json.dumps(self.worker.handle(json.loads(json.dumps(message)))))
+
+    def close(self) -> None:
+        pass
+
+
+class RemoteShardWorker:
+    """Persistent socket connection to a ShardServer"""
+
+    def __init__(self, host: str, port: int, timeout: float = 600.0):
+        self.name = f"{host}:{port}"
+        self.sock = socket.create_connection((host, port), timeout=timeout)
+        self._lock = threading.Lock()
+
+    def request(self, message: Dict) -> Dict:
+        with self._lock:
+            send_message(self.sock, message)
+            response = recv_message(self.sock)
+        if response is None:
+            raise ConnectionError(f"Worker {self.name} closed the connection")
+        return response
+
+    def close(self) -> None:
+        self.sock.close()
+
+
+def _run_worker_process(port_queue, host: str, model_name: str) -> None:
+    server = ShardServer((host, 0), ShardWorker(model_name=model_name))
+    port_queue.put(server.server_address[1])
+    server.serve_forever()
+
+
+def spawn_local_workers(count: int, model_name: str = 'all-MiniLM-L6-v2', host: str = "127.0.0.1"):
+    """Start ``count`` worker processes on this machine; returns (handles, processes)"""
+    context = multiprocessing.get_context("spawn")  # Safe with torch threads
+    port_queue = context.Queue()
+    processes = []
+    for _ in range(count):
+        process = context.Process(target=_run_worker_process, args=(port_queue, host, model_name), daemon=True)
+        process.start()
+        processes.append(process)
+    handles = []
+    while len(handles) < count:
+        try:
+            port = port_queue.get(timeout=1.0)
+        except queue.Empty:
+            dead = [p for p in processes if not p.is_alive()]
+            if dead:
+                for process in processes:
+                    process.terminate()
+                raise RuntimeError(f"Worker process exited with code {dead[0].exitcode} during startup")
+            continue
+        handles.append(RemoteShardWorker(host, port))
+    return handles, processes
+
+
+# ----------------------------------------------
+# Coordinator
+# ----------------------------------------------
+class ShardedScorer:
+    """Partitions the pool across workers and merges their local top-K lists"""
+
+    def __init__(self, matcher, workers: List):
+        if not workers:
+            raise ValueError("ShardedScorer needs at least one worker")
+        self.matcher = matcher
+        self.workers = workers
+        self._executor = ThreadPoolExecutor(max_workers=len(workers))
+
+    def _broadcast(self, messages: List[Dict]) -> List[Dict]:
+        responses = list(self._executor.map(lambda pair: pair[0].request(pair[1]), zip(self.workers, messages)))
+        for worker, response in zip(self.workers, responses):
+            if not response.get("ok"):
+                raise RuntimeError(f"Worker {worker.name} failed: {response.get('error')}")
+        return responses
+
+    def load_pool(self, resumes: List[Dict], embeddings: Optional[np.ndarray] = None) -> List[int]:
+        """Round-robin partition the pool; returns each worker's shard size"""
+        from resume_parser import portable_resume
+
+        # Drop unscorable resumes (and their embedding rows) once, so shards stay balanced
+        keep = [i for i, r in enumerate(resumes) if not r.get('error') and r.get('clean_text')]
+        if embeddings is not None and len(embeddings) != len(resumes):
+            raise ValueError("Expected one embedding row per resume")
+
+        # Workers have no taxonomy: canonical skills are tagged here and travel with the resumes
+        self.matcher.tag_canonical_skills([resumes[i] for i in keep])
+        shards = [[] for _ in self.workers]
+        shard_embeddings = [[] for _ in self.workers]
+        for position, i in enumerate(keep):
+            resume = resumes[i]
+            shard = position % len(self.workers)
+            shards[shard].append({k: v for k, v in portable_resume(resume).items() if k != 'raw_text'})
+            if embeddings is not None:
+                shard_embeddings[shard].append(np.asarray(embeddings[i], dtype=np.float32).tolist())
+
+        messages = [
+            {"op": "load", "resumes": shard, "embeddings": shard_embeddings[j] if embeddings is not None else None}
+            for j, shard in enumerate(shards)
+        ]
+        return [response["shard_size"] for response in self._broadcast(messages)]
+
+    def score(self, job_description: str, top_k: int = 50) -> List[Dict]:
+        """Compute the JD context once, fan out, and merge local top-K lists"""
+        job_context = self.matcher.build_job_context(job_description)
+        jd_embedding = self.matcher.encode_texts([job_context["jd_clean"]])[0]
+        message = {
+            "op": "score",
+            "job_context": job_context,
+            "jd_embedding": jd_embedding.tolist(),
+            "top_k": top_k,
+        }
+        responses = self._broadcast([message] * len(self.workers))
+        merged = heapq.merge(*(r["results"] for r in responses), key=lambda x: -x["combined_score"])
+        return list(merged)[:top_k]
+
+    def close(self) -> None:
+        for worker in self.workers:
+            worker.close()
+        self._executor.shutdown(wait=False)
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description="Sharded resume scoring")
+    commands = arg_parser.add_subparsers(dest="command", required=True)
+
+    worker = commands.add_parser("worker", help="Serve one shard over TCP")
+    worker.add_argument("--host", default="127.0.0.1")
+    worker.add_argument("--port", type=int, default=9001)
+    worker.add_argument("--model", default="all-MiniLM-L6-v2")
+
+    rank = commands.add_parser("rank", help="Coordinate a sharded ranking run")
+    rank.add_argument("files", nargs="+", help="PDF resumes")
+    rank.add_argument("--jd", required=True, help="Path to a job description text file")
+    rank.add_argument("--top-k", type=int, default=50)
+    group = rank.add_mutually_exclusive_group(required=True)
+    group.add_argument("--workers", help="Comma-separated host:port list of running workers")
+    group.add_argument("--local-workers", type=int, help="Spawn N worker processes on this machine")
+
+    args = arg_parser.parse_args()
+
+    if args.command == "worker":
+        server = ShardServer((args.host, args.port), ShardWorker(model_name=args.model))
+        print(f"🧩 Shard worker listening on {args.host}:{args.port}")
+        server.serve_forever()
+        return
+
+    from resume_parser import ResumeParser
+    from matcher import ResumeJobMatcher
+
+    with open(args.jd, encoding="utf-8") as f:
+        job_description = f.read()
+
+    parser = ResumeParser()
+    resumes = []
+    for path in args.files:
+        with open(path, "rb") as f:
+            resumes.append(parser.parse_resume(f, os.path.basename(path)))
+
+    if args.local_workers:
+        handles, _ = spawn_local_workers(args.local_workers)
+    else:
+        handles = []
+        for address in args.workers.split(","):
+            host, _, port = address.strip().rpartition(":")
+            handles.append(RemoteShardWorker(host, int(port)))
+
+    scorer = ShardedScorer(ResumeJobMatcher(), handles)
+    try:
+        print(f"🧩 Shard sizes: {scorer.load_pool(resumes)}")
+        for i, result in enumerate(scorer.score(job_description, args.top_k), 1):
+            print(f"{i:>3}. {result['filename']:<40} {result['combined_score']:.3f}")
+    finally:
+        scorer.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,232 @@
+"""
+Semantic skill matching against a canonical skill taxonomy.
+
+Canonical skill names (and their common aliases) are embedded once with
+the matcher's MiniLM model into an L2-normalized matrix. A resume's
+candidate n-grams are embedded in one batch (cached across resumes, since
+most n-grams repeat) and matched with a single matrix multiply and a
+similarity threshold, so "k8s", "postgres" or "react.js" resolve to
+kubernetes, postgresql and react without per-term fuzzy matching.
+"""
+
+import re
+import threading
+from collections import OrderedDict
+from typing import Callable, Dict, Iterable, List, Optional
+
+import numpy as np
+from sklearn.feature_extraction.text import ENGLISH_STOP_WORDS
+
+# canonical skill → aliases (exact alias hits skip the embedding step)
+SKILL_TAXONOMY: Dict[str, List[str]] = {
+    "python": ["python3"],
+    "java": ["java se", "java ee", "j2ee"],
+    "javascript": ["js", "ecmascript", "es6"],
+    "typescript": [],
+    "c++": ["cpp", "c plus plus"],
+    "c#": ["csharp", "c sharp"],
+    "golang": ["go lang"],
+    "rust": [],
+    "sql": ["structured query language"],
+    "postgresql": ["postgres", "psql"],
+    "mysql": [],
+    "mongodb": ["mongo"],
+    "redis": [],
+    "elasticsearch": ["elastic search", "elk"],
+    "react": ["reactjs", "react.js"],
+    "angular": ["angularjs", "angular.js"],
+    "vue": ["vuejs", "vue.js"],
+    "node.js": ["nodejs"],
+    "django": [],
+    "flask": [],
+    "fastapi": [],
+    "spring boot": ["springboot", "spring framework"],
+    "rest api": ["restful api", "restful services"],
+    "graphql": [],
+    "html": ["html5"],
+    "css": ["css3", "sass", "scss"],
+    "aws": ["amazon web services", "ec2", "s3", "lambda"],
+    "azure": ["microsoft azure"],
+    "gcp": ["google cloud", "google cloud platform"],
+    "docker": ["containerization"],
+    "kubernetes": ["k8s", "kubectl", "helm"],
+    "terraform": ["infrastructure as code", "iac"],
+    "ci/cd": ["continuous integration", "continuous delivery", "jenkins", "github actions", "gitlab ci"],
+    "git": ["github", "gitlab", "version control"],
+    "linux": ["unix", "bash", "shell scripting"],
+    "machine learning": ["ml", "scikit-learn", "sklearn"],
+    "deep learning": ["neural networks"],
+    "nlp": ["natural language processing", "text mining"],
+    "computer vision": ["opencv", "image processing"],
+    "tensorflow": ["keras"],
+    "pytorch": ["torch"],
+    "pandas": ["dataframes"],
+    "numpy": [],
+    "data analysis": ["data analytics"],
+    "data visualization": ["dataviz", "matplotlib", "plotly", "seaborn"],
+    "statistics": ["statistical analysis", "hypothesis testing"],
+    "spark": ["pyspark", "apache spark"],
+    "airflow": ["apache airflow"],
+    "excel": ["ms excel", "spreadsheets", "vlookup"],
+    "power bi": ["powerbi"],
+    "tableau": [],
+    "jira": ["confluence"],
+    "agile": ["scrum", "kanban", "sprint planning"],
+    "testing": ["unit testing", "pytest", "junit", "qa", "test automation", "selenium"],
+    "debugging": ["troubleshooting"],
+    "security": ["cybersecurity", "owasp", "authentication", "oauth"],
+    "project management": ["pmp", "program management"],
+    "leadership": ["team lead", "mentoring"],
+    "communication": ["presentation skills", "stakeholder management"],
+    "problem solving": ["analytical thinking", "critical thinking"],
+    "marketing": ["digital marketing", "seo", "social media marketing"],
+    "sales": ["business development", "lead generation", "crm"],
+    "finance": ["financial analysis", "accounting", "budgeting"],
+    "recruitment": ["talent acquisition", "recruiting"],
+    "customer service": ["customer support", "client relations"],
+    "ui/ux": ["user interface design", "user experience", "figma", "wireframing"],
+}
+
+_TOKEN = re.compile(r"[a-z0-9][a-z0-9+#./-]*")
+
+
+class SkillTaxonomy:
+    """Canonical skill matrix + cached n-gram embeddings for one encoder"""
+
+    def __init__(self, encode_fn: Callable[[List[str]], np.ndarray],
+                 skills: Optional[Dict[str, List[str]]] = None, threshold: float = 0.75,
+                 max_ngram: int = 2, max_candidates: int = 300, cache_size: int = 20000,
+                 retain_encoder: bool = True):
+        # retain_encoder=False for shared instances: callers then pass their own encode_fn
+        self.encode_fn = encode_fn if retain_encoder else None
+        self.threshold = threshold
+        self.max_ngram = max_ngram
+        self.max_candidates = max_candidates
+        self.cache_size = cache_size
+
+        skills = skills or SKILL_TAXONOMY
+        self.names: List[str] = list(skills)
+        self._alias_to_skill: Dict[str, int] = {}
+        row_texts, row_skill = [], []
+        for index, (name, aliases) in enumerate(skills.items()):
+            for term in [name] + list(aliases):
+                term = term.lower()
+                self._alias_to_skill.setdefault(term, index)
+                row_texts.append(term)
+                row_skill.append(index)
+        # Every surface form gets a row; scores are max-reduced onto its canonical skill
+        self.matrix = self._normalize(encode_fn(row_texts))
+        self.row_skill = np.asarray(row_skill, dtype=np.intp)
+        self._skill_starts = np.flatnonzero(np.r_[True, self.row_skill[1:] != self.row_skill[:-1]])
+
+        self._cache: "OrderedDict[str, np.ndarray]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.cache_hits = 0
+        self.cache_misses = 0
+
+    @staticmethod
+    def _normalize(vectors: np.ndarray) -> np.ndarray:
+        vectors = np.asarray(vectors, dtype=np.float32)
+        return vectors / np.maximum(np.linalg.norm(vectors, axis=1, keepdims=True), 1e-12)
+
+    # ----------------------------------------------
+    # Candidate n-grams
+    # ----------------------------------------------
+    def candidate_ngrams(self, text: str) -> List[str]:
+        """Distinct 1..max_ngram word n-grams, in order, without stop words or bare numbers"""
+        tokens = [t.strip("./-") for t in _TOKEN.findall(text.lower())]
+        seen, ngrams = set(), []
+        for size in range(1, self.max_ngram + 1):
+            for start in range(len(tokens) - size + 1):
+                gram = tokens[start:start + size]
+                if any(not t or t in ENGLISH_STOP_WORDS or t.isdigit() for t in gram):
+                    continue
+                ngram = " ".join(gram)
+                if ngram not in seen:
+                    seen.add(ngram)
+                    ngrams.append(ngram)
+        return ngrams
+
+    # ----------------------------------------------
+    # Embedding cache
+    # ----------------------------------------------
+    def embed_ngrams(self, ngrams: List[str], encode_fn: Optional[Callable] = None) -> np.ndarray:
+        """Normalized embeddings; only n-grams never seen before reach the encoder"""
+        vectors: Dict[str, np.ndarray] = {}
+        with self._lock:
+            for ngram in ngrams:
+                vector = self._cache.get(ngram)
+                if vector is not None:
+                    self._cache.move_to_end(ngram)
+                    vectors[ngram] = vector
+            self.cache_hits += len(vectors)
+            missing = [ngram for ngram in ngrams if ngram not in vectors]
+            self.cache_misses += len(missing)
+
+        if missing:
+            embedded = self._normalize((encode_fn or self.encode_fn)(missing))
+            with self._lock:
+                for ngram, vector in zip(missing, embedded):
+                    vectors[ngram] = vector
+                    self._cache[ngram] = vector
+                while len(self._cache) > self.cache_size:
+                    self._cache.popitem(last=False)
+
+        if not ngrams:
+            return np.empty((0, self.matrix.shape[1]), dtype=np.float32)
+        return np.stack([vectors[ngram] for ngram in ngrams])
+
+    # ----------------------------------------------
+    # Matching
+    # ----------------------------------------------
+    def match_many(self, texts: Iterable[str], encode_fn: Optional[Callable] = None) -> List[Dict[str, float]]:
+        """
+        ``{canonical skill: similarity}`` per text. Exact alias hits score 1.0;
+        the remaining n-grams of *all* texts are embedded in one batch and
+        scored against the taxonomy with one matrix multiply.
+        """
+        found: List[Dict[str, float]] = []
+        pending: List[List[str]] = []
+        for text in texts:
+            exact, fuzzy = {}, []
+            for ngram in self.candidate_ngrams(text):
+                skill = self._alias_to_skill.get(ngram)
+                if skill is not None:
+                    exact[self.names[skill]] = 1.0
+                elif len(fuzzy) < self.max_candidates:
+                    fuzzy.append(ngram)
+            found.append(exact)
+            pending.append(fuzzy)
+
+        unique = list(dict.fromkeys(ngram for ngrams in pending for ngram in ngrams))
+        if not unique:
+            return found
+        similarities = self.embed_ngrams(unique, encode_fn) @ self.matrix.T  # (ngrams, rows)
+
+        # Best surface form per canonical skill (a skill's rows are contiguous)
+        per_skill = np.maximum.reduceat(similarities, self._skill_starts, axis=1)
+        position = {ngram: i for i, ngram in enumerate(unique)}
+
+        for exact, ngrams in zip(found, pending):
+            if not ngrams:
+                continue
+            best = per_skill[[position[ngram] for ngram in ngrams]].max(axis=0)
+            for skill in np.flatnonzero(best >= self.threshold):
+                name = self.names[skill]
+                exact[name] = max(exact.get(name, 0.0), round(float(best[skill]), 3))
+        return found
+
+    def match(self, text: str, encode_fn: Optional[Callable] = None) -> Dict[str, float]:
+        return self.match_many([text], encode_fn)[0]
+
+    @staticmethod
+    def skill_gap(jd_skills: Iterable[str], resume_skills: Iterable[str]) -> Dict:
+        """Which of the JD's canonical skills the resume covers"""
+        jd_skills, resume_skills = list(jd_skills), set(resume_skills)
+        matched = [s for s in jd_skills if s in resume_skills]
+        missing = [s for s in jd_skills if s not in resume_skills]
+        return {
+            "matched": matched,
+            "missing": missing,
+            "coverage": round(len(matched) / len(jd_skills), 3) if jd_skills else 1.0,
+        }
@@ -0,0 +1,400 @@
+"""
+Persistent, columnar talent pool of parsed resumes and their embeddings.
+
+On-disk layout (one directory per pool):
+
+    manifest.json              segment list, embedding dim, model, tombstones
+    seg-000001.npy             float32 (N, dim) L2-normalized embeddings
+    seg-000001.meta.jsonl      one metadata row per embedding row
+    seg-000001.text.jsonl      clean text per row (only read on demand)
+    seg-000001.pq.npz          optional compressed copy of the vectors
+
+Segments are append-only; ``compact()`` rewrites everything into a single
+segment so ``load()`` can hand the matcher a zero-copy memmap. Compacting
+with ``--vectors float16|int8|pq`` also writes a compressed copy that
+``load_vectors()`` serves instead of the float32 matrix. Readers never take
+the lock: segments replaced by a compaction stay on disk for a grace period
+so in-flight queries can finish reading them.
+
+    python talent_pool.py ingest pool/ resumes/*.pdf dump.zip
+    python talent_pool.py query pool/ --jd job_description.txt --top-k 20
+    python talent_pool.py compact pool/ --vectors pq
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import time
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+from filelock import FileLock
+
+from quantization import Float32Store, load_store, quantize, save_store
+
+
+class TalentPool:
+    """Append-only segment store with memory-mapped loading and compaction"""
+
+    MANIFEST = "manifest.json"
+    META_FIELDS = ("id", "filename", "skills", "experience_years", "keywords",
+                   "num_chars", "num_words", "num_unique_words", "added_at")
+    RETIRE_GRACE_SECONDS = 300  # Compacted-away segments stay on disk this long for in-flight readers
+
+    def __init__(self, path: str, model_name: Optional[str] = None):
+        self.path = path
+        os.makedirs(path, exist_ok=True)
+        self._lock = FileLock(os.path.join(path, ".lock"))
+        self.model_name = model_name
+        self.manifest = self._read_manifest()
+        # id → ["segment:row", ...]; segment names are never reused, so only new segments are read
+        self._id_index: Dict[str, List[str]] = {}
+        self._indexed_segments: set = set()
+        if model_name and self.manifest["model"] and self.manifest["model"] != model_name:
+            raise ValueError(
+                f"Pool at {path} was built with '{self.manifest['model']}', not '{model_name}'"
+            )
+
+    # ----------------------------------------------
+    # Manifest
+    # ----------------------------------------------
+    def _read_manifest(self) -> Dict:
+        manifest_path = os.path.join(self.path, self.MANIFEST)
+        if not os.path.exists(manifest_path):
+            return {"version": 1, "dim": None, "model": None, "next_segment": 1,
+                    "segments": [], "deleted": []}
+        with open(manifest_path, encoding="utf-8") as f:
+            return json.load(f)
+
+    def _write_manifest(self) -> None:
+        # Write-then-rename so readers never see a half-written manifest
+        tmp_path = os.path.join(self.path, self.MANIFEST + ".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self.manifest, f)
+        os.replace(tmp_path, os.path.join(self.path, self.MANIFEST))
+
+    def _segment_path(self, name: str, suffix: str) -> str:
+        return os.path.join(self.path, f"{name}{suffix}")
+
+    def _id_locations(self) -> Dict[str, List[str]]:
+        """Row locations per candidate id for the current manifest (call under the lock)"""
+        names = {seg["name"] for seg in self.manifest["segments"]}
+        if self._indexed_segments - names:
+            # Compaction replaced segments: rebuild from the new ones
+            self._id_index, self._indexed_segments = {}, set()
+        for name in sorted(names - self._indexed_segments):
+            for row, record in enumerate(self._read_jsonl(self._segment_path(name, ".meta.jsonl"))):
+                self._id_index.setdefault(record["id"], []).append(f"{name}:{row}")
+            self._indexed_segments.add(name)
+        return self._id_index
+
+    def __len__(self) -> int:
+        return sum(seg["count"] for seg in self.manifest["segments"]) - len(self.manifest["deleted"])
+
+    # ----------------------------------------------
+    # Ingestion
+    # ----------------------------------------------
+    @staticmethod
+    def candidate_id(resume: Dict) -> str:
+        """Content-derived id: the same resume re-ingested replaces itself"""
+        return hashlib.sha1(resume["clean_text"].encode("utf-8")).hexdigest()
+
+    @staticmethod
+    def build_record(resume: Dict, matcher) -> Dict:
+        """Metadata row for a parsed resume (no raw text, keywords precomputed)"""
+        text = matcher.preprocess_text(resume["clean_text"])
+        words = text.split()
+        return {
+            "id": resume.get("id") or TalentPool.candidate_id(resume),
+            "filename": resume["filename"],
+            "skills": resume["skills"],
+            "experience_years": resume["experience_years"],
+            "keywords": matcher.extract_keywords(text),
+            "num_chars": len(text),
+            "num_words": len(words),
+            "num_unique_words": len(set(words)),
+            "added_at": time.time(),
+        }
+
+    def append(self, records: List[Dict], embeddings: np.ndarray, texts: Optional[List[str]] = None) -> int:
+        """Append one new segment; returns the number of rows written"""
+        if not records:
+            return 0
+        embeddings = np.asarray(embeddings, dtype=np.float32)
+        if embeddings.ndim != 2 or embeddings.shape[0] != len(records):
+            raise ValueError("Expected one embedding row per record")
+        # One row per id: identical files in one batch share a content-derived id (last one wins)
+        last = {r["id"]: i for i, r in enumerate(records)}
+        if len(last) < len(records):
+            keep = sorted(last.values())
+            records = [records[i] for i in keep]
+            embeddings = embeddings[keep]
+            texts = [texts[i] for i in keep] if texts is not None else None
+        norms = np.linalg.norm(embeddings, axis=1, keepdims=True)
+        embeddings = embeddings / np.maximum(norms, 1e-12)
+
+        with self._lock:
+            self.manifest = self._read_manifest()
+            dim = self.manifest["dim"]
+            if dim is not None and embeddings.shape[1] != dim:
+                raise ValueError(f"Embedding dim {embeddings.shape[1]} does not match pool dim {dim}")
+
+            name = f"seg-{self.manifest['next_segment']:06d}"
+            np.save(self._segment_path(name, ".npy"), embeddings)
+            self._write_jsonl(self._segment_path(name, ".meta.jsonl"),
+                              ({k: r.get(k) for k in self.META_FIELDS} for r in records))
+            self._write_jsonl(self._segment_path(name, ".text.jsonl"),
+                              ({"id": r["id"], "clean_text": t} for r, t in zip(records, texts or [""] * len(records))))
+
+            # Re-ingested ids supersede their older rows
+            locations = self._id_locations()
+            deleted = set(self.manifest["deleted"])
+            for record in records:
+                deleted.update(locations.get(record["id"], ()))
+
+            self.manifest["dim"] = int(embeddings.shape[1])
+            self.manifest["model"] = self.manifest["model"] or self.model_name
+            self.manifest["next_segment"] += 1
+            self.manifest["segments"].append({"name": name, "count": len(records)})
+            self.manifest["deleted"] = sorted(deleted)
+            self._purge_retired()
+            self._write_manifest()
+        return len(records)
+
+    def add_resumes(self, resumes: List[Dict], matcher) -> int:
+        """Encode parsed resumes with the matcher's model and append them"""
+        valid = [r for r in resumes if not r.get("error") and r.get("clean_text")]
+        if not valid:
+            return 0
+        records = [self.build_record(r, matcher) for r in valid]
+        embeddings = matcher.encode_texts([matcher.encoding_text(r) for r in valid])
+        return self.append(records, embeddings, [r["clean_text"] for r in valid])
+
+    def remove(self, ids: Iterable[str]) -> int:
+        """Tombstone candidates by id; space is reclaimed on compaction"""
+        ids = set(ids)
+        with self._lock:
+            self.manifest = self._read_manifest()
+            locations = self._id_locations()
+            deleted = set(self.manifest["deleted"])
+            before = len(deleted)
+            for candidate_id in ids:
+                deleted.update(locations.get(candidate_id, ()))
+            self.manifest["deleted"] = sorted(deleted)
+            self._write_manifest()
+            return len(deleted) - before
+
+    # ----------------------------------------------
+    # Loading
+    # ----------------------------------------------
+    def _read_consistent(self, read):
+        """
+        Run a lock-free read against a fresh manifest. Old segments outlive a
+        compaction by ``RETIRE_GRACE_SECONDS``; a reader slower than that
+        retries once against the new manifest.
+        """
+        try:
+            self.manifest = self._read_manifest()
+            return read()
+        except FileNotFoundError:
+            self.manifest = self._read_manifest()
+            return read()
+
+    def load(self) -> Tuple[List[Dict], np.ndarray]:
+        """
+        Return ``(records, embeddings)`` for all live candidates.
+        A compacted pool (single segment, no tombstones) is returned as a
+        read-only memmap without copying; otherwise live rows are gathered.
+        """
+        return self._read_consistent(self._load_live)
+
+    def _load_live(self) -> Tuple[List[Dict], np.ndarray]:
+        segments = self.manifest["segments"]
+        dim = self.manifest["dim"] or 0
+        if not segments:
+            return [], np.empty((0, dim), dtype=np.float32)
+
+        deleted = set(self.manifest["deleted"])
+        records, blocks = [], []
+        for seg in segments:
+            matrix = np.load(self._segment_path(seg["name"], ".npy"), mmap_mode="r")
+            rows = self._read_jsonl(self._segment_path(seg["name"], ".meta.jsonl"))
+            keep = [i for i in range(len(rows)) if f"{seg['name']}:{i}" not in deleted]
+            records.extend(rows[i] for i in keep)
+            blocks.append(matrix if len(keep) == len(rows) else matrix[keep])
+
+        embeddings = blocks[0] if len(blocks) == 1 else np.concatenate(blocks)
+        return records, embeddings
+
+    def load_vectors(self) -> Tuple[List[Dict], object]:
+        """
+        Like ``load()``, but returns a vector store (see quantization.py) with a
+        ``scores(query)`` method: the compressed copy written by
+        ``compact(vector_format=...)`` when present, else the float32 rows.
+        """
+        return self._read_consistent(self._load_live_vectors)
+
+    def _load_live_vectors(self) -> Tuple[List[Dict], object]:
+        segments = self.manifest["segments"]
+        if len(segments) == 1 and not self.manifest["deleted"] and segments[0].get("vectors"):
+            seg = segments[0]
+            records = self._read_jsonl(self._segment_path(seg["name"], ".meta.jsonl"))
+            return records, load_store(self._segment_path(seg["name"], f".{seg['vectors']}.npz"))
+        records, embeddings = self._load_live()
+        return records, Float32Store(embeddings)
+
+    def load_texts(self) -> Dict[str, str]:
+        """Map candidate id → clean text (for re-encoding with a new model)"""
+        texts = {}
+        for seg in self.manifest["segments"]:
+            for row in self._read_jsonl(self._segment_path(seg["name"], ".text.jsonl")):
+                texts[row["id"]] = row["clean_text"]
+        return texts
+
+    # ----------------------------------------------
+    # Compaction
+    # ----------------------------------------------
+    def compact(self, vector_format: Optional[str] = None) -> int:
+        """
+        Rewrite all live rows into a single segment; returns live row count.
+        ``vector_format`` (float16 / int8 / pq) also stores a compressed copy.
+        """
+        with self._lock:
+            self.manifest = self._read_manifest()
+            records, embeddings = self._load_live()
+            texts = self.load_texts()
+            old_segments = list(self.manifest["segments"])
+
+            name = f"seg-{self.manifest['next_segment']:06d}"
+            np.save(self._segment_path(name, ".npy"), np.ascontiguousarray(embeddings, dtype=np.float32))
+            self._write_jsonl(self._segment_path(name, ".meta.jsonl"), records)
+            self._write_jsonl(self._segment_path(name, ".text.jsonl"),
+                              ({"id": r["id"], "clean_text": texts.get(r["id"], "")} for r in records))
+            segment = {"name": name, "count": len(records)}
+            if vector_format and vector_format != "float32" and len(records):
+                save_store(quantize(embeddings, vector_format), self._segment_path(name, f".{vector_format}.npz"))
+                segment["vectors"] = vector_format
+
+            # Readers that already hold the old manifest keep working until the grace period ends
+            retired_at = time.time()
+            self.manifest["next_segment"] += 1
+            self.manifest["segments"] = [segment]
+            self.manifest["deleted"] = []
+            self.manifest["retired"] = self.manifest.get("retired", []) + [
+                dict(seg, retired_at=retired_at) for seg in old_segments
+            ]
+            self._purge_retired()
+            self._write_manifest()
+        return len(records)
+
+    def _purge_retired(self) -> None:
+        """Delete retired segment files past the grace period (call under the lock)"""
+        cutoff = time.time() - self.RETIRE_GRACE_SECONDS
+        keep = []
+        for seg in self.manifest.get("retired", []):
+            if seg["retired_at"] > cutoff:
+                keep.append(seg)
+                continue
+            suffixes = [".npy", ".meta.jsonl", ".text.jsonl"]
+            if seg.get("vectors"):
+                suffixes.append(f".{seg['vectors']}.npz")
+            for suffix in suffixes:
+                try:
+                    os.remove(self._segment_path(seg["name"], suffix))
+                except OSError:
+                    pass
+        self.manifest["retired"] = keep
+
+    def stats(self) -> Dict:
+        return {
+            "candidates": len(self),
+            "segments": len(self.manifest["segments"]),
+            "tombstones": len(self.manifest["deleted"]),
+            "dim": self.manifest["dim"],
+            "model": self.manifest["model"],
+            "vectors": self.manifest["segments"][0].get("vectors", "float32")
+            if len(self.manifest["segments"]) == 1 else "float32",
+        }
+
+    # ----------------------------------------------
+    # Helpers
+    # ----------------------------------------------
+    @staticmethod
+    def _write_jsonl(path: str, rows: Iterable[Dict]) -> None:
+        with open(path, "w", encoding="utf-8") as f:
+            for row in rows:
+                f.write(json.dumps(row) + "\n")
+
+    @staticmethod
+    def _read_jsonl(path: str) -> List[Dict]:
+        with open(path, encoding="utf-8") as f:
+            return [json.loads(line) for line in f if line.strip()]
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description="Manage the persistent talent pool")
+    commands = arg_parser.add_subparsers(dest="command", required=True)
+
+    ingest = commands.add_parser("ingest", help="Parse, embed and append PDFs or archives")
+    ingest.add_argument("pool")
+    ingest.add_argument("files", nargs="+")
+
+    query = commands.add_parser("query", help="Rank the pool against a job description")
+    query.add_argument("pool")
+    query.add_argument("--jd", required=True, help="Path to a job description text file")
+    query.add_argument("--top-k", type=int, default=20)
+
+    query.add_argument("--compressed", action="store_true",
+                       help="Score with the compressed vectors written by 'compact --vectors'")
+
+    compact = commands.add_parser("compact", help="Merge segments and drop tombstones")
+    compact.add_argument("pool")
+    compact.add_argument("--vectors", choices=["float32", "float16", "int8", "pq"], default="float32",
+                         help="Also store a compressed copy of the embeddings")
+
+    stats = commands.add_parser("stats", help="Show pool size and layout")
+    stats.add_argument("pool")
+
+    args = arg_parser.parse_args()
+
+    if args.command in ("compact", "stats"):
+        pool = TalentPool(args.pool)
+        if args.command == "compact":
+            print(f"🗜️ Compacted pool to {pool.compact(vector_format=args.vectors)} candidate(s)")
+        print(pool.stats())
+        return
+
+    from matcher import ResumeJobMatcher
+    matcher = ResumeJobMatcher()
+    pool = TalentPool(args.pool, model_name=matcher.model_name)
+
+    if args.command == "ingest":
+        from resume_parser import ResumeParser
+        from bulk_ingest import ArchiveIngestor
+
+        parser, ingestor = ResumeParser(), ArchiveIngestor()
+        parsed = []
+        for path in args.files:
+            with open(path, "rb") as f:
+                if ArchiveIngestor.is_archive(path):
+                    parsed.extend(ingestor.ingest(parser, f, path, keep_raw_text=False))
+                else:
+                    parsed.append(parser.parse_resume(f, os.path.basename(path)))
+        print(f"✅ Added {pool.add_resumes(parsed, matcher)} candidate(s); pool now holds {len(pool)}")
+
+    elif args.command == "query":
+        with open(args.jd, encoding="utf-8") as f:
+            job_description = f.read()
+        started = time.perf_counter()
+        records, embeddings = pool.load_vectors() if args.compressed else pool.load()
+        loaded = time.perf_counter()
+        results = matcher.rank_pool(records, embeddings, job_description, top_k=args.top_k)
+        print(f"⏱️ Loaded {len(records)} candidate(s) in {loaded - started:.2f}s, "
+              f"ranked in {time.perf_counter() - loaded:.2f}s")
+        for i, result in enumerate(results, 1):
+            print(f"{i:>3}. {result['filename']:<40} {result['combined_score']:.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+import threading
+import tracemalloc
+
+from profiling import AnalysisProfiler
+
+
+class Component:
+    def extract_sections(self, *args): return None
+    def extract_skills(self, *args): return None
+    def extract_experience_years(self, *args): return None
+    def encode_texts(self, *args): return None
+    def score_cheap_components(self, *args): return None
+    def score_cheap_components_batch(self, *args): return None
+
+
+def test_overlapping_runs_share_tracemalloc():
+    first, second = AnalysisProfiler(), AnalysisProfiler()
+    second_started, first_done = threading.Event(), threading.Event()
+    errors = []
+
+    def long_run():
+        try:
+            with second.profile_run(Component(), Component()):
+                second_started.set()
+                first_done.wait(5)
+                # The run that started tracing has finished: this one must keep going
+                with second.stage("after_other_run"):
+                    [bytearray(1024) for _ in range(10)]
+        except Exception as e:
+            errors.append(e)
+
+    thread = threading.Thread(target=long_run)
+    with first.profile_run(Component(), Component()):
+        thread.start()
+        second_started.wait(5)
+        with first.stage("short"):
+            pass
+    first_done.set()
+    thread.join()
+
+    assert not errors
+    assert second.stage_stats["after_other_run"]["calls"] == 1
+    assert second.stage_stats["after_other_run"]["top_allocations"]
+    assert not tracemalloc.is_tracing()
+
+
+def test_stage_survives_tracing_stopped_elsewhere():
+    profiler = AnalysisProfiler()
+    with profiler.profile_run(Component(), Component()):
+        with profiler.stage("interrupted"):
+            tracemalloc.stop()  # E.g. a library that manages tracemalloc itself
+    assert profiler.stage_stats["interrupted"]["calls"] == 1
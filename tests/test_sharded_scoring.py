@@ -0,0 +1,92 @@
+import numpy as np
+import pytest
+
+from load_test import StubEncoder
+from matcher import ResumeJobMatcher
+from sharded_scoring import LocalShardWorker, ShardedScorer, ShardWorker
+
+JOB_DESCRIPTION = "Backend developer with 3 years of Python, Django, SQL and AWS experience"
+
+
+def make_resume(name, text, error=None):
+    return {
+        "filename": name,
+        "raw_text": text,
+        "clean_text": "" if error else text,
+        "skills": [],
+        "experience_years": 3,
+        "error": error,
+    }
+
+
+@pytest.fixture
+def matcher():
+    return ResumeJobMatcher(model=StubEncoder())
+
+
+@pytest.fixture
+def resumes():
+    # The errored resume sits in the middle: every later row would shift onto its neighbour
+    return [
+        make_resume("python.pdf", "python django sql aws backend developer"),
+        make_resume("java.pdf", "java spring microservices kafka"),
+        make_resume("broken.pdf", "", error="Error reading PDF: damaged"),
+        make_resume("designer.pdf", "figma sketch illustrator branding"),
+        make_resume("data.pdf", "python pandas sql statistics dashboards"),
+    ]
+
+
+def expected_semantic_scores(matcher, resumes):
+    jd = matcher.encode_texts([matcher.preprocess_text(JOB_DESCRIPTION)])[0]
+    jd = jd / np.linalg.norm(jd)
+    scores = {}
+    for resume in resumes:
+        if resume["error"]:
+            continue
+        embedding = matcher.encode_texts([matcher.encoding_text(resume)])[0]
+        scores[resume["filename"]] = float(embedding @ jd / np.linalg.norm(embedding))
+    return scores
+
+
+def precomputed_embeddings(matcher, resumes):
+    # One row per input resume, errored ones included (zeros), as a stored pool would hand them over
+    dim = matcher.model.get_sentence_embedding_dimension()
+    return np.stack([
+        np.zeros(dim, dtype=np.float32) if r["error"] else matcher.encode_texts([matcher.encoding_text(r)])[0]
+        for r in resumes
+    ])
+
+
+def test_worker_load_keeps_embeddings_aligned_with_an_errored_resume(matcher, resumes):
+    worker = ShardWorker(matcher=matcher)
+    assert worker.load(resumes, precomputed_embeddings(matcher, resumes).tolist()) == 4
+
+    job_context = matcher.build_job_context(JOB_DESCRIPTION)
+    jd_embedding = matcher.encode_texts([job_context["jd_clean"]])[0]
+    results = worker.score(job_context, jd_embedding.tolist(), top_k=10)
+
+    expected = expected_semantic_scores(matcher, resumes)
+    assert {r["filename"] for r in results} == set(expected)
+    for result in results:
+        assert result["similarity_score"] == pytest.approx(expected[result["filename"]], abs=1e-5)
+
+
+def test_worker_load_rejects_mismatched_embeddings(matcher, resumes):
+    worker = ShardWorker(matcher=matcher)
+    with pytest.raises(ValueError):
+        worker.load(resumes, precomputed_embeddings(matcher, resumes)[:-1].tolist())
+
+
+@pytest.mark.parametrize("with_embeddings", [True, False])
+def test_sharded_scores_match_their_own_resume(matcher, resumes, with_embeddings):
+    scorer = ShardedScorer(matcher, [LocalShardWorker(ShardWorker(matcher=matcher)) for _ in range(2)])
+    embeddings = precomputed_embeddings(matcher, resumes) if with_embeddings else None
+    assert sum(scorer.load_pool(resumes, embeddings)) == 4
+
+    expected = expected_semantic_scores(matcher, resumes)
+    results = scorer.score(JOB_DESCRIPTION, top_k=10)
+    scorer.close()
+
+    assert {r["filename"] for r in results} == set(expected)
+    for result in results:
+        assert result["similarity_score"] == pytest.approx(expected[result["filename"]], abs=1e-5)
@@ -0,0 +1,61 @@
+import os
+
+import pytest
+
+from load_test import StubEncoder
+from matcher import ResumeJobMatcher
+from talent_pool import TalentPool
+from watch_folder import WatchFolderDaemon
+
+CONTENT = b"python django developer with five years of backend experience %%EOF"
+
+
+class TextParser:
+    """Treats each file's bytes as the resume text"""
+
+    def parse_resume(self, file, filename):
+        text = file.read().decode("utf-8")
+        return {"filename": filename, "raw_text": text, "clean_text": text, "skills": [],
+                "experience_years": 0, "error": None}
+
+
+@pytest.fixture
+def daemon(tmp_path):
+    folder = tmp_path / "inbox"
+    folder.mkdir()
+    pool = TalentPool(str(tmp_path / "pool"))
+    return WatchFolderDaemon(str(folder), pool, TextParser(), ResumeJobMatcher(model=StubEncoder()),
+                             settle_seconds=0.0, prune_deleted=True, use_inotify=False)
+
+
+def drop(daemon, *names, content=CONTENT):
+    for name in names:
+        with open(os.path.join(daemon.folder, name), "wb") as f:
+            f.write(content)
+    daemon.rescan()
+    return daemon.ingest(daemon.ready_files())
+
+
+def test_identical_files_in_one_batch_are_stored_once(daemon):
+    assert drop(daemon, "a.pdf", "b.pdf") == 1
+    assert len(daemon.pool) == 1
+
+
+def test_deleting_one_copy_keeps_the_shared_candidate(daemon):
+    drop(daemon, "a.pdf", "b.pdf")
+    os.remove(os.path.join(daemon.folder, "a.pdf"))
+    daemon.rescan()
+    daemon._prune()
+    assert len(daemon.pool) == 1
+
+    os.remove(os.path.join(daemon.folder, "b.pdf"))
+    daemon.rescan()
+    daemon._prune()
+    assert len(daemon.pool) == 0
+
+
+def test_changing_one_copy_keeps_the_shared_candidate(daemon):
+    drop(daemon, "a.pdf", "b.pdf")
+    drop(daemon, "a.pdf", content=b"java spring engineer with microservices and kafka %%EOF")
+    records, _ = daemon.pool.load()
+    assert len(records) == 2
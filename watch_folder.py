@@ -0,0 +1,388 @@
+"""
+Watch-folder ingestion daemon.
+
+Watches a drop folder (inotify on Linux, polling elsewhere or with
+``--poll``), waits until each new or changed PDF / archive has stopped
+growing, then parses it, embeds it and appends it to a TalentPool in
+small batches, so a query against the pool never waits on parsing.
+
+    python watch_folder.py inbox/ pool/
+    python watch_folder.py inbox/ pool/ --poll --settle 5 --prune-deleted
+
+What was already ingested is remembered in ``watch_state.json`` inside the
+pool directory (path → size, mtime, content hash, candidate ids), so a
+restart only processes files that arrived or changed while it was down.
+"""
+
+import argparse
+import ctypes
+import ctypes.util
+import hashlib
+import io
+import json
+import os
+import select
+import signal
+import struct
+import threading
+import time
+from typing import Dict, Iterator, List, Optional, Set, Tuple
+
+WATCHED_SUFFIXES = (".pdf", ".zip", ".tar", ".tgz", ".tar.gz", ".gz")
+
+
+def is_watched(name: str) -> bool:
+    base = os.path.basename(name)
+    # Skip hidden files and the temporary names most copy tools write to first
+    if base.startswith(".") or base.endswith((".part", ".tmp", ".crdownload", "~")):
+        return False
+    return base.lower().endswith(WATCHED_SUFFIXES)
+
+
+# ----------------------------------------------
+# Change sources
+# ----------------------------------------------
+class PollingWatcher:
+    """Portable fallback: rescan the folder and diff (size, mtime) signatures"""
+
+    def __init__(self, folder: str, interval: float = 1.0):
+        self.folder = folder
+        self.interval = interval
+        self._seen: Dict[str, Tuple[int, int]] = {}
+
+    def changes(self, timeout: float) -> Iterator[Tuple[str, bool]]:
+        """Yield ``(path, deleted)`` for everything that changed since the last call"""
+        time.sleep(min(timeout, self.interval))
+        current = {}
+        for entry in os.scandir(self.folder):
+            if entry.is_file() and is_watched(entry.name):
+                stat = entry.stat()
+                current[entry.path] = (stat.st_size, stat.st_mtime_ns)
+        for path, signature in current.items():
+            if self._seen.get(path) != signature:
+                yield path, False
+        for path in set(self._seen) - set(current):
+            yield path, True
+        self._seen = current
+
+    def close(self) -> None:
+        pass
+
+
+class InotifyWatcher:
+    """Linux inotify through ctypes (no extra dependency)"""
+
+    IN_MODIFY = 0x00000002
+    IN_CLOSE_WRITE = 0x00000008
+    IN_MOVED_FROM = 0x00000040
+    IN_MOVED_TO = 0x00000080
+    IN_CREATE = 0x00000100
+    IN_DELETE = 0x00000200
+    IN_Q_OVERFLOW = 0x00004000
+    IN_NONBLOCK = 0o4000
+    IN_CLOEXEC = 0o2000000
+    _EVENT = struct.Struct("iIII")
+
+    def __init__(self, folder: str):
+        self.folder = folder
+        self._libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        self._fd = self._libc.inotify_init1(self.IN_NONBLOCK | self.IN_CLOEXEC)
+        if self._fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        mask = (self.IN_MODIFY | self.IN_CLOSE_WRITE | self.IN_MOVED_FROM | self.IN_MOVED_TO
+                | self.IN_CREATE | self.IN_DELETE)
+        if self._libc.inotify_add_watch(self._fd, os.fsencode(folder), mask) < 0:
+            error = ctypes.get_errno()
+            os.close(self._fd)
+            raise OSError(error, f"inotify_add_watch failed for {folder}")
+        self.overflowed = False
+
+    @classmethod
+    def available(cls) -> bool:
+        return hasattr(select, "select") and os.path.exists("/proc/sys/fs/inotify")
+
+    def changes(self, timeout: float) -> Iterator[Tuple[str, bool]]:
+        readable, _, _ = select.select([self._fd], [], [], timeout)
+        if not readable:
+            return
+        try:
+            data = os.read(self._fd, 64 * 1024)
+        except BlockingIOError:
+            return
+        offset = 0
+        while offset + self._EVENT.size <= len(data):
+            _, mask, _, name_length = self._EVENT.unpack_from(data, offset)
+            offset += self._EVENT.size
+            name = data[offset:offset + name_length].rstrip(b"\0").decode("utf-8", "replace")
+            offset += name_length
+            if mask & self.IN_Q_OVERFLOW:
+                self.overflowed = True  # Events were lost: the daemon rescans
+                continue
+            if name and is_watched(name):
+                yield os.path.join(self.folder, name), bool(mask & (self.IN_DELETE | self.IN_MOVED_FROM))
+
+    def close(self) -> None:
+        os.close(self._fd)
+
+
+# ----------------------------------------------
+# Daemon
+# ----------------------------------------------
+class WatchFolderDaemon:
+    """Debounced, incremental folder → TalentPool ingestion"""
+
+    STATE_FILE = "watch_state.json"
+
+    def __init__(self, folder: str, pool, parser, matcher, settle_seconds: float = 2.0,
+                 batch_size: int = 32, rescan_interval: float = 60.0, compact_every: int = 50,
+                 prune_deleted: bool = False, use_inotify: Optional[bool] = None, poll_interval: float = 1.0):
+        from bulk_ingest import ArchiveIngestor
+
+        self.folder = os.path.abspath(folder)
+        self.pool = pool
+        self.parser = parser
+        self.matcher = matcher
+        self.ingestor = ArchiveIngestor()
+        self.settle_seconds = settle_seconds
+        self.batch_size = batch_size
+        self.rescan_interval = rescan_interval
+        self.compact_every = compact_every
+        self.prune_deleted = prune_deleted
+
+        if use_inotify is None:
+            use_inotify = InotifyWatcher.available()
+        self.watcher = InotifyWatcher(self.folder) if use_inotify else PollingWatcher(self.folder, poll_interval)
+
+        self.state_path = os.path.join(pool.path, self.STATE_FILE)
+        self.state: Dict[str, Dict] = self._load_state()
+        # path → (size, mtime_ns, monotonic time the signature last changed)
+        self._pending: Dict[str, Tuple[int, int, float]] = {}
+        self._deleted: Set[str] = set()
+        self._stop = threading.Event()
+        self.stats = {"ingested_files": 0, "candidates": 0, "unchanged": 0, "failed": 0, "removed": 0}
+
+    # ----------------------------------------------
+    # State
+    # ----------------------------------------------
+    def _load_state(self) -> Dict[str, Dict]:
+        if not os.path.exists(self.state_path):
+            return {}
+        with open(self.state_path, encoding="utf-8") as f:
+            return json.load(f)
+
+    def _save_state(self) -> None:
+        tmp_path = self.state_path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self.state, f)
+        os.replace(tmp_path, self.state_path)
+
+    def _referenced_ids(self) -> Set[str]:
+        return {candidate_id for entry in self.state.values() for candidate_id in entry.get("ids", [])}
+
+    def _relative(self, path: str) -> str:
+        return os.path.relpath(path, self.folder)
+
+    # ----------------------------------------------
+    # Change tracking and debouncing
+    # ----------------------------------------------
+    def rescan(self) -> None:
+        """Queue every file that differs from the recorded state (startup, overflow, safety net)"""
+        present = set()
+        for entry in os.scandir(self.folder):
+            if entry.is_file() and is_watched(entry.name):
+                present.add(self._relative(entry.path))
+                self._touch(entry.path)
+        for name in set(self.state) - present:
+            self._deleted.add(name)
+
+    def _touch(self, path: str) -> None:
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            return
+        recorded = self.state.get(self._relative(path))
+        if recorded and (recorded["size"], recorded["mtime_ns"]) == (stat.st_size, stat.st_mtime_ns):
+            self._pending.pop(path, None)
+            return
+        pending = self._pending.get(path)
+        if pending is None or pending[:2] != (stat.st_size, stat.st_mtime_ns):
+            self._pending[path] = (stat.st_size, stat.st_mtime_ns, time.monotonic())
+
+    def ready_files(self) -> List[str]:
+        """Pending files whose size and mtime have been stable for ``settle_seconds``"""
+        now, ready = time.monotonic(), []
+        for path, (size, mtime_ns, changed_at) in list(self._pending.items()):
+            try:
+                stat = os.stat(path)
+            except FileNotFoundError:
+                self._pending.pop(path, None)
+                continue
+            if (stat.st_size, stat.st_mtime_ns) != (size, mtime_ns):
+                self._pending[path] = (stat.st_size, stat.st_mtime_ns, now)  # Still being written
+            elif size and now - changed_at >= self.settle_seconds and self._looks_complete(path, size):
+                ready.append(path)
+        return sorted(ready)[:self.batch_size]
+
+    @staticmethod
+    def _looks_complete(path: str, size: int) -> bool:
+        """A PDF is only complete once its trailer (%%EOF) has been written"""
+        if not path.lower().endswith(".pdf"):
+            return True
+        with open(path, "rb") as f:
+            f.seek(max(0, size - 2048))
+            return b"%%EOF" in f.read()
+
+    # ----------------------------------------------
+    # Ingestion
+    # ----------------------------------------------
+    def ingest(self, paths: List[str]) -> int:
+        """Parse changed files, append them as one pool segment, record state"""
+        parsed_batch, updates, stale_ids = [], {}, []
+        for path in paths:
+            size, mtime_ns, _ = self._pending.pop(path)
+            name = self._relative(path)
+            with open(path, "rb") as f:
+                data = f.read()
+            digest = hashlib.sha256(data).hexdigest()
+            recorded = self.state.get(name)
+            entry = {"size": size, "mtime_ns": mtime_ns, "sha256": digest, "ids": [], "error": None}
+            if recorded and recorded["sha256"] == digest:
+                # Touched or re-copied, same bytes: nothing to re-parse
+                self.state[name] = dict(recorded, size=size, mtime_ns=mtime_ns)
+                self.stats["unchanged"] += 1
+                continue
+
+            parsed = self._parse(io.BytesIO(data), name)
+            ok = [p for p in parsed if not p.get("error") and p.get("clean_text")]
+            if not ok:
+                entry["error"] = (parsed[0].get("error") if parsed else None) or "No text extracted"
+                self.stats["failed"] += 1
+                print(f"⚠️ {name}: {entry['error']}")
+            for resume in ok:
+                resume["id"] = self.pool.candidate_id(resume)
+                entry["ids"].append(resume["id"])
+            if recorded:
+                stale_ids.extend(set(recorded.get("ids", [])) - set(entry["ids"]))
+            parsed_batch.extend(ok)
+            updates[name] = entry
+
+        added = self.pool.add_resumes(parsed_batch, self.matcher) if parsed_batch else 0
+        self.state.update(updates)
+        # Ids are content hashes: a copy of the old content elsewhere keeps its candidate
+        stale_ids = set(stale_ids) - self._referenced_ids()
+        if stale_ids:
+            self.stats["removed"] += self.pool.remove(stale_ids)
+        self._save_state()
+
+        self.stats["ingested_files"] += len(updates)
+        self.stats["candidates"] += added
+        if added:
+            print(f"📥 Added {added} candidate(s) from {len(updates)} file(s); pool holds {len(self.pool)}")
+        if self.compact_every and len(self.pool.manifest["segments"]) >= self.compact_every:
+            print(f"🗜️ Compacted pool to {self.pool.compact()} candidate(s)")
+        return added
+
+    def _parse(self, file, name: str) -> List[Dict]:
+        if self.ingestor.is_archive(name):
+            return list(self.ingestor.ingest(self.parser, file, name, keep_raw_text=False))
+        try:
+            parsed = self.parser.parse_resume(file, name)
+        except Exception as e:
+            return [{"filename": name, "clean_text": "", "error": f"Error parsing resume: {str(e)}"}]
+        parsed["raw_text"] = ""
+        return [parsed]
+
+    def _prune(self) -> None:
+        deleted, self._deleted = self._deleted, set()
+        ids = []
+        for name in deleted:
+            if os.path.exists(os.path.join(self.folder, name)):
+                continue  # Deleted and re-created (e.g. moved over)
+            entry = self.state.pop(name, None)
+            if entry:
+                ids.extend(entry.get("ids", []))
+        # Identical files share an id: keep it while any remaining file still refers to it
+        ids = set(ids) - self._referenced_ids()
+        if ids and self.prune_deleted:
+            removed = self.pool.remove(ids)
+            self.stats["removed"] += removed
+            print(f"🗑️ Removed {removed} candidate(s) whose files were deleted")
+        if deleted:
+            self._save_state()
+
+    # ----------------------------------------------
+    # Main loop
+    # ----------------------------------------------
+    def run_once(self, timeout: float = 0.5) -> int:
+        for path, deleted in self.watcher.changes(timeout):
+            if deleted:
+                self._pending.pop(path, None)
+                self._deleted.add(self._relative(path))
+            else:
+                self._touch(path)
+        if getattr(self.watcher, "overflowed", False):
+            self.watcher.overflowed = False
+            self.rescan()
+        if self._deleted:
+            self._prune()
+        ready = self.ready_files()
+        return self.ingest(ready) if ready else 0
+
+    def run(self) -> None:
+        print(f"👀 Watching {self.folder} ({type(self.watcher).__name__}) → pool {self.pool.path}")
+        self.rescan()
+        last_rescan = time.monotonic()
+        try:
+            while not self._stop.is_set():
+                try:
+                    self.run_once()
+                except Exception as e:
+                    # Unrecorded files are picked up again by the next rescan
+                    print(f"❌ Ingestion error: {e}")
+                    self._stop.wait(1.0)
+                # inotify misses changes on network shares; a slow rescan catches them
+                if time.monotonic() - last_rescan >= self.rescan_interval:
+                    self.rescan()
+                    last_rescan = time.monotonic()
+        finally:
+            self.watcher.close()
+            print(f"👋 Stopped watching: {self.stats}")
+
+    def stop(self) -> None:
+        self._stop.set()
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description="Watch a folder and ingest new resumes into a talent pool")
+    arg_parser.add_argument("folder", help="Drop folder to watch")
+    arg_parser.add_argument("pool", help="Talent pool directory")
+    arg_parser.add_argument("--settle", type=float, default=2.0,
+                            help="Seconds a file must stay unchanged before it is parsed")
+    arg_parser.add_argument("--batch-size", type=int, default=32, help="Files per pool segment")
+    arg_parser.add_argument("--poll", action="store_true", help="Force polling instead of inotify")
+    arg_parser.add_argument("--poll-interval", type=float, default=1.0)
+    arg_parser.add_argument("--rescan-interval", type=float, default=60.0)
+    arg_parser.add_argument("--compact-every", type=int, default=50,
+                            help="Compact once the pool has this many segments (0 = never)")
+    arg_parser.add_argument("--prune-deleted", action="store_true",
+                            help="Remove candidates whose files disappear from the folder")
+    args = arg_parser.parse_args()
+
+    from matcher import ResumeJobMatcher
+    from resume_parser import ResumeParser
+    from talent_pool import TalentPool
+
+    matcher = ResumeJobMatcher()
+    daemon = WatchFolderDaemon(
+        args.folder, TalentPool(args.pool, model_name=matcher.model_name), ResumeParser(), matcher,
+        settle_seconds=args.settle, batch_size=args.batch_size, rescan_interval=args.rescan_interval,
+        compact_every=args.compact_every, prune_deleted=args.prune_deleted,
+        use_inotify=False if args.poll else None, poll_interval=args.poll_interval,
+    )
+    for signum in (signal.SIGINT, signal.SIGTERM):
+        signal.signal(signum, lambda *_: daemon.stop())
+    daemon.run()
+
+
+if __name__ == "__main__":
+    main()